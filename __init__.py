@@ -1,4 +1,3 @@
-import importlib
 import os
 import sys
 from pathlib import Path
@@ -15,7 +14,9 @@ if os.path.normpath(ROOT_DIR) not in sys.path:
     sys.path.insert(0, os.path.normpath(ROOT_DIR))
 
 
+from bw_tools.common import bw_resources
 from bw_tools.common.bw_api_tool import BWAPITool
+from bw_tools.modules.bw_settings import settings_registry
 
 
 API_TOOL = BWAPITool()
@@ -25,20 +26,8 @@ def initializeSDPlugin():
     API_TOOL.initialize_logger()
     API_TOOL.add_menu()
 
-    modules_dir = ROOT_DIR / "bw_tools/modules"
-    for name in os.listdir(modules_dir):
-        if not name.startswith("bw_"):
-            continue
-
-        try:
-            module_path = f"bw_tools.modules.{name}.{name}"
-            API_TOOL.logger.debug(f"Attempting to initialize {module_path}...")
-            module = importlib.import_module(module_path)
-        except ModuleNotFoundError:
-            API_TOOL.logger.error(f"Failed to import module {module_path}")
-            continue
-        else:
-            API_TOOL.initialize(module)
+    API_TOOL.register_modules(ROOT_DIR / "bw_tools/modules")
+    API_TOOL.log_startup_times()
 
 
 def uninitializeSDPlugin():
@@ -46,3 +35,5 @@ def uninitializeSDPlugin():
     API_TOOL.unregister_callbacks()
     API_TOOL.remove_toolbars()
     API_TOOL.remove_menu()
+    settings_registry.clear()
+    bw_resources.clear()
@@ -1,8 +1,12 @@
+import importlib
 import json
 import logging
+import time
+from collections import OrderedDict
 from enum import Enum
+from functools import partial
 from pathlib import Path
-from typing import List, Optional, TypeVar
+from typing import Dict, List, Optional, Set, TypeVar
 
 import sd
 from PySide6 import QtGui, QtWidgets
@@ -17,6 +21,10 @@ from sd.api.sdpackage import SDPackage
 from sd.api.sdpackagemgr import SDPackageMgr
 from sd.context import Context as SDContext
 
+from bw_tools.modules.bw_settings import settings_registry, settings_store
+
+from . import bw_manifest_cache, bw_resources
+from .bw_manifest import BWActionManifest, BWModuleManifest
 from .bw_toolbar import BWToolbar
 
 BW_MODULE = TypeVar("BW_MODULE")
@@ -47,6 +55,11 @@ class BWAPITool:
     The module is responsible for doing any setup code. Callbacks can be
     registered with the APITool.register_on_graph_view_created_callback()
 
+    Alternatively, a module can declare a MANIFEST in the __init__.py of its
+    package, see bw_manifest.py. Its toolbar actions, hotkeys and menu
+    entries are then created from the manifest and the module is only
+    imported the first time one of them is triggered.
+
     There are two toolbars available, the main top toolbar and a graph view
     toolbar. These can be accessed with .toolbar and .graph_view_toolbar
     respectively.
@@ -67,10 +80,17 @@ class BWAPITool:
         self.loaded_modules: List[BW_MODULE] = []
         self.menu: Optional[QtWidgets.QMenu] = None
         self.callback_ids: List[int] = []
+        self.startup_times: Dict[str, float] = dict()
+
+        self._manifests: Dict[str, BWModuleManifest] = dict()
+        self._modules: Dict[str, BW_MODULE] = dict()
+        self._registered_settings: Set[str] = set()
 
         self._max_toolbars = 3  # Limit toolbars in memory
-        self._graph_view_ids: List[int] = []
-        self._graph_view_toolbar_list: dict[int, BWToolbar] = dict()
+        self._graph_view_toolbars: OrderedDict[int, BWToolbar] = OrderedDict()
+        self._graph_view_actions: Dict[str, QtGui.QAction] = dict()
+        self._graph_view_callback_id: Optional[int] = None
+        self._pending_manifests: List[BWModuleManifest] = []
         self._menu_object_name = "bw_tools_menu_obj"
         self._menu_label = " BW Tools"
 
@@ -112,26 +132,63 @@ class BWAPITool:
 
     def get_graph_view_toolbar(self, graph_view_id: int) -> BWToolbar:
         try:
-            toolbar = self._graph_view_toolbar_list[graph_view_id]
+            toolbar = self._graph_view_toolbars[graph_view_id]
         except KeyError:
-            toolbar = BWToolbar(self.main_window)
-            icon = Path(__file__).parent / "resources/bw_tools_icon.png"
-            self.ui_mgr.addToolbarToGraphView(
-                graph_view_id,
-                toolbar,
-                icon=QtGui.QIcon(str(icon.resolve())),
-                tooltip="BW Toolbar",
+            pass
+        else:
+            self._graph_view_toolbars.move_to_end(graph_view_id)
+            return toolbar
+
+        toolbar = BWToolbar(self.main_window)
+        self.ui_mgr.addToolbarToGraphView(
+            graph_view_id,
+            toolbar,
+            icon=bw_resources.get_icon(Path(__file__).parent / "resources/bw_tools_icon.png"),
+            tooltip="BW Toolbar",
+        )
+        self._graph_view_toolbars[graph_view_id] = toolbar
+
+        # Maintain a limited number of toolbars since new ones
+        # are continously created when the user switches graphs.
+        # The least recently used toolbar is forgotten first
+        if len(self._graph_view_toolbars) > self._max_toolbars:
+            self._graph_view_toolbars.popitem(last=False)
+
+        return toolbar
+
+    def add_graph_view_action(self, action_id: str, action: QtGui.QAction):
+        """
+        Adds the action to the toolbar of every graph view, including those
+        created later. The same QAction is shared by every toolbar, so it
+        is only constructed once.
+        """
+        if action_id in self._graph_view_actions:
+            return
+
+        self._graph_view_actions[action_id] = action
+        for toolbar in self._graph_view_toolbars.values():
+            toolbar.add_action(action_id, action)
+        self._register_graph_view_callback()
+
+    def get_graph_view_action(self, action_id: str) -> Optional[QtGui.QAction]:
+        return self._graph_view_actions.get(action_id)
+
+    def _register_graph_view_callback(self):
+        if self._graph_view_callback_id is None:
+            self._graph_view_callback_id = self.register_on_graph_view_created_callback(
+                self._on_graph_view_created
             )
-            self._graph_view_toolbar_list[graph_view_id] = toolbar
-            self._graph_view_ids.append(graph_view_id)
 
-            # Maintain a limited number of toolbars since new ones
-            # are continously created when the user switches graphs
-            if len(self._graph_view_ids) == self._max_toolbars:
-                id = self._graph_view_ids.pop(0)
-                del self._graph_view_toolbar_list[id]
+    def _on_graph_view_created(self, graph_view_id: int):
+        # Actions from manifests are built when the first graph view is
+        # created, rather than when the plugin loads
+        for manifest in self._pending_manifests:
+            self._add_manifest_actions(manifest)
+        self._pending_manifests.clear()
 
-        return toolbar
+        toolbar = self.get_graph_view_toolbar(graph_view_id)
+        for action_id, action in self._graph_view_actions.items():
+            toolbar.add_action(action_id, action)
 
     def initialize_logger(self):
         self.logger = logging.getLogger("bw_tools")
@@ -144,6 +201,176 @@ class BWAPITool:
         self.logger.removeHandler(self.log_handler)
         self.log_handler = None
 
+    def get_settings_file_path(self, module_name: str) -> Path:
+        return Path(__file__).parent.joinpath(
+            "..",
+            "modules",
+            module_name,
+            f"{module_name}_settings.json",
+        )
+
+    def register_modules(self, modules_dir: Path):
+        """
+        Registers every module inside the modules folder, reading their
+        manifests from the manifest cache when it is up to date.
+        """
+        start = time.perf_counter()
+        modules_manifest, from_cache = bw_manifest_cache.load(modules_dir)
+        self.startup_times["bw_modules_manifest"] = time.perf_counter() - start
+        if not from_cache:
+            self.logger.info("Module manifest was missing or out of date. Discovered modules instead")
+
+        for manifest in modules_manifest.manifests:
+            start = time.perf_counter()
+            self.register_manifest(manifest)
+            self.startup_times[manifest.name] = time.perf_counter() - start
+
+        for name in modules_manifest.eager_modules:
+            self.register_module(name)
+
+    def register_module(self, name: str) -> bool:
+        """
+        Registers the module with the given name, from its manifest if it
+        declares one, otherwise by importing and initializing it. The time
+        taken is recorded in .startup_times.
+        """
+        start = time.perf_counter()
+        try:
+            package = importlib.import_module(f"bw_tools.modules.{name}")
+        except ModuleNotFoundError:
+            self.logger.error(f"Failed to import module bw_tools.modules.{name}")
+            return False
+
+        manifest = getattr(package, "MANIFEST", None)
+        if manifest is not None:
+            result = self.register_manifest(manifest)
+        else:
+            module_path = f"bw_tools.modules.{name}.{name}"
+            self.logger.debug(f"Attempting to initialize {module_path}...")
+            try:
+                module = importlib.import_module(module_path)
+            except ModuleNotFoundError:
+                self.logger.error(f"Failed to import module {module_path}")
+                return False
+            result = self.initialize(module)
+
+        self.startup_times[name] = time.perf_counter() - start
+        return result
+
+    def log_startup_times(self):
+        total = sum(self.startup_times.values())
+        report = f"Plugin loaded in {total * 1000:.1f}ms"
+        for name, duration in sorted(self.startup_times.items(), key=lambda item: item[1], reverse=True):
+            report += f"\n\t{name}: {duration * 1000:.1f}ms"
+        self.logger.info(report)
+
+    def register_manifest(self, manifest: BWModuleManifest) -> bool:
+        """
+        Creates the toolbar actions and menu entries of a module from its
+        manifest, without importing the module.
+        """
+        if manifest.name in self.loaded_modules:
+            return False
+
+        self._manifests[manifest.name] = manifest
+        self.loaded_modules.append(manifest.name)
+
+        if manifest.has_settings:
+            if manifest.default_settings is not None:
+                self._register_settings(manifest.name, manifest.default_settings)
+            else:
+                # The defaults are only available from the module itself
+                self.load_module(manifest.name)
+
+        for entry in manifest.menu_entries:
+            action = self.menu.addAction(entry.label)
+            action.setMenuRole(QtGui.QAction.NoRole)
+            action.setToolTip(entry.tooltip)
+            action.triggered.connect(self._get_module_callback(manifest.name, entry.callback))
+
+        if manifest.actions:
+            self._pending_manifests.append(manifest)
+            self._register_graph_view_callback()
+            settings_registry.subscribe(
+                self.get_settings_file_path(manifest.name),
+                partial(self._update_manifest_actions, manifest=manifest),
+            )
+
+        self.logger.info(f"Registered module {manifest.name}")
+        return True
+
+    def load_module(self, name: str) -> BW_MODULE:
+        """
+        Returns the module with the given name, importing it and validating
+        its settings the first time it is requested.
+        """
+        try:
+            return self._modules[name]
+        except KeyError:
+            pass
+
+        start = time.perf_counter()
+        module = importlib.import_module(self._manifests[name].module_path)
+        self._initialize_settings(name, module)
+        self._modules[name] = module
+        self.logger.info(f"Loaded module {name} in {(time.perf_counter() - start) * 1000:.1f}ms")
+        return module
+
+    def run_module_callback(self, name: str, callback: str):
+        module = self.load_module(name)
+        getattr(module, callback)(self)
+
+    def _get_module_callback(self, name: str, callback: str):
+        return lambda: self.run_module_callback(name, callback)
+
+    def _get_hotkey(self, manifest: BWModuleManifest, action_manifest: BWActionManifest) -> str:
+        """
+        Returns the validated hotkey, which is the default value if the
+        setting is missing from the settings file.
+        """
+        file_path = self.get_settings_file_path(manifest.name)
+        setting = f"{action_manifest.hotkey_setting};value"
+        values = settings_store.values(file_path)
+        if setting not in values:
+            # No schema has been registered yet, so the default is only
+            # available from the module itself
+            self.load_module(manifest.name)
+            values = settings_store.values(file_path)
+        return values[setting]
+
+    def _add_manifest_actions(self, manifest: BWModuleManifest):
+        module_dir = Path(__file__).parent / ".." / "modules" / manifest.name
+
+        for action_manifest in manifest.actions:
+            action = QtGui.QAction()
+            if action_manifest.text is not None:
+                action.setText(action_manifest.text)
+            if action_manifest.icon is not None:
+                action.setIcon(bw_resources.get_icon(module_dir / action_manifest.icon))
+            self._set_manifest_action_hotkey(action, manifest, action_manifest)
+            action.triggered.connect(self._get_module_callback(manifest.name, action_manifest.callback))
+            self.add_graph_view_action(action_manifest.id, action)
+
+    def _update_manifest_actions(self, manifest: BWModuleManifest):
+        for action_manifest in manifest.actions:
+            action = self.get_graph_view_action(action_manifest.id)
+            if action is not None:
+                self._set_manifest_action_hotkey(action, manifest, action_manifest)
+
+    def _set_manifest_action_hotkey(
+        self,
+        action: QtGui.QAction,
+        manifest: BWModuleManifest,
+        action_manifest: BWActionManifest,
+    ):
+        if action_manifest.hotkey_setting is None:
+            action.setToolTip(action_manifest.tooltip)
+            return
+
+        hotkey = self._get_hotkey(manifest, action_manifest)
+        action.setShortcut(QtGui.QKeySequence(hotkey))
+        action.setToolTip(action_manifest.tooltip.format(hotkey=hotkey))
+
     def initialize(self, module: BW_MODULE) -> bool:
         """Initialize a module by calling the modules .on_initialize()"""
         if module.__name__ not in self.loaded_modules:
@@ -159,24 +386,33 @@ class BWAPITool:
             name = module.__name__.split(".")[-1]  # Strips module path and returns the name
             self.loaded_modules.append(name)
             self.logger.info(f"Initialized module {name}")
+            self._initialize_settings(name, module)
+            return True
 
-            try:
-                default_settings = module.get_default_settings()
-            except AttributeError:
-                pass
-            else:
-                module_settings = Path(__file__).parent.joinpath(
-                    "..",
-                    "modules",
-                    name,
-                    f"{name}_settings.json",
-                )
-                if not module_settings.exists():
-                    self.logger.info(f"Missing settings file for {name}. " "Writing new one")
-                    with open(str(module_settings.resolve()), "w") as settings_file:
-                        json.dump(default_settings, settings_file, indent=4)
+    def _initialize_settings(self, name: str, module: BW_MODULE):
+        if name in self._registered_settings:
+            return
 
-            return True
+        try:
+            default_settings = module.get_default_settings()
+        except AttributeError:
+            return
+        self._register_settings(name, default_settings)
+
+    def _register_settings(self, name: str, default_settings: Dict):
+        module_settings = self.get_settings_file_path(name)
+        if not module_settings.exists():
+            self._write_default_settings(name, default_settings)
+
+        # Validate the settings file once, when the plugin loads
+        for error in settings_store.register_schema(module_settings, default_settings):
+            self.logger.warning(f"Invalid setting in {name}: {error}. Using the default value")
+        self._registered_settings.add(name)
+
+    def _write_default_settings(self, name: str, default_settings: Dict):
+        self.logger.info(f"Missing settings file for {name}. " "Writing new one")
+        with open(str(self.get_settings_file_path(name).resolve()), "w") as settings_file:
+            json.dump(default_settings, settings_file, indent=4)
 
     def unload(self, module: BW_MODULE) -> bool:
         if module.__name__ not in self.loaded_modules:
@@ -202,5 +438,7 @@ class BWAPITool:
         return graph_view_id
 
     def remove_toolbars(self):
-        for toolbar in self._graph_view_toolbar_list.values():
+        for toolbar in self._graph_view_toolbars.values():
             toolbar.deleteLater()
+        self._graph_view_toolbars.clear()
+        self._graph_view_actions.clear()
@@ -0,0 +1,229 @@
+"""
+Collapses chains of dot nodes, reconnecting the start of each chain
+directly to the nodes at its end. Either every dot node downstream of a set
+of nodes is collapsed, or only the dot nodes in a given set.
+
+The chains are found with a single iterative pass, which only asks the API
+for the definition id of each node it visits. The rewiring is
+computed before the graph is modified, so it can be inspected, or used to
+plan on the graph as if the dot nodes had already been removed, before it
+is applied.
+"""
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sd.api.sdconnection import SDConnection
+from sd.api.sdgraph import SDGraph
+from sd.api.sdnode import SDNode
+from sd.api.sdproperty import SDPropertyCategory
+
+from .bw_api_tool import CompNodeID, FunctionNodeId
+
+DOT_NODE_IDS = frozenset((CompNodeID.DOT.value, FunctionNodeId.DOT.value))
+
+
+def is_dot_node(api_node: SDNode) -> bool:
+    return api_node.getDefinition().getId() in DOT_NODE_IDS
+
+
+@dataclass
+class BWRewiredConnection:
+    source_identifier: int
+    source: SDNode = field(repr=False)
+    source_property_id: str
+    target: SDNode = field(repr=False)
+    target_property_id: str
+
+
+@dataclass
+class BWDotChainCollapse:
+    """
+    The dot nodes to delete, keyed by identifier, and the connections to
+    make in their place. Nothing is modified until apply() is called.
+    """
+
+    dot_nodes: Dict[int, SDNode] = field(default_factory=dict)
+    connections: List[BWRewiredConnection] = field(default_factory=list)
+    # Connections to or from the dot nodes, removed when they are deleted
+    deleted_connection_count: int = 0
+
+    _connections_by_source: Optional[Dict[int, List[BWRewiredConnection]]] = field(
+        init=False, default=None, repr=False
+    )
+
+    @property
+    def deleted_identifiers(self) -> Set[int]:
+        return set(self.dot_nodes)
+
+    def connections_by_source(self) -> Dict[int, List[BWRewiredConnection]]:
+        """Returns the connections to make, keyed by source node identifier"""
+        if self._connections_by_source is None:
+            self._connections_by_source = dict()
+            for connection in self.connections:
+                self._connections_by_source.setdefault(connection.source_identifier, []).append(connection)
+        return self._connections_by_source
+
+    def apply(self, graph: SDGraph):
+        # An input only accepts one connection, so connecting first
+        # replaces the connection from the dot node at the end of the chain
+        for connection in self.connections:
+            connection.source.newPropertyConnectionFromId(
+                connection.source_property_id,
+                connection.target,
+                connection.target_property_id,
+            )
+        for dot_node in self.dot_nodes.values():
+            graph.deleteNode(dot_node)
+
+
+def _connections(api_node: SDNode, category: SDPropertyCategory) -> List[Tuple[str, SDConnection]]:
+    connections = []
+    for api_property in api_node.getProperties(category):
+        if not api_property.isConnectable():
+            continue
+        property_id = api_property.getId()
+        for connection in api_node.getPropertyConnections(api_property):
+            connections.append((property_id, connection))
+    return connections
+
+
+def _output_connections(api_node: SDNode) -> List[Tuple[str, SDConnection]]:
+    return _connections(api_node, SDPropertyCategory.Output)
+
+
+def plan_collapse_output_dot_nodes(api_nodes: Iterable[SDNode]) -> BWDotChainCollapse:
+    """
+    Returns the collapse of every dot node downstream of the given nodes.
+
+    Dot nodes in api_nodes are only collapsed if they are downstream of
+    another node in api_nodes. Otherwise they are the start of a chain and
+    are reconnected to its end.
+    """
+    collapse = BWDotChainCollapse()
+
+    # A dot node has a single input, so each dot node has one parent,
+    # stored as the node and output property id it is connected from
+    parents: Dict[int, Tuple[int, SDNode, str]] = dict()
+    # Connections to nodes which are not dot nodes. Whether the node they
+    # come from is deleted is only known once the traversal is done, since
+    # a dot node in api_nodes may be visited before the node upstream of it
+    chain_ends: List[Tuple[int, SDConnection, SDNode]] = list()
+
+    stack = [(int(api_node.getIdentifier()), api_node) for api_node in api_nodes]
+    visited = set()
+    while stack:
+        identifier, api_node = stack.pop()
+        if identifier in visited:
+            continue
+        visited.add(identifier)
+
+        for property_id, connection in _output_connections(api_node):
+            target = connection.getInputPropertyNode()
+            target_identifier = int(target.getIdentifier())
+            if is_dot_node(target):
+                parents[target_identifier] = (identifier, api_node, property_id)
+                collapse.dot_nodes[target_identifier] = target
+                collapse.deleted_connection_count += 1
+                stack.append((target_identifier, target))
+            else:
+                chain_ends.append((identifier, connection, target))
+
+    chain_ends = [chain_end for chain_end in chain_ends if chain_end[0] in collapse.dot_nodes]
+    collapse.deleted_connection_count += len(chain_ends)
+    _rewire_chain_ends(collapse, parents, chain_ends)
+    return collapse
+
+
+def plan_collapse_dot_nodes(api_nodes: Iterable[SDNode]) -> BWDotChainCollapse:
+    """
+    Returns the collapse of the dot nodes in api_nodes. Other nodes are
+    ignored, as are dot nodes which are not in api_nodes, so a chain
+    running through them is reconnected to them instead.
+
+    The nodes are read once. Dot nodes without an input are deleted
+    without reconnecting anything, along with the chains downstream of
+    them.
+    """
+    collapse = BWDotChainCollapse()
+    for api_node in api_nodes:
+        if is_dot_node(api_node):
+            collapse.dot_nodes[int(api_node.getIdentifier())] = api_node
+
+    parents: Dict[int, Tuple[int, SDNode, str]] = dict()
+    chain_ends: List[Tuple[int, SDConnection, SDNode]] = list()
+    for identifier, api_node in collapse.dot_nodes.items():
+        for _, connection in _connections(api_node, SDPropertyCategory.Input):
+            source = connection.getInputPropertyNode()
+            source_identifier = int(source.getIdentifier())
+            parents[identifier] = (
+                source_identifier,
+                source,
+                connection.getInputProperty().getId(),
+            )
+            # Counted once, from the dot node downstream of it
+            collapse.deleted_connection_count += 1
+
+        for _, connection in _output_connections(api_node):
+            target = connection.getInputPropertyNode()
+            if int(target.getIdentifier()) in collapse.dot_nodes:
+                continue
+            chain_ends.append((identifier, connection, target))
+            collapse.deleted_connection_count += 1
+
+    _rewire_chain_ends(collapse, parents, chain_ends)
+    return collapse
+
+
+def _rewire_chain_ends(
+    collapse: BWDotChainCollapse,
+    parents: Dict[int, Tuple[int, SDNode, str]],
+    chain_ends: List[Tuple[int, SDConnection, SDNode]],
+):
+    """
+    Connects the start of the chain of each chain end to its target. The
+    start of a chain is the closest parent which is not deleted. Each dot
+    node is only walked through once, since the start found for it is
+    stored for the dot nodes downstream of it.
+    """
+    chain_starts: Dict[int, Optional[Tuple[int, SDNode, str]]] = dict()
+    for identifier, connection, target in chain_ends:
+        path = []
+        start = None
+        while identifier in collapse.dot_nodes:
+            if identifier in chain_starts:
+                start = chain_starts[identifier]
+                break
+            path.append(identifier)
+            try:
+                identifier, api_node, property_id = parents[identifier]
+            except KeyError:
+                # The chain starts with a dot node which is not connected
+                start = None
+                break
+            start = (identifier, api_node, property_id)
+        for dot_identifier in path:
+            chain_starts[dot_identifier] = start
+
+        if start is None:
+            continue
+        source_identifier, source, source_property_id = start
+        collapse.connections.append(
+            BWRewiredConnection(
+                source_identifier,
+                source,
+                source_property_id,
+                target,
+                connection.getInputProperty().getId(),
+            )
+        )
+
+
+def collapse_output_dot_nodes(api_nodes: Iterable[SDNode], graph: SDGraph) -> Set[int]:
+    """
+    Deletes every dot node downstream of the given nodes, reconnecting the
+    start of each chain to its end. Returns the identifiers of the deleted
+    dot nodes.
+    """
+    collapse = plan_collapse_output_dot_nodes(api_nodes)
+    collapse.apply(graph)
+    return collapse.deleted_identifiers
@@ -0,0 +1,447 @@
+"""
+Compact json description of a graph, and a stand-in graph loaded from it.
+
+The format stores the nodes of a graph with their definition id, label,
+position and connectable properties, and every connection in order. It is
+exported from a live SDGraph inside Designer, and loaded into a stand-in
+graph which implements the part of the sd api used by BWNodeSelection, the
+layout aligners and the optimizers, so the tools can be run and timed
+outside of Designer.
+
+The output size of the graph and of each node, with its inheritance
+method, is always exported, since the optimizers read and change it.
+Other parameter values are only exported if asked for. Without them, the
+optimizers treat nodes with the same definition and the same inputs as
+duplicates.
+
+Like bw_manifest.py, this file must not import sd or PySide6. Property
+categories and inheritance methods are matched by name, so either the sd
+enums or their names can be passed to the stand-in graph.
+"""
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+GRAPH_FORMAT_VERSION = 1
+
+INPUT = "Input"
+OUTPUT = "Output"
+ANNOTATION = "Annotation"
+
+OUTPUT_SIZE = "$outputsize"
+
+# Definitions of the nodes the tools create, so the stand-in graph can
+# create them too
+_NEW_NODE_PROPERTIES = {
+    "sbs::compositing::passthrough": (["input"], ["unique_filter_output"]),
+    "sbs::function::passthrough": (["input"], ["unique_filter_output"]),
+}
+
+
+def to_json_value(value: Any) -> Any:
+    """
+    Returns the python value of an SDValue as something json can write.
+    Vectors and colors become lists, anything else unknown a string.
+    """
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    for components in (("x", "y", "z", "w"), ("r", "g", "b", "a")):
+        values = [getattr(value, c) for c in components if getattr(value, c, None) is not None]
+        if values:
+            return values
+    return str(value)
+
+
+def _enum_name(value: Any) -> Any:
+    return getattr(value, "name", value)
+
+
+def _get_category(category_name: str) -> Any:
+    try:
+        from sd.api.sdproperty import SDPropertyCategory
+    except ImportError:
+        # Exporting a stand-in graph outside of Designer
+        return category_name
+    return getattr(SDPropertyCategory, category_name)
+
+
+def _get_inheritance_method(method_name: Optional[str]) -> Any:
+    if method_name is None:
+        return None
+    try:
+        from sd.api.sdproperty import SDPropertyInheritanceMethod
+    except ImportError:
+        return method_name
+    return getattr(SDPropertyInheritanceMethod, method_name)
+
+
+def _get_value(api_object: Any, api_property: Any) -> Any:
+    value = api_object.getPropertyValue(api_property)
+    return None if value is None else to_json_value(value.get())
+
+
+def export_graph(graph: Any, include_values: bool = False) -> Dict:
+    """
+    Returns the description of a graph. Connections are listed in the
+    order of the nodes, their output properties and the connections of
+    each property, so the loaded graph returns them in the same order.
+    """
+    graph_values = dict()
+    output_size_property = graph.getPropertyFromId(OUTPUT_SIZE, _get_category(INPUT))
+    if output_size_property is not None:
+        graph_values[OUTPUT_SIZE] = _get_value(graph, output_size_property)
+
+    nodes = list()
+    connections = list()
+    for api_node in graph.getNodes():
+        identifier = api_node.getIdentifier()
+        pos = api_node.getPosition()
+        definition = api_node.getDefinition()
+        node = {
+            "identifier": identifier,
+            "definition_id": definition.getId(),
+            "label": definition.getLabel(),
+            "position": [pos.x, pos.y],
+            "inputs": [],
+            "outputs": [],
+            "values": {},
+            "inheritance": {},
+        }
+
+        for api_property in api_node.getProperties(_get_category(INPUT)):
+            property_id = api_property.getId()
+            if api_property.isConnectable():
+                node["inputs"].append(property_id)
+            elif include_values or property_id == OUTPUT_SIZE:
+                node["values"][property_id] = _get_value(api_node, api_property)
+
+            if property_id == OUTPUT_SIZE:
+                node["inheritance"][property_id] = _enum_name(api_node.getPropertyInheritanceMethod(api_property))
+
+        for api_property in api_node.getProperties(_get_category(OUTPUT)):
+            if not api_property.isConnectable():
+                continue
+            property_id = api_property.getId()
+            node["outputs"].append(property_id)
+            for connection in api_node.getPropertyConnections(api_property):
+                connections.append(
+                    [
+                        identifier,
+                        property_id,
+                        connection.getInputPropertyNode().getIdentifier(),
+                        connection.getInputProperty().getId(),
+                    ]
+                )
+        nodes.append(node)
+
+    return {
+        "format_version": GRAPH_FORMAT_VERSION,
+        "values": graph_values,
+        "nodes": nodes,
+        "connections": connections,
+    }
+
+
+def write_graph(graph: Any, file_path: Union[str, Path], include_values: bool = False):
+    with open(file_path, "w") as graph_file:
+        json.dump(export_graph(graph, include_values), graph_file)
+
+
+@dataclass
+class BWStandInFloat2:
+    x: float = 0.0
+    y: float = 0.0
+
+
+@dataclass
+class BWStandInVector:
+    """Stands in for the vector and color values, which json stores as lists"""
+
+    x: Any
+    y: Any
+    z: Any = None
+    w: Any = None
+
+
+@dataclass
+class BWStandInValue:
+    value: Any
+
+    def get(self) -> Any:
+        if isinstance(self.value, list) and 2 <= len(self.value) <= 4:
+            return BWStandInVector(*self.value)
+        return self.value
+
+
+@dataclass
+class BWStandInDefinition:
+    id: str
+    label: str
+
+    def getId(self) -> str:
+        return self.id
+
+    def getLabel(self) -> str:
+        return self.label
+
+
+@dataclass(eq=False)
+class BWStandInProperty:
+    id: str
+    category: str
+    connectable: bool = True
+
+    def getId(self) -> str:
+        return self.id
+
+    def isConnectable(self) -> bool:
+        return self.connectable
+
+
+@dataclass(eq=False)
+class BWStandInConnection:
+    """
+    A connection as seen from one of its ends. Like SDConnection, the
+    input property is the property at the other end and the output
+    property the one at this end.
+    """
+
+    node: "BWStandInNode"
+    property: BWStandInProperty
+    other_node: "BWStandInNode"
+    other_property: BWStandInProperty
+
+    def getInputPropertyNode(self) -> "BWStandInNode":
+        return self.other_node
+
+    def getInputProperty(self) -> BWStandInProperty:
+        return self.other_property
+
+    def getOutputPropertyNode(self) -> "BWStandInNode":
+        return self.node
+
+    def getOutputProperty(self) -> BWStandInProperty:
+        return self.property
+
+
+@dataclass(eq=False)
+class BWStandInNode:
+    identifier: str
+    definition: BWStandInDefinition
+    position: BWStandInFloat2
+    properties: Dict[str, List[BWStandInProperty]] = field(default_factory=dict)
+    values: Dict[str, Any] = field(default_factory=dict)
+    inheritance_methods: Dict[str, Any] = field(default_factory=dict)
+
+    # Connections of each property, keyed by property object
+    _connections: Dict[int, List[BWStandInConnection]] = field(init=False, default_factory=dict, repr=False)
+
+    def getIdentifier(self) -> str:
+        return self.identifier
+
+    def getDefinition(self) -> BWStandInDefinition:
+        return self.definition
+
+    def getPosition(self) -> BWStandInFloat2:
+        return BWStandInFloat2(self.position.x, self.position.y)
+
+    def setPosition(self, position: Any):
+        self.position = BWStandInFloat2(position.x, position.y)
+
+    def getProperties(self, category: Any) -> List[BWStandInProperty]:
+        return list(self.properties.get(_enum_name(category), []))
+
+    def getPropertyFromId(self, property_id: str, category: Any) -> Optional[BWStandInProperty]:
+        for api_property in self.properties.get(_enum_name(category), []):
+            if api_property.id == property_id:
+                return api_property
+        return None
+
+    def getPropertyConnections(self, api_property: BWStandInProperty) -> List[BWStandInConnection]:
+        return list(self._connections.get(id(api_property), []))
+
+    def getPropertyGraph(self, api_property: BWStandInProperty) -> None:
+        return None
+
+    def getReferencedResource(self) -> None:
+        return None
+
+    def getPropertyValue(self, api_property: BWStandInProperty) -> Optional[BWStandInValue]:
+        return self.getInputPropertyValueFromId(api_property.id)
+
+    def getInputPropertyValueFromId(self, property_id: str) -> Optional[BWStandInValue]:
+        try:
+            return BWStandInValue(self.values[property_id])
+        except KeyError:
+            return None
+
+    def setPropertyValue(self, api_property: BWStandInProperty, value: Any):
+        self.values[api_property.id] = to_json_value(value.get())
+
+    def getPropertyInheritanceMethod(self, api_property: BWStandInProperty) -> Any:
+        return self.getInputPropertyInheritanceMethodFromId(api_property.id)
+
+    def getInputPropertyInheritanceMethodFromId(self, property_id: str) -> Any:
+        return _get_inheritance_method(self.inheritance_methods.get(property_id))
+
+    def setPropertyInheritanceMethod(self, api_property: BWStandInProperty, inheritance_method: Any):
+        self.inheritance_methods[api_property.id] = _enum_name(inheritance_method)
+
+    def newPropertyConnection(
+        self,
+        api_property: BWStandInProperty,
+        target: "BWStandInNode",
+        target_property: BWStandInProperty,
+    ) -> BWStandInConnection:
+        # An input only accepts one connection
+        for existing in target.getPropertyConnections(target_property):
+            existing.other_node._remove_connection(existing.other_property, target, target_property)
+        target._connections[id(target_property)] = list()
+
+        connection = BWStandInConnection(self, api_property, target, target_property)
+        self._connections.setdefault(id(api_property), []).append(connection)
+        target._connections[id(target_property)].append(
+            BWStandInConnection(target, target_property, self, api_property)
+        )
+        return connection
+
+    def newPropertyConnectionFromId(
+        self,
+        property_id: str,
+        target: "BWStandInNode",
+        target_property_id: str,
+    ) -> BWStandInConnection:
+        api_property = self.getPropertyFromId(property_id, OUTPUT)
+        target_property = target.getPropertyFromId(target_property_id, INPUT)
+        if api_property is None or target_property is None:
+            raise ValueError(
+                f"Can not connect {self.identifier}.{property_id} to {target.identifier}.{target_property_id}"
+            )
+        return self.newPropertyConnection(api_property, target, target_property)
+
+    def _remove_connection(
+        self,
+        api_property: BWStandInProperty,
+        other_node: "BWStandInNode",
+        other_property: BWStandInProperty,
+    ):
+        self._connections[id(api_property)] = [
+            c
+            for c in self._connections.get(id(api_property), [])
+            if c.other_node is not other_node or c.other_property is not other_property
+        ]
+
+    def _disconnect_all(self):
+        for category_properties in self.properties.values():
+            for api_property in category_properties:
+                for connection in self._connections.get(id(api_property), []):
+                    connection.other_node._remove_connection(connection.other_property, self, api_property)
+        self._connections.clear()
+
+
+@dataclass
+class BWStandInGraph:
+    """
+    Stands in for an SDGraph. It is not an SDSBSFunctionGraph, so the
+    tools treat it as a compositing graph.
+    """
+
+    nodes: Dict[str, BWStandInNode] = field(default_factory=dict)
+    values: Dict[str, Any] = field(default_factory=dict)
+
+    def getPropertyFromId(self, property_id: str, category: Any) -> Optional[BWStandInProperty]:
+        if _enum_name(category) != INPUT or property_id not in self.values:
+            return None
+        return BWStandInProperty(property_id, INPUT, connectable=False)
+
+    def getPropertyValue(self, api_property: BWStandInProperty) -> Optional[BWStandInValue]:
+        return self.getPropertyValueFromId(api_property.id, api_property.category)
+
+    def getPropertyValueFromId(self, property_id: str, category: Any) -> Optional[BWStandInValue]:
+        if _enum_name(category) != INPUT or property_id not in self.values:
+            return None
+        return BWStandInValue(self.values[property_id])
+
+    def setPropertyValue(self, api_property: BWStandInProperty, value: Any):
+        self.values[api_property.id] = to_json_value(value.get())
+
+    def getNodes(self) -> List[BWStandInNode]:
+        return list(self.nodes.values())
+
+    def getNodeFromId(self, identifier: str) -> Optional[BWStandInNode]:
+        return self.nodes.get(str(identifier))
+
+    def newNode(self, definition_id: str) -> BWStandInNode:
+        inputs, outputs = _NEW_NODE_PROPERTIES.get(definition_id, ([], []))
+        identifier = str(max((int(i) for i in self.nodes), default=0) + 1)
+        node = _new_node(identifier, definition_id, definition_id, [0.0, 0.0], inputs, outputs)
+        self.nodes[identifier] = node
+        return node
+
+    def deleteNode(self, node: BWStandInNode):
+        node._disconnect_all()
+        del self.nodes[node.identifier]
+
+
+def _new_node(
+    identifier: str,
+    definition_id: str,
+    label: str,
+    position: List[float],
+    inputs: List[str],
+    outputs: List[str],
+    values: Optional[Dict[str, Any]] = None,
+    inheritance_methods: Optional[Dict[str, str]] = None,
+) -> BWStandInNode:
+    values = values or dict()
+    input_properties = [BWStandInProperty(i, INPUT) for i in inputs]
+    input_properties.extend(BWStandInProperty(i, INPUT, connectable=False) for i in values)
+    return BWStandInNode(
+        identifier,
+        BWStandInDefinition(definition_id, label),
+        BWStandInFloat2(*position),
+        {
+            INPUT: input_properties,
+            OUTPUT: [BWStandInProperty(o, OUTPUT) for o in outputs],
+            ANNOTATION: [],
+        },
+        dict(values),
+        dict(inheritance_methods or {}),
+    )
+
+
+def from_dict(data: Dict) -> BWStandInGraph:
+    """Raises ValueError if the data was written by a different version"""
+    if data.get("format_version") != GRAPH_FORMAT_VERSION:
+        raise ValueError("Unsupported graph format version")
+
+    graph = BWStandInGraph(values=dict(data.get("values", {})))
+    try:
+        for node in data["nodes"]:
+            graph.nodes[node["identifier"]] = _new_node(
+                node["identifier"],
+                node["definition_id"],
+                node["label"],
+                node["position"],
+                node["inputs"],
+                node["outputs"],
+                node.get("values"),
+                node.get("inheritance"),
+            )
+        for source_id, source_property_id, target_id, target_property_id in data["connections"]:
+            graph.nodes[source_id].newPropertyConnectionFromId(
+                source_property_id, graph.nodes[target_id], target_property_id
+            )
+    except (KeyError, TypeError, AttributeError) as e:
+        raise ValueError(f"Invalid graph: {e}")
+    return graph
+
+
+def load_graph(file_path: Union[str, Path]) -> BWStandInGraph:
+    """
+    Raises FileNotFoundError if the file does not exist and ValueError if
+    it is invalid.
+    """
+    with open(file_path) as graph_file:
+        return from_dict(json.load(graph_file))
@@ -0,0 +1,61 @@
+"""
+Lightweight description of a module, used to register its toolbar actions
+and menu entries when the plugin loads without importing the module itself.
+
+A module declares its manifest as MANIFEST inside the __init__.py of its
+package, for example bw_tools/modules/my_module/__init__.py. The module
+my_module.py is only imported the first time one of its actions is
+triggered, at which point the named callback is called with the BWAPITool.
+
+This file must not import sd or PySide6, so that reading a manifest stays
+cheap.
+"""
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+
+@dataclass
+class BWActionManifest:
+    """
+    An action added to every graph view toolbar.
+
+    The tooltip may contain {hotkey}, which is replaced with the current
+    value of the hotkey setting. hotkey_setting is the name of the setting
+    inside the modules settings file, for example "Hotkey".
+    """
+
+    id: str
+    callback: str
+    tooltip: str = ""
+    icon: Optional[str] = None  # Relative to the module folder
+    text: Optional[str] = None
+    hotkey_setting: Optional[str] = None
+
+
+@dataclass
+class BWMenuEntryManifest:
+    """An action added to the BW Tools menu"""
+
+    label: str
+    callback: str
+    tooltip: str = ""
+
+
+@dataclass
+class BWModuleManifest:
+    """
+    has_settings must be True if the module defines get_default_settings(),
+    so its settings file can be written the first time the plugin loads.
+    default_settings is filled in by bw_manifest_cache.py and does not need
+    to be declared.
+    """
+
+    name: str
+    has_settings: bool = False
+    actions: List[BWActionManifest] = field(default_factory=list)
+    menu_entries: List[BWMenuEntryManifest] = field(default_factory=list)
+    default_settings: Optional[Dict] = None
+
+    @property
+    def module_path(self) -> str:
+        return f"bw_tools.modules.{self.name}.{self.name}"
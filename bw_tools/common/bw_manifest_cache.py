@@ -0,0 +1,189 @@
+"""
+Single json file describing every module inside bw_tools/modules, so the
+plugin can register all modules with one file read instead of listing the
+modules folder and importing each module package.
+
+The file is written by generate_sdplugin_file.py when packaging the plugin,
+and rewritten at runtime whenever it is missing or stale. A manifest written
+at runtime records the modification time of the modules folder and of each
+module, and is stale if any of them change. A packaged manifest records no
+fingerprint and is always trusted, since the files of an installed plugin
+are not edited.
+
+Like bw_manifest.py, this file must not import sd or PySide6, so it can be
+used outside of Designer.
+"""
+import ast
+import importlib
+import json
+import os
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .bw_manifest import BWActionManifest, BWMenuEntryManifest, BWModuleManifest
+
+MANIFEST_FILE_NAME = "bw_modules_manifest.json"
+MANIFEST_FORMAT_VERSION = 1
+
+
+@dataclass
+class BWModulesManifest:
+    manifests: List[BWModuleManifest] = field(default_factory=list)
+    # Modules without a manifest, which must be imported on startup
+    eager_modules: List[str] = field(default_factory=list)
+    fingerprint: Optional[Dict[str, int]] = None
+
+
+def get_manifest_path(modules_dir: Path) -> Path:
+    # Written next to the modules folder, so writing it does not change
+    # the modification time of the folder
+    return modules_dir.parent / MANIFEST_FILE_NAME
+
+
+def list_module_names(modules_dir: Path) -> List[str]:
+    return sorted(
+        name for name in os.listdir(modules_dir) if name.startswith("bw_") and (modules_dir / name).is_dir()
+    )
+
+
+def read_default_settings(module_file: Path) -> Optional[Dict]:
+    """
+    Returns the dictionary returned by get_default_settings() in the given
+    module file, without importing it. Returns None if the module does not
+    define the function, or it does not return a literal dictionary.
+    """
+    try:
+        tree = ast.parse(module_file.read_text(), str(module_file))
+    except (OSError, SyntaxError):
+        return None
+
+    for node in tree.body:
+        if not isinstance(node, ast.FunctionDef) or node.name != "get_default_settings":
+            continue
+        for statement in node.body:
+            if isinstance(statement, ast.Return) and statement.value is not None:
+                try:
+                    return ast.literal_eval(statement.value)
+                except ValueError:
+                    return None
+    return None
+
+
+def discover(modules_dir: Path) -> BWModulesManifest:
+    """
+    Builds the manifest by importing the package of every module. The
+    modules themselves are not imported.
+    """
+    modules_manifest = BWModulesManifest()
+    for name in list_module_names(modules_dir):
+        try:
+            package = importlib.import_module(f"bw_tools.modules.{name}")
+        except ModuleNotFoundError:
+            continue
+
+        manifest: Optional[BWModuleManifest] = getattr(package, "MANIFEST", None)
+        if manifest is None:
+            modules_manifest.eager_modules.append(name)
+            continue
+
+        if manifest.has_settings and manifest.default_settings is None:
+            manifest.default_settings = read_default_settings(modules_dir / name / f"{name}.py")
+        modules_manifest.manifests.append(manifest)
+    return modules_manifest
+
+
+def get_fingerprint(modules_dir: Path, module_names: List[str]) -> Dict[str, int]:
+    fingerprint = {".": os.stat(modules_dir).st_mtime_ns}
+    for name in module_names:
+        module_dir = modules_dir / name
+        fingerprint[name] = max(
+            os.stat(path).st_mtime_ns
+            for path in (module_dir / "__init__.py", module_dir / f"{name}.py")
+            if path.exists()
+        )
+    return fingerprint
+
+
+def _module_names(modules_manifest: BWModulesManifest) -> List[str]:
+    return [m.name for m in modules_manifest.manifests] + modules_manifest.eager_modules
+
+
+def is_stale(modules_dir: Path, modules_manifest: BWModulesManifest) -> bool:
+    if modules_manifest.fingerprint is None:
+        return False
+
+    try:
+        fingerprint = get_fingerprint(modules_dir, _module_names(modules_manifest))
+    except (OSError, ValueError):
+        return True
+    return fingerprint != modules_manifest.fingerprint
+
+
+def to_dict(modules_manifest: BWModulesManifest) -> Dict:
+    return {
+        "format_version": MANIFEST_FORMAT_VERSION,
+        "fingerprint": modules_manifest.fingerprint,
+        "modules": [asdict(manifest) for manifest in modules_manifest.manifests],
+        "eager_modules": modules_manifest.eager_modules,
+    }
+
+
+def from_dict(data: Dict) -> BWModulesManifest:
+    """Raises ValueError if the data was written by a different version"""
+    if data.get("format_version") != MANIFEST_FORMAT_VERSION:
+        raise ValueError("Unsupported manifest format version")
+
+    try:
+        manifests = [
+            BWModuleManifest(
+                **{
+                    **module,
+                    "actions": [BWActionManifest(**action) for action in module["actions"]],
+                    "menu_entries": [BWMenuEntryManifest(**entry) for entry in module["menu_entries"]],
+                }
+            )
+            for module in data["modules"]
+        ]
+        return BWModulesManifest(manifests, list(data["eager_modules"]), data["fingerprint"])
+    except (KeyError, TypeError) as e:
+        raise ValueError(f"Invalid manifest: {e}")
+
+
+def write(file_path: Path, modules_manifest: BWModulesManifest):
+    with open(file_path, "w") as manifest_file:
+        json.dump(to_dict(modules_manifest), manifest_file, indent=4)
+
+
+def read(file_path: Path) -> BWModulesManifest:
+    """
+    Raises FileNotFoundError if the file does not exist and ValueError if
+    it is invalid.
+    """
+    with open(file_path) as manifest_file:
+        return from_dict(json.load(manifest_file))
+
+
+def load(modules_dir: Path) -> Tuple[BWModulesManifest, bool]:
+    """
+    Returns the manifest of every module and whether it was read from the
+    cached file. Falls back to discovering the modules if the file is
+    missing, invalid or stale, and rewrites it.
+    """
+    file_path = get_manifest_path(modules_dir)
+    try:
+        modules_manifest = read(file_path)
+    except (OSError, ValueError):
+        pass
+    else:
+        if not is_stale(modules_dir, modules_manifest):
+            return modules_manifest, True
+
+    modules_manifest = discover(modules_dir)
+    modules_manifest.fingerprint = get_fingerprint(modules_dir, _module_names(modules_manifest))
+    try:
+        write(file_path, modules_manifest)
+    except OSError:
+        # The plugin may be installed somewhere read only
+        pass
+    return modules_manifest, False
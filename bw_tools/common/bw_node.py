@@ -9,6 +9,22 @@ from sd.api.sdproperty import SDProperty, SDPropertyCategory
 
 from .bw_api_tool import CompNodeID, FunctionNodeId
 
+NODE_WIDTH = 96.0
+NODE_MIN_HEIGHT = 96.0
+NODE_MIN_HEIGHT_SLOT_COUNT = 3
+SLOT_HEIGHT = 10.7  # Added to each side of the node for every extra slot
+
+
+def get_node_height(slot_count: int) -> float:
+    """
+    Returns the height of a node, where slot_count is the larger of its
+    connectable input and output property counts
+    """
+    if slot_count <= NODE_MIN_HEIGHT_SLOT_COUNT:
+        return NODE_MIN_HEIGHT
+    delta = slot_count - NODE_MIN_HEIGHT_SLOT_COUNT
+    return NODE_MIN_HEIGHT + ((SLOT_HEIGHT * delta) * 2)
+
 
 @dataclass
 class BWFloat2:
@@ -64,18 +80,12 @@ class BWNode:
             self.input_connectable_properties_count,
             self.output_connectable_properties_count,
         )
-        if connections < 4:
-            self._height = 96.0
-            return self._height
-        else:
-            # adding a slot added 10.7 to a side
-            delta = connections - 3
-            self._height = 96.0 + ((10.7 * delta) * 2)
-            return self._height
+        self._height = get_node_height(connections)
+        return self._height
 
     @property
     def width(self) -> float:
-        return 96.0
+        return NODE_WIDTH
 
     @property
     def output_nodes(self) -> Tuple["BWNode"]:
@@ -5,8 +5,8 @@ from typing import Dict, List, Tuple, Union
 from sd.api.sdconnection import SDConnection
 from sd.api.sdgraph import SDGraph
 from sd.api.sdnode import SDNode
-from sd.api.sdproperty import SDProperty, SDPropertyCategory
 
+from .bw_dot_chain import plan_collapse_dot_nodes
 from .bw_node import BWInputConnectionData, BWNode, BWOutputConnectionData
 
 
@@ -123,40 +123,27 @@ class BWNodeSelection(NodeGroupInterface):
                 node.add_output_connection_data(connection_data)
 
 
-def remove_dot_nodes(api_nodes: List[SDNode], api_graph: SDGraph) -> List[SDNode]:
+@dataclass
+class BWDotNodeRemoval:
+    """The nodes left after removing the dot nodes, and what was removed"""
+
+    api_nodes: List[SDNode]
+    deleted_node_count: int = 0
+    deleted_connection_count: int = 0
+    new_connection_count: int = 0
+
+
+def remove_dot_nodes(api_nodes: List[SDNode], api_graph: SDGraph) -> BWDotNodeRemoval:
     """
-    Removes all dot nodes in the selection
+    Removes all dot nodes in the selection, reconnecting the nodes on
+    either side of each chain of dot nodes.
     """
-    api_nodes = [n for n in api_nodes]
-    dot_nodes = list()
-    for api_node in api_nodes:
-        if api_node.getDefinition().getId() != "sbs::compositing::passthrough":
-            continue
-
-        # Get property the connection comes from
-        dot_node_input_property = api_node.getPropertyFromId("input", SDPropertyCategory.Input)
-        dot_node_input_connection: SDConnection = api_node.getPropertyConnections(dot_node_input_property)[0]
-
-        output_node_property: SDProperty = dot_node_input_connection.getInputProperty()
-        output_node: SDNode = dot_node_input_connection.getInputPropertyNode()
-
-        # Get property the connection goes too
-        dot_node_output_property = api_node.getPropertyFromId("unique_filter_output", SDPropertyCategory.Output)
-
-        dot_node_output_connections: SDConnection = api_node.getPropertyConnections(dot_node_output_property)
-        connection: SDConnection
-        for connection in dot_node_output_connections:
-            input_node_property: SDProperty = connection.getInputProperty()
-            input_node: SDNode = connection.getInputPropertyNode()
-
-            output_node.newPropertyConnectionFromId(
-                output_node_property.getId(),
-                input_node,
-                input_node_property.getId(),
-            )
-
-        api_graph.deleteNode(api_node)
-        dot_nodes.append(api_node)
-
-    api_nodes = [n for n in api_nodes if n not in dot_nodes]
-    return api_nodes
+    collapse = plan_collapse_dot_nodes(api_nodes)
+    collapse.apply(api_graph)
+
+    return BWDotNodeRemoval(
+        [api_node for api_node in api_nodes if int(api_node.getIdentifier()) not in collapse.dot_nodes],
+        len(collapse.dot_nodes),
+        collapse.deleted_connection_count,
+        len(collapse.connections),
+    )
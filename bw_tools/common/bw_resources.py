@@ -0,0 +1,54 @@
+"""
+Cache of the icons and images used by the plugin.
+
+Each resource is loaded from disk once per session. Scaled pixmaps are
+cached by path and size, so they are only rescaled the first time they are
+requested.
+"""
+from pathlib import Path
+from typing import Dict, Optional, Tuple, Union
+
+from PySide6.QtCore import Qt
+from PySide6.QtGui import QIcon, QPixmap
+
+_icons: Dict[str, QIcon] = dict()
+_pixmaps: Dict[Tuple[str, Optional[int]], QPixmap] = dict()
+
+
+def _key(file_path: Union[str, Path]) -> str:
+    return str(Path(file_path).resolve())
+
+
+def get_icon(file_path: Union[str, Path]) -> QIcon:
+    key = _key(file_path)
+    try:
+        return _icons[key]
+    except KeyError:
+        icon = QIcon(key)
+        _icons[key] = icon
+        return icon
+
+
+def get_pixmap(file_path: Union[str, Path], size: Optional[int] = None) -> QPixmap:
+    """
+    Returns the image at the given path. If a size is given, the image is
+    smoothly scaled to fit inside a square of that size, keeping its aspect
+    ratio.
+    """
+    key = (_key(file_path), size)
+    try:
+        return _pixmaps[key]
+    except KeyError:
+        pass
+
+    if size is None:
+        pixmap = QPixmap(key[0])
+    else:
+        pixmap = get_pixmap(file_path).scaled(size, size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+    _pixmaps[key] = pixmap
+    return pixmap
+
+
+def clear():
+    _icons.clear()
+    _pixmaps.clear()
@@ -0,0 +1,32 @@
+from bw_tools.common.bw_manifest import BWActionManifest, BWModuleManifest
+
+MANIFEST = BWModuleManifest(
+    name="bw_framer",
+    has_settings=True,
+    actions=[
+        BWActionManifest(
+            id="bw_framer",
+            callback="on_clicked_run_framer",
+            icon="resources/bw_framer_icon.png",
+            hotkey_setting="Hotkey",
+            tooltip="""
+    Frames the selected nodes by reusing an existing frame, or drawing
+    a new one.
+
+    Shortcut: {hotkey}
+    """,
+        ),
+        BWActionManifest(
+            id="bw_framer_batch",
+            callback="on_clicked_run_batch_framer",
+            text="Batch Frame",
+            hotkey_setting="Batch Hotkey",
+            tooltip="""
+    Draws a frame around each connected group of the selected nodes, or
+    of every node if nothing is selected. Existing frames are reused.
+
+    Shortcut: {hotkey}
+    """,
+        ),
+    ],
+)
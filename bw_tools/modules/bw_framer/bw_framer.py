@@ -1,11 +1,10 @@
 from __future__ import annotations
 
 import os
-from functools import partial
+from dataclasses import dataclass
 from pathlib import Path
-from typing import TYPE_CHECKING, Dict
+from typing import TYPE_CHECKING, Dict, List
 
-from PySide6.QtGui import QAction, QIcon, QKeySequence
 from sd.api import sdbasetypes
 from sd.api.sdgraph import SDGraph
 from sd.api.sdgraphobject import SDGraphObject
@@ -13,21 +12,39 @@ from sd.api.sdgraphobjectframe import SDGraphObjectFrame
 from sd.api.sdhistoryutils import SDHistoryUtils
 from sd.api.sdnode import SDNode
 
-from bw_tools.common.bw_node import BWNode
-from bw_tools.modules.bw_settings.bw_settings import BWModuleSettings
+from bw_tools.modules.bw_settings import settings_registry
+from bw_tools.modules.bw_settings.bw_settings import (
+    BWModuleSettings,
+    BWSetting,
+)
+
+from .frame_bounds import (
+    BWBounds,
+    BWNodeHeightCache,
+    get_frame_bounds,
+    get_node_bounds,
+)
+from .frame_groups import get_connected_components, get_output_chains
+from .frame_index import BWFrameIndex
 
 if TYPE_CHECKING:
     from bw_tools.common.bw_api_tool import BWAPITool
 
+SETTINGS_FILE = Path(__file__).parent / "bw_framer_settings.json"
+
 
 class BWFramerSettings(BWModuleSettings):
-    def __init__(self, file_path: Path):
-        super().__init__(file_path)
-        self.hotkey: str = self.get("Hotkey;value")
-        self.margin: float = self.get("Margin;value")
-        self.default_color: list = self.get("Default Color;value")
-        self.default_title: str = self.get("Default Title;value")
-        self.default_description: str = self.get("Default Description;value")
+    hotkey: str = BWSetting("Hotkey")
+    batch_hotkey: str = BWSetting("Batch Hotkey")
+    batch_grouping: str = BWSetting("Batch Grouping")
+    margin: float = BWSetting("Margin")
+    default_color: list = BWSetting("Default Color")
+    default_title: str = BWSetting("Default Title")
+    default_description: str = BWSetting("Default Description")
+
+
+def get_settings() -> BWFramerSettings:
+    return settings_registry.get_settings(BWFramerSettings, SETTINGS_FILE)
 
 
 def get_frames(graph_objects: list[SDGraphObject]) -> list[SDGraphObjectFrame]:
@@ -40,7 +57,104 @@ def delete_frames(
     graph: SDGraph,
     frames: list[SDGraphObjectFrame],
 ):
-    [graph.deleteGraphObject(frame) for frame in frames]
+    for frame in frames:
+        graph.deleteGraphObject(frame)
+
+
+@dataclass
+class BWFrameGroup:
+    bounds: BWBounds
+    api_nodes: List[SDNode]
+
+
+def _new_frame(
+    graph: SDGraph, settings: BWFramerSettings
+) -> SDGraphObjectFrame:
+    frame: SDGraphObjectFrame = SDGraphObjectFrame.sNew(graph)
+    frame.setTitle(settings.default_title)
+    frame.setColor(
+        sdbasetypes.ColorRGBA(
+            settings.default_color[0],
+            settings.default_color[1],
+            settings.default_color[2],
+            settings.default_color[3],
+        )
+    )
+    frame.setDescription(settings.default_description)
+    return frame
+
+
+def _set_frame_bounds(frame: SDGraphObjectFrame, bounds: BWBounds):
+    frame.setPosition(sdbasetypes.float2(bounds.left, bounds.top))
+    frame.setSize(sdbasetypes.float2(bounds.width, bounds.height))
+
+
+def merge_overlapping_groups(groups: List[BWFrameGroup]) -> List[BWFrameGroup]:
+    """
+    Merges groups whose frames overlap, until no frames overlap. Merging
+    two groups grows their frame, which can make it overlap another, so
+    the groups are checked again until nothing is merged.
+    """
+    merged = True
+    while merged:
+        merged = False
+        groups.sort(key=lambda g: g.bounds.left)
+        result: List[BWFrameGroup] = list()
+        for group in groups:
+            for other in result:
+                if other.bounds.overlaps(group.bounds):
+                    other.bounds = other.bounds.union(group.bounds)
+                    other.api_nodes.extend(group.api_nodes)
+                    merged = True
+                    break
+            else:
+                result.append(group)
+        groups = result
+    return groups
+
+
+def run_batch_framer(
+    nodes: List[SDNode],
+    graph: SDGraph,
+    settings: BWFramerSettings,
+):
+    """
+    Frames each group of nodes, grouped by settings.batch_grouping. Groups
+    whose frames would overlap share one frame.
+
+    An existing frame in the graph which overlaps a group is refitted to
+    it, preferring the frame with the largest overlap. Other existing
+    frames which overlap a group are deleted, frames elsewhere in the
+    graph are left alone.
+    """
+    if settings.batch_grouping == "Output Chains":
+        node_groups = get_output_chains(nodes)
+    else:
+        node_groups = get_connected_components(nodes)
+
+    heights = BWNodeHeightCache()
+    groups = merge_overlapping_groups(
+        [
+            BWFrameGroup(
+                get_frame_bounds(
+                    get_node_bounds(api_nodes, heights), settings.margin
+                ),
+                api_nodes,
+            )
+            for api_nodes in node_groups
+        ]
+    )
+
+    index = BWFrameIndex.from_graph_objects(graph.getGraphObjects())
+    frames = [index.take_best_match(group.bounds) for group in groups]
+    delete_frames(
+        graph, index.unused_overlapping(group.bounds for group in groups)
+    )
+
+    for group, frame in zip(groups, frames):
+        if frame is None:
+            frame = _new_frame(graph, settings)
+        _set_frame_bounds(frame, group.bounds)
 
 
 def run_framer(
@@ -49,22 +163,7 @@ def run_framer(
     graph: SDGraph,
     settings: BWFramerSettings,
 ):
-    x0 = min(nodes, key=lambda node: node.getPosition().x)
-    x1 = max(nodes, key=lambda node: node.getPosition().x)
-    y0 = max(nodes, key=lambda node: node.getPosition().y)
-    y1 = min(nodes, key=lambda node: node.getPosition().y)
-
-    x0 = BWNode(x0)
-    x1 = BWNode(x1)
-    y0 = BWNode(y0)
-    y1 = BWNode(y1)
-
-    min_x = x0.pos.x - x0.width / 2
-    max_x = x1.pos.x - x1.width / 2
-    min_y = y1.pos.y - y1.width / 2
-    max_y = y0.pos.y - y0.width / 2
-    width = (max_x - min_x) + x1.width + settings.margin * 2
-    height = (max_y - min_y) + y0.height + settings.margin * 3
+    bounds = get_frame_bounds(get_node_bounds(nodes), settings.margin)
 
     frames = get_frames(graph_objects)
     if frames:
@@ -72,24 +171,9 @@ def run_framer(
         frame = frames[0]
         delete_frames(graph, frames[1:])
     else:
-        frame: SDGraphObjectFrame = SDGraphObjectFrame.sNew(graph)
-        frame.setTitle(settings.default_title)
-        frame.setColor(
-            sdbasetypes.ColorRGBA(
-                settings.default_color[0],
-                settings.default_color[1],
-                settings.default_color[2],
-                settings.default_color[3],
-            )
-        )
-        frame.setDescription(settings.default_description)
+        frame = _new_frame(graph, settings)
 
-    frame.setPosition(
-        sdbasetypes.float2(
-            min_x - settings.margin, min_y - settings.margin * 2
-        )
-    )
-    frame.setSize(sdbasetypes.float2(width, height))
+    _set_frame_bounds(frame, bounds)
 
 
 def on_clicked_run_framer(api: BWAPITool):
@@ -104,9 +188,7 @@ def on_clicked_run_framer(api: BWAPITool):
         return
 
     with SDHistoryUtils.UndoGroup("Framer"):
-        settings = BWFramerSettings(
-            Path(__file__).parent / "bw_framer_settings.json"
-        )
+        settings = get_settings()
         nodes = api.current_node_selection
         if len(nodes) == 0:
             return
@@ -118,36 +200,36 @@ def on_clicked_run_framer(api: BWAPITool):
         )
 
 
-def on_graph_view_created(graph_view_id, api: BWAPITool):
-    toolbar = api.get_graph_view_toolbar(graph_view_id)
-
-    settings = BWFramerSettings(
-        Path(__file__).parent / "bw_framer_settings.json"
-    )
-    icon = Path(__file__).parent / "resources" / "bw_framer_icon.png"
-    tooltip = f"""
-    Frames the selected nodes by reusing an existing frame, or drawing
-    a new one.
-
-    Shortcut: {settings.hotkey}
-    """
-    action = QAction()
-    action.setIcon(QIcon(str(icon.resolve())))
-    action.setToolTip(tooltip)
-    action.setShortcut(QKeySequence(settings.hotkey))
-    action.triggered.connect(lambda: on_clicked_run_framer(api))
-    toolbar.add_action("bw_framer", action)
+def on_clicked_run_batch_framer(api: BWAPITool):
+    if not api.current_graph_is_supported:
+        api.log.error("Graph type is unsupported")
+        return
 
+    pkg = api.current_package
+    file_path = Path(pkg.getFilePath())
+    if not os.access(file_path, os.W_OK):
+        api.log.error("Permission denied to write to package")
+        return
 
-def on_initialize(api: BWAPITool):
-    api.register_on_graph_view_created_callback(
-        partial(on_graph_view_created, api=api)
-    )
+    with SDHistoryUtils.UndoGroup("Batch Framer"):
+        settings = get_settings()
+        nodes = api.current_node_selection
+        if len(nodes) == 0:
+            nodes = api.current_graph.getNodes()
+        if len(nodes) == 0:
+            return
+        run_batch_framer(list(nodes), api.current_graph, settings)
 
 
 def get_default_settings() -> Dict:
     return {
         "Hotkey": {"widget": 1, "value": "Alt+D"},
+        "Batch Hotkey": {"widget": 1, "value": "Alt+Shift+D"},
+        "Batch Grouping": {
+            "widget": 5,
+            "list": ["Connected Components", "Output Chains"],
+            "value": "Connected Components",
+        },
         "Margin": {"widget": 2, "value": 32},
         "Default Color": {"widget": 6, "value": [0.0, 0.0, 0.0, 0.25]},
         "Default Title": {"widget": 1, "value": ""},
@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Optional
+
+from sd.api.sdnode import SDNode
+from sd.api.sdproperty import SDPropertyCategory
+
+from bw_tools.common.bw_api_tool import CompNodeID
+from bw_tools.common.bw_node import NODE_WIDTH, get_node_height
+
+
+@dataclass
+class BWBounds:
+    left: float
+    top: float
+    right: float
+    bottom: float
+
+    @property
+    def width(self) -> float:
+        return self.right - self.left
+
+    @property
+    def height(self) -> float:
+        return self.bottom - self.top
+
+    def overlap_area(self, other: BWBounds) -> float:
+        """Returns the area of the intersection, 0 if they do not overlap"""
+        width = min(self.right, other.right) - max(self.left, other.left)
+        height = min(self.bottom, other.bottom) - max(self.top, other.top)
+        if width <= 0 or height <= 0:
+            return 0.0
+        return width * height
+
+    def overlaps(self, other: BWBounds) -> bool:
+        return self.overlap_area(other) > 0
+
+    def union(self, other: BWBounds) -> BWBounds:
+        return BWBounds(
+            min(self.left, other.left),
+            min(self.top, other.top),
+            max(self.right, other.right),
+            max(self.bottom, other.bottom),
+        )
+
+
+# Nodes which share one definition id, but whose inputs and outputs are
+# set up on each node, such as graph instances and pixel processors
+VARIABLE_SLOT_NODES = frozenset(
+    (
+        CompNodeID.COMP_GRAPH.value,
+        "sbs::compositing::fxmaps",
+        "sbs::compositing::pixelprocessor",
+        "sbs::compositing::valueprocessor",
+        "sbs::function::instance",
+    )
+)
+
+
+@dataclass
+class BWNodeHeightCache:
+    """
+    Heights of nodes, cached by definition id, since the slots of most
+    nodes come from their definition. The height of nodes whose slots vary
+    per node is not cached, see VARIABLE_SLOT_NODES.
+    """
+
+    _heights: Dict[str, float] = field(
+        init=False, default_factory=dict, repr=False
+    )
+
+    def height(self, api_node: SDNode) -> float:
+        definition_id = api_node.getDefinition().getId()
+        try:
+            return self._heights[definition_id]
+        except KeyError:
+            pass
+
+        height = get_node_height(
+            max(
+                _connectable_property_count(
+                    api_node, SDPropertyCategory.Input
+                ),
+                _connectable_property_count(
+                    api_node, SDPropertyCategory.Output
+                ),
+            )
+        )
+        if definition_id not in VARIABLE_SLOT_NODES:
+            self._heights[definition_id] = height
+        return height
+
+
+def _connectable_property_count(
+    api_node: SDNode, category: SDPropertyCategory
+) -> int:
+    return sum(
+        1 for p in api_node.getProperties(category) if p.isConnectable()
+    )
+
+
+def get_node_bounds(
+    api_nodes: Iterable[SDNode],
+    heights: Optional[BWNodeHeightCache] = None,
+) -> BWBounds:
+    """
+    Returns the rectangle around the given nodes, reading the position of
+    each node once. Node positions are at their center.
+    """
+    if heights is None:
+        heights = BWNodeHeightCache()
+
+    half_width = NODE_WIDTH / 2
+    bounds = None
+    for api_node in api_nodes:
+        pos = api_node.getPosition()
+        half_height = heights.height(api_node) / 2
+        if bounds is None:
+            bounds = BWBounds(
+                pos.x - half_width,
+                pos.y - half_height,
+                pos.x + half_width,
+                pos.y + half_height,
+            )
+            continue
+
+        bounds.left = min(bounds.left, pos.x - half_width)
+        bounds.top = min(bounds.top, pos.y - half_height)
+        bounds.right = max(bounds.right, pos.x + half_width)
+        bounds.bottom = max(bounds.bottom, pos.y + half_height)
+
+    if bounds is None:
+        raise ValueError("Can not get the bounds of no nodes")
+    return bounds
+
+
+def get_frame_bounds(node_bounds: BWBounds, margin: float) -> BWBounds:
+    """
+    Returns the bounds of a frame around the node bounds. The top margin
+    is doubled to leave room for the title.
+    """
+    return BWBounds(
+        node_bounds.left - margin,
+        node_bounds.top - margin * 2,
+        node_bounds.right + margin,
+        node_bounds.bottom + margin,
+    )
@@ -0,0 +1,117 @@
+"""
+Partitions nodes into the groups the batch framer draws a frame around.
+
+Only connections between the given nodes are followed, so a group never
+contains a node outside of them.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, List
+
+from sd.api.sdnode import SDNode
+from sd.api.sdproperty import SDPropertyCategory
+
+from bw_tools.common.bw_api_tool import CompNodeID
+
+
+def _get_input_identifiers(
+    api_nodes: Dict[int, SDNode],
+) -> Dict[int, List[int]]:
+    """
+    Returns the identifiers of the nodes connected to the inputs of each
+    node
+    """
+    inputs = dict()
+    for identifier, api_node in api_nodes.items():
+        inputs[identifier] = list()
+        for api_property in api_node.getProperties(SDPropertyCategory.Input):
+            if not api_property.isConnectable():
+                continue
+            for connection in api_node.getPropertyConnections(api_property):
+                input_identifier = int(
+                    connection.getInputPropertyNode().getIdentifier()
+                )
+                if input_identifier in api_nodes:
+                    inputs[identifier].append(input_identifier)
+    return inputs
+
+
+def _by_identifier(api_nodes: List[SDNode]) -> Dict[int, SDNode]:
+    return {int(api_node.getIdentifier()): api_node for api_node in api_nodes}
+
+
+def get_connected_components(api_nodes: List[SDNode]) -> List[List[SDNode]]:
+    """Returns groups of nodes which are connected to each other"""
+    nodes = _by_identifier(api_nodes)
+    return _get_connected_components(nodes, _get_input_identifiers(nodes))
+
+
+def _get_connected_components(
+    nodes: Dict[int, SDNode], inputs: Dict[int, List[int]]
+) -> List[List[SDNode]]:
+    parents = {identifier: identifier for identifier in nodes}
+
+    def _find(identifier: int) -> int:
+        root = identifier
+        while parents[root] != root:
+            root = parents[root]
+        while parents[identifier] != root:
+            parents[identifier], identifier = root, parents[identifier]
+        return root
+
+    for identifier, input_identifiers in inputs.items():
+        for input_identifier in input_identifiers:
+            parents[_find(input_identifier)] = _find(identifier)
+
+    components: Dict[int, List[SDNode]] = dict()
+    for identifier, api_node in nodes.items():
+        components.setdefault(_find(identifier), []).append(api_node)
+    return list(components.values())
+
+
+def get_output_chains(api_nodes: List[SDNode]) -> List[List[SDNode]]:
+    """
+    Returns a group for each output node, containing the output node and
+    the nodes upstream of it. A node upstream of several output nodes is
+    grouped with the top most output node. Nodes which are not upstream of
+    an output node are grouped by connected components.
+    """
+    nodes = _by_identifier(api_nodes)
+    inputs = _get_input_identifiers(nodes)
+
+    output_identifiers = [
+        identifier
+        for identifier, api_node in nodes.items()
+        if api_node.getDefinition().getId() == CompNodeID.OUTPUT.value
+    ]
+    output_identifiers.sort(
+        key=lambda identifier: nodes[identifier].getPosition().y
+    )
+
+    grouped = set()
+    groups = list()
+    for output_identifier in output_identifiers:
+        group = list()
+        stack = [output_identifier]
+        while stack:
+            identifier = stack.pop()
+            if identifier in grouped:
+                continue
+            grouped.add(identifier)
+            group.append(nodes[identifier])
+            stack.extend(inputs[identifier])
+        groups.append(group)
+
+    remaining = {
+        identifier: api_node
+        for identifier, api_node in nodes.items()
+        if identifier not in grouped
+    }
+    if remaining:
+        remaining_inputs = {
+            identifier: [i for i in inputs[identifier] if i in remaining]
+            for identifier in remaining
+        }
+        groups.extend(_get_connected_components(remaining, remaining_inputs))
+    return groups
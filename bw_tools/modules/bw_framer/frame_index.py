@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, field
+from typing import Iterable, List, Optional, Set
+
+from sd.api.sdgraphobject import SDGraphObject
+from sd.api.sdgraphobjectframe import SDGraphObjectFrame
+
+from .frame_bounds import BWBounds
+
+
+@dataclass
+class BWFrameIndex:
+    """
+    The existing frames of a graph, sorted by their left edge. The position
+    and size of each frame are read once when the index is built.
+
+    A frame can only overlap bounds if its left edge is between
+    bounds.left - the widest frame width and bounds.right, so only the
+    frames in that range are tested. This skips frames far to the left or
+    right of the bounds, but the range is widened by the widest frame in
+    the graph. A single very wide frame makes each query test most of the
+    frames, the same as testing every frame.
+    """
+
+    frames: List[SDGraphObjectFrame] = field(default_factory=list)
+    bounds: List[BWBounds] = field(default_factory=list)
+
+    _lefts: List[float] = field(init=False, default_factory=list, repr=False)
+    _max_width: float = field(init=False, default=0.0, repr=False)
+    _used: Set[int] = field(init=False, default_factory=set, repr=False)
+
+    def __post_init__(self):
+        order = sorted(
+            range(len(self.frames)), key=lambda i: self.bounds[i].left
+        )
+        self.frames = [self.frames[i] for i in order]
+        self.bounds = [self.bounds[i] for i in order]
+        self._lefts = [b.left for b in self.bounds]
+        self._max_width = max((b.width for b in self.bounds), default=0.0)
+
+    @classmethod
+    def from_graph_objects(
+        cls, graph_objects: Iterable[SDGraphObject]
+    ) -> BWFrameIndex:
+        frames = list()
+        bounds = list()
+        for graph_object in graph_objects:
+            if not isinstance(graph_object, SDGraphObjectFrame):
+                continue
+            pos = graph_object.getPosition()
+            size = graph_object.getSize()
+            frames.append(graph_object)
+            bounds.append(
+                BWBounds(pos.x, pos.y, pos.x + size.x, pos.y + size.y)
+            )
+        return cls(frames, bounds)
+
+    def _overlapping(self, bounds: BWBounds) -> List[int]:
+        start = bisect_left(self._lefts, bounds.left - self._max_width)
+        end = bisect_right(self._lefts, bounds.right)
+        return [
+            i for i in range(start, end) if self.bounds[i].overlaps(bounds)
+        ]
+
+    def take_best_match(
+        self, bounds: BWBounds
+    ) -> Optional[SDGraphObjectFrame]:
+        """
+        Returns the unused frame with the largest overlap with the bounds,
+        or None if no unused frame overlaps them. The frame is marked as
+        used, so it is not returned again.
+        """
+        best = None
+        best_area = 0.0
+        for i in self._overlapping(bounds):
+            if i in self._used:
+                continue
+            area = self.bounds[i].overlap_area(bounds)
+            if area > best_area:
+                best, best_area = i, area
+
+        if best is None:
+            return None
+        self._used.add(best)
+        return self.frames[best]
+
+    def unused_overlapping(
+        self, bounds: Iterable[BWBounds]
+    ) -> List[SDGraphObjectFrame]:
+        """Returns the unused frames which overlap any of the bounds"""
+        found = set()
+        for b in bounds:
+            found.update(
+                i for i in self._overlapping(b) if i not in self._used
+            )
+        return [self.frames[i] for i in sorted(found)]
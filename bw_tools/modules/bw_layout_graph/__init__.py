@@ -0,0 +1,21 @@
+from bw_tools.common.bw_manifest import BWActionManifest, BWModuleManifest
+
+MANIFEST = BWModuleManifest(
+    name="bw_layout_graph",
+    has_settings=True,
+    actions=[
+        BWActionManifest(
+            id="bw_layout_graph",
+            callback="on_clicked_layout_graph",
+            icon="resources/icons/bwLayoutGraphIcon.png",
+            hotkey_setting="Hotkey",
+            tooltip="""
+    Automatically align selected nodes based on their hierarchy, arranged
+    to minimise overlapping. Align a given nodes inputs about their center
+    point, stack them on top of each other or align them by their mainline.
+
+    Shortcut: {hotkey}
+    """,
+        ),
+    ],
+)
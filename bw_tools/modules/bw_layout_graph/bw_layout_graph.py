@@ -1,17 +1,16 @@
 import os
-from functools import partial
 from pathlib import Path
 from typing import Dict, Optional, Union
 
 from bw_tools.common.bw_api_tool import BWAPITool
 from bw_tools.common.bw_node_selection import remove_dot_nodes
-from bw_tools.modules.bw_settings.bw_settings import BWModuleSettings
+from bw_tools.modules.bw_settings import settings_registry
+from bw_tools.modules.bw_settings.bw_settings import BWModuleSettings, BWSetting
 from bw_tools.modules.bw_straighten_connection import bw_straighten_connection
 from bw_tools.modules.bw_straighten_connection.straighten_behavior import (
     BWBreakAtSource,
     BWBreakAtTarget,
 )
-from PySide6.QtGui import QIcon, QKeySequence, QAction
 from PySide6.QtWidgets import QMessageBox
 from sd.api.sdhistoryutils import SDHistoryUtils
 from sd.tools.graphlayout import snapSDNodes
@@ -26,22 +25,26 @@ from .alignment_behavior import (
 from .layout_node import BWLayoutNode, BWLayoutNodeSelection
 from .node_sorting import BWNodeSorter
 
+SETTINGS_FILE = Path(__file__).parent / "bw_layout_graph_settings.json"
+
 
 class BWLayoutSettings(BWModuleSettings):
-    def __init__(self, file_path: Path):
-        super().__init__(file_path)
-        self.hotkey: str = self.get("Hotkey;value")
-        self.node_spacing: Union[int, float] = self.get("Node Spacing;value")
-        self.mainline_additional_offset: Union[int, float] = self.get("Mainline Settings;content;Offset Amount;value")
-        self.mainline_min_threshold: int = self.get("Mainline Settings;content;Adjacent Chain Threshold;value")
-        self.mainline_enabled: bool = self.get("Mainline Settings;content;Enable Offset Mainline;value")
-        self.alignment_behavior: int = self.get("Vertical Alignment;value")
-        self.node_count_warning: int = self.get("Node Count Warning;value")
+    hotkey: str = BWSetting("Hotkey")
+    node_spacing: Union[int, float] = BWSetting("Node Spacing")
+    mainline_additional_offset: Union[int, float] = BWSetting("Mainline Settings", "Offset Amount")
+    mainline_min_threshold: int = BWSetting("Mainline Settings", "Adjacent Chain Threshold")
+    mainline_enabled: bool = BWSetting("Mainline Settings", "Enable Offset Mainline")
+    alignment_behavior: str = BWSetting("Vertical Alignment")
+    node_count_warning: int = BWSetting("Node Count Warning")
+
+    run_straighten_connection: bool = BWSetting("Straighten Connection Settings", "Enable")
+    straighten_connection_behavior: str = BWSetting("Straighten Connection Settings", "Alignment")
+
+    snap_to_grid: bool = BWSetting("Snap To Grid")
 
-        self.run_straighten_connection: bool = self.get("Straighten Connection Settings;content;Enable;value")
-        self.straighten_connection_behavior: bool = self.get("Straighten Connection Settings;content;Alignment;value")
 
-        self.snap_to_grid: bool = self.get("Snap To Grid;value")
+def get_settings() -> BWLayoutSettings:
+    return settings_registry.get_settings(BWLayoutSettings, SETTINGS_FILE)
 
 
 def run_layout(
@@ -52,7 +55,7 @@ def run_layout(
     api.log.info("Running layout Graph")
 
     if settings is None:
-        settings = BWLayoutSettings(Path(__file__).parent / "bw_layout_graph_settings.json")
+        settings = get_settings()
 
     node_sorter = BWNodeSorter(settings)
     for root_node in node_selection.root_nodes:
@@ -87,7 +90,7 @@ def run_layout(
         snapSDNodes(api.current_node_selection)
 
     if settings.run_straighten_connection:
-        if settings.straighten_connection_behavior == 0:
+        if settings.straighten_connection_behavior == "Break At Source":
             behavior = BWBreakAtSource(api.current_graph)
         else:
             behavior = BWBreakAtTarget(api.current_graph)
@@ -108,7 +111,7 @@ def on_clicked_layout_graph(api: BWAPITool):
         return
 
     with SDHistoryUtils.UndoGroup("Undo Group"):
-        settings = BWLayoutSettings(Path(__file__).parent / "bw_layout_graph_settings.json")
+        settings = get_settings()
         if len(api.current_node_selection) >= settings.node_count_warning:
             msg = "Running Layout Graph on a large selection could take a while," " are you sure you want to continue"
             ret = QMessageBox.question(
@@ -121,37 +124,14 @@ def on_clicked_layout_graph(api: BWAPITool):
             if ret == QMessageBox.No:
                 return
 
-        api_nodes = remove_dot_nodes(api.current_node_selection, api.current_graph)
-        node_selection = BWLayoutNodeSelection(api_nodes, api.current_graph)
+        removal = remove_dot_nodes(api.current_node_selection, api.current_graph)
+        if removal.deleted_node_count:
+            api.log.info(f"Removed {removal.deleted_node_count} dot nodes")
+        node_selection = BWLayoutNodeSelection(removal.api_nodes, api.current_graph)
 
         run_layout(node_selection, api, settings)
 
 
-def on_graph_view_created(graph_view_id, api: BWAPITool):
-    toolbar = api.get_graph_view_toolbar(graph_view_id)
-
-    settings = BWLayoutSettings(Path(__file__).parent / "bw_layout_graph_settings.json")
-
-    icon_path = Path(__file__).parent / "resources/icons/bwLayoutGraphIcon.png"
-    tooltip = f"""
-    Automatically align selected nodes based on their hierarchy, arranged
-    to minimise overlapping. Align a given nodes inputs about their center
-    point, stack them on top of each other or align them by their mainline.
-
-    Shortcut: {settings.hotkey}
-    """
-    action = QAction()
-    action.setIcon(QIcon(str(icon_path.resolve())))
-    action.setShortcut(QKeySequence(settings.hotkey))
-    action.setToolTip(tooltip)
-    action.triggered.connect(lambda: on_clicked_layout_graph(api))
-    toolbar.add_action("bw_layout_graph", action)
-
-
-def on_initialize(api: BWAPITool):
-    api.register_on_graph_view_created_callback(partial(on_graph_view_created, api=api))
-
-
 def get_default_settings() -> Dict:
     return {
         "Hotkey": {"widget": 1, "value": "C"},
@@ -0,0 +1,31 @@
+from bw_tools.common.bw_manifest import (
+    BWActionManifest,
+    BWMenuEntryManifest,
+    BWModuleManifest,
+)
+
+MANIFEST = BWModuleManifest(
+    name="bw_optimize_graph",
+    has_settings=True,
+    actions=[
+        BWActionManifest(
+            id="bw_optimize_graph",
+            callback="on_clicked_run",
+            icon="resources/icons/bw_optimize_graph.png",
+            hotkey_setting="Hotkey",
+            tooltip="""
+    Optimises the graph by identifying, removing duplicate nodes and
+    optimising node settings for performance.
+
+    Shortcut: {hotkey}
+    """,
+        ),
+    ],
+    menu_entries=[
+        BWMenuEntryManifest(
+            label="Optimize Package",
+            callback="on_clicked_run_package",
+            tooltip="Optimizes every graph in the current package",
+        ),
+    ],
+)
@@ -1,47 +1,119 @@
 from __future__ import annotations
 
 import os
-from functools import partial
+from dataclasses import dataclass
 from pathlib import Path
-from typing import TYPE_CHECKING, Dict
-from PySide6.QtGui import QIcon, QKeySequence, QAction
+from typing import TYPE_CHECKING, Dict, Iterator, Union
 
 from bw_tools.common.bw_node_selection import BWNodeSelection
 from bw_tools.modules.bw_layout_graph import bw_layout_graph
-from bw_tools.modules.bw_settings.bw_settings import BWModuleSettings
+from bw_tools.modules.bw_settings import settings_registry
+from bw_tools.modules.bw_settings.bw_settings import BWModuleSettings, BWSetting
 from PySide6 import QtWidgets
+from sd.api.sbs.sdsbscompgraph import SDSBSCompGraph
+from sd.api.sbs.sdsbsfunctiongraph import SDSBSFunctionGraph
 from sd.api.sdhistoryutils import SDHistoryUtils
 
 from .atomic_optimizer import AtomicOptimizer
 from .comp_graph_optimizer import CompGraphOptimizer
+from .dead_node_optimizer import DeadNodeOptimizer
+from .function_graph_optimizer import FunctionGraphOptimizer
+from .output_size_optimizer import OutputSizeOptimizer
 from .uniform_color_optimizer import UniformOptimizer
 
 if TYPE_CHECKING:
     from bw_tools.common.bw_api_tool import BWAPITool
+    from sd.api.sdpackage import SDPackage
+
+SETTINGS_FILE = Path(__file__).parent / "bw_optimize_graph_settings.json"
 
 
 class BWOptimizeSettings(BWModuleSettings):
-    def __init__(self, file_path: Path):
-        super().__init__(file_path)
-        self.hotkey: str = self.get("Hotkey;value")
-        self.recursive: bool = self.get("Recursive;value")
-        self.popup_on_complete: bool = self.get("Popup On Complete;value")
-        self.run_layout_tools: bool = self.get("Run Layout Tools;value")
-        self.uniform_force_output_size: bool = self.get(
-            "Uniform Color Node Settings;content;" "Force Output Size (16x16);value"
+    hotkey: str = BWSetting("Hotkey")
+    recursive: bool = BWSetting("Recursive")
+    popup_on_complete: bool = BWSetting("Popup On Complete")
+    run_layout_tools: bool = BWSetting("Run Layout Tools")
+    uniform_force_output_size: bool = BWSetting("Uniform Color Node Settings", "Force Output Size (16x16)")
+    uniform_propagate_output_size: bool = BWSetting("Uniform Color Node Settings", "Propagate To Constant Nodes")
+    remove_dead_nodes: bool = BWSetting("Dead Node Settings", "Enable")
+    dead_node_action: str = BWSetting("Dead Node Settings", "Action")
+
+
+def get_settings() -> BWOptimizeSettings:
+    return settings_registry.get_settings(BWOptimizeSettings, SETTINGS_FILE)
+
+
+@dataclass
+class BWOptimizeResult:
+    uniform_color_count: int = 0
+    atomic_count: int = 0
+    comp_graph_count: int = 0
+    dead_node_count: int = 0
+    constant_count: int = 0
+    function_count: int = 0
+    saved_bytes: int = 0
+
+    @property
+    def total(self) -> int:
+        return (
+            self.uniform_color_count
+            + self.atomic_count
+            + self.comp_graph_count
+            + self.dead_node_count
+            + self.constant_count
+            + self.function_count
         )
 
+    def add(self, other: BWOptimizeResult):
+        self.uniform_color_count += other.uniform_color_count
+        self.atomic_count += other.atomic_count
+        self.comp_graph_count += other.comp_graph_count
+        self.dead_node_count += other.dead_node_count
+        self.constant_count += other.constant_count
+        self.function_count += other.function_count
+        self.saved_bytes += other.saved_bytes
 
-def run(
+    def message(self) -> str:
+        return (
+            f"Found {self.total}"
+            " nodes to optimize..\n"
+            f"\n Uniform Color Nodes: {self.uniform_color_count} optimized"
+            f"\nConstant Nodes: {self.constant_count} optimized"
+            f"\nAtmoic Nodes: {self.atomic_count} deleted"
+            f"\nComp Graph Nodes: {self.comp_graph_count} deleted"
+            f"\nFunction Nodes: {self.function_count} deleted"
+            f"\nDead Nodes: {self.dead_node_count} found"
+            f"\n\nEstimated GPU Memory Saved: {self.saved_bytes / 1024 ** 2:.1f} MB"
+        )
+
+
+def optimize(
     node_selection: BWNodeSelection,
-    api: BWAPITool,
     settings: BWOptimizeSettings,
-):
+) -> BWOptimizeResult:
+    """
+    Runs every optimizer on the node selection and returns what was done.
+    Unlike run(), this does not run the layout tools or report to the user.
+    """
+    result = BWOptimizeResult()
     if node_selection.node_count == 0:
-        return
+        return result
+
+    # Remove dead branches first, so the other passes have less to compare
+    if settings.remove_dead_nodes:
+        optimizer = DeadNodeOptimizer(node_selection, settings)
+        optimizer.run()
+        result.dead_node_count = optimizer.dead_count
+
+    if isinstance(node_selection.api_graph, SDSBSFunctionGraph):
+        optimizer = FunctionGraphOptimizer(node_selection, settings)
+        optimizer.run()
+        result.function_count += optimizer.deleted_count
+        while settings.recursive and optimizer.deleted_count >= 1:
+            optimizer.run()
+            result.function_count += optimizer.deleted_count
+        return result
 
-    atomic_count = 0
-    comp_graph_count = 0
     deleted = True
     while deleted:
         deleted = False
@@ -51,7 +123,7 @@ def run(
         if settings.recursive:
             while optimizer.deleted_count >= 1:
                 deleted = True
-                atomic_count += optimizer.deleted_count
+                result.atomic_count += optimizer.deleted_count
                 optimizer.run()
 
         optimizer = CompGraphOptimizer(node_selection, settings)
@@ -59,15 +131,37 @@ def run(
         if settings.recursive:
             while optimizer.deleted_count >= 1:
                 deleted = True
-                comp_graph_count += optimizer.deleted_count
+                result.comp_graph_count += optimizer.deleted_count
                 optimizer.run()
 
     # Handle uniform colors
-    uniform_color_count = 0
     if settings.uniform_force_output_size:
         optimizer = UniformOptimizer(node_selection, settings)
         optimizer.run()
-        uniform_color_count = optimizer.optimized_count
+        result.uniform_color_count = optimizer.optimized_count
+
+        if settings.uniform_propagate_output_size:
+            optimizer = OutputSizeOptimizer(
+                node_selection,
+                settings,
+                resized_uniform_nodes=optimizer.previous_output_sizes,
+            )
+            optimizer.run()
+            result.constant_count = optimizer.optimized_count
+            result.saved_bytes = optimizer.saved_bytes
+
+    return result
+
+
+def run(
+    node_selection: BWNodeSelection,
+    api: BWAPITool,
+    settings: BWOptimizeSettings,
+):
+    if node_selection.node_count == 0:
+        return
+
+    result = optimize(node_selection, settings)
 
     if settings.run_layout_tools:
         api_nodes = [n.api_node for n in node_selection.nodes]
@@ -76,21 +170,62 @@ def run(
             api,
         )
 
-    msg = (
-        f"Found {uniform_color_count + atomic_count + comp_graph_count}"
-        " nodes to optimize..\n"
-        f"\n Uniform Color Nodes: {uniform_color_count} optimized"
-        f"\nAtmoic Nodes: {atomic_count} deleted"
-        f"\nComp Graph Nodes: {comp_graph_count} deleted"
-    )
+    msg = result.message()
+
+    api.log.info(msg)
+
+    if settings.popup_on_complete:
+        QtWidgets.QMessageBox.information(None, "", msg, QtWidgets.QMessageBox.Ok)
+
+
+def _iter_graphs(package: SDPackage) -> Iterator[Union[SDSBSCompGraph, SDSBSFunctionGraph]]:
+    for resource in package.getChildrenResources(True):
+        if isinstance(resource, (SDSBSCompGraph, SDSBSFunctionGraph)):
+            yield resource
+
+
+def run_package(
+    package: SDPackage,
+    api: BWAPITool,
+    settings: BWOptimizeSettings,
+) -> BWOptimizeResult:
+    """
+    Optimizes every node of every compositing and function graph in the
+    package.
+
+    Graphs are processed one at a time and their node selection is released
+    before moving onto the next, so only a single graph is ever held in
+    memory. The layout tools are not run, since they operate on the graph
+    currently open in the graph view.
+    """
+    total = BWOptimizeResult()
+    graph_count = 0
+    for graph in _iter_graphs(package):
+        node_selection = BWNodeSelection(graph.getNodes(), graph)
+        result = optimize(node_selection, settings)
+        del node_selection
+
+        graph_count += 1
+        total.add(result)
+        api.log.info(
+            f"{graph.getIdentifier()}: "
+            f"{result.uniform_color_count} uniform color optimized, "
+            f"{result.constant_count} constant optimized, "
+            f"{result.atomic_count} atomic deleted, "
+            f"{result.comp_graph_count} comp graph deleted, "
+            f"{result.function_count} function deleted, "
+            f"{result.dead_node_count} dead nodes found"
+        )
 
+    msg = f"Optimized {graph_count} graphs.\n\n{total.message()}"
     api.log.info(msg)
 
     if settings.popup_on_complete:
         QtWidgets.QMessageBox.information(None, "", msg, QtWidgets.QMessageBox.Ok)
+    return total
 
 
-def _on_clicked_run(api: BWAPITool):
+def on_clicked_run(api: BWAPITool):
     if not api.current_graph_is_supported:
         api.log.error("Graph type is unsupported")
         return
@@ -105,32 +240,27 @@ def _on_clicked_run(api: BWAPITool):
         api.log.info("Running optimize graph...")
         node_selection = BWNodeSelection(api.current_node_selection, api.current_graph)
 
-        settings = BWOptimizeSettings(Path(__file__).parent / "bw_optimize_graph_settings.json")
+        settings = get_settings()
 
         run(node_selection, api, settings)
 
 
-def on_graph_view_created(graph_view_id, api: BWAPITool):
-    toolbar = api.get_graph_view_toolbar(graph_view_id)
-
-    settings = BWOptimizeSettings(Path(__file__).parent / "bw_optimize_graph_settings.json")
-    icon = Path(__file__).parent / "resources/icons/bw_optimize_graph.png"
-    tooltip = f"""
-    Optimises the graph by identifying, removing duplicate nodes and
-    optimising node settings for performance.
+def on_clicked_run_package(api: BWAPITool):
+    if api.current_graph is None:
+        api.log.error("Open a graph from the package to optimize")
+        return
 
-    Shortcut: {settings.hotkey}
-    """
-    action = QAction()
-    action.setIcon(QIcon(str(icon.resolve())))
-    action.setShortcut(QKeySequence(settings.hotkey))
-    action.setToolTip(tooltip)
-    action.triggered.connect(lambda: _on_clicked_run(api))
-    toolbar.add_action("bw_optimize_graph", action)
+    pkg = api.current_package
+    file_path = Path(pkg.getFilePath())
+    if not os.access(file_path, os.W_OK):
+        api.log.error("Permission denied to write to package")
+        return
 
+    with SDHistoryUtils.UndoGroup("Optimize Package"):
+        api.log.info("Running optimize package...")
+        settings = get_settings()
 
-def on_initialize(api: BWAPITool):
-    api.register_on_graph_view_created_callback(partial(on_graph_view_created, api=api))
+        run_package(pkg, api, settings)
 
 
 def get_default_settings() -> Dict:
@@ -141,6 +271,20 @@ def get_default_settings() -> Dict:
         "Popup On Complete": {"widget": 4, "value": True},
         "Uniform Color Node Settings": {
             "widget": 0,
-            "content": {"Force Output Size (16x16)": {"widget": 4, "value": True}},
+            "content": {
+                "Force Output Size (16x16)": {"widget": 4, "value": True},
+                "Propagate To Constant Nodes": {"widget": 4, "value": False},
+            },
+        },
+        "Dead Node Settings": {
+            "widget": 0,
+            "content": {
+                "Enable": {"widget": 4, "value": False},
+                "Action": {
+                    "widget": 5,
+                    "list": ["Comment", "Delete"],
+                    "value": "Comment",
+                },
+            },
         },
     }
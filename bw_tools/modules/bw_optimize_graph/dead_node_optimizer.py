@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, List, Set
+
+from bw_tools.common.bw_api_tool import CompNodeID
+from bw_tools.common.bw_node_selection import BWNodeNotInSelectionError
+from sd.api.sdgraphobjectcomment import SDGraphObjectComment
+
+from .optimizer import Optimizer
+
+if TYPE_CHECKING:
+    from bw_tools.common.bw_node import BWNode
+
+DEAD_NODE_COMMENT = "Dead node, the output does not reach any output node"
+
+
+@dataclass
+class DeadNodeOptimizer(Optimizer):
+    """
+    Finds nodes in the selection whose outputs never reach an output node.
+
+    The selection is walked backwards once from every live node, so each
+    node and connection is only visited a single time. A node is live if it
+    is an output node, or if it is connected to a node outside of the
+    selection, since we can not know what that node is used for.
+    """
+
+    dead_count: int = 0
+
+    def run(self):
+        self.deleted_count = 0
+        dead_nodes = self.find_dead_nodes()
+        self.dead_count = len(dead_nodes)
+
+        if self.settings.dead_node_action == "Delete":
+            for node in dead_nodes:
+                self.node_selection.api_graph.deleteNode(node.api_node)
+                self.node_selection.remove_node(node)
+                self.deleted_count += 1
+        else:
+            # Optimizing the graph again should not stack another comment
+            commented = self._get_commented_identifiers()
+            for node in dead_nodes:
+                if node.identifier not in commented:
+                    node.add_comment(DEAD_NODE_COMMENT)
+
+    def find_dead_nodes(self) -> List[BWNode]:
+        live_nodes = self._get_live_nodes()
+        if not live_nodes:
+            # Without any known output, everything would be flagged
+            return []
+
+        visited: Set[int] = set(n.identifier for n in live_nodes)
+        stack = list(live_nodes)
+        while stack:
+            node = stack.pop()
+            for input_node in node.input_nodes:
+                if input_node.identifier in visited:
+                    continue
+                visited.add(input_node.identifier)
+                stack.append(input_node)
+
+        dead_nodes = [n for n in self.node_selection.nodes if n.identifier not in visited]
+        dead_nodes.sort(key=lambda n: n.pos.x)
+        return dead_nodes
+
+    def _get_commented_identifiers(self) -> Set[int]:
+        """Returns the identifiers of the nodes which have the dead node comment"""
+        identifiers = set()
+        for graph_object in self.node_selection.api_graph.getGraphObjects():
+            if not isinstance(graph_object, SDGraphObjectComment):
+                continue
+            if graph_object.getDescription() != DEAD_NODE_COMMENT:
+                continue
+            parent = graph_object.getParent()
+            if parent is not None:
+                identifiers.add(int(parent.getIdentifier()))
+        return identifiers
+
+    def _get_live_nodes(self) -> List[BWNode]:
+        live_nodes = list()
+        has_output_node = False
+        for node in self.node_selection.nodes:
+            if node.api_node.getDefinition().getId() == CompNodeID.OUTPUT.value:
+                has_output_node = True
+                live_nodes.append(node)
+            elif self._has_output_outside_selection(node):
+                live_nodes.append(node)
+
+        if not has_output_node:
+            return []
+        return live_nodes
+
+    def _has_output_outside_selection(self, node: BWNode) -> bool:
+        for connection in node.output_connections:
+            try:
+                self.node_selection.node(connection.getInputPropertyNode().getIdentifier())
+            except BWNodeNotInSelectionError:
+                return True
+        return False
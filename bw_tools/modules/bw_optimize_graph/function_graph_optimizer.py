@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, Hashable, List, Optional, Tuple
+
+from sd.api.sdproperty import SDPropertyCategory
+
+from .optimizer import Optimizer
+
+if TYPE_CHECKING:
+    from bw_tools.common.bw_node import BWNode
+
+FUNCTION_NODE_PREFIX = "sbs::function::"
+FUNCTION_INSTANCE_NODE = "sbs::function::instance"
+SET_VARIABLE_NODE = "sbs::function::set"
+GET_VARIABLE_NODE_PREFIX = "sbs::function::get_"
+RANDOM_SEED_VARIABLE = "$randomseed"
+
+# Nodes which must never be merged, because their result depends on
+# the order they are evaluated in
+ORDER_DEPENDENT_NODES = frozenset((SET_VARIABLE_NODE, "sbs::function::sequence"))
+
+# Nodes which are expected to give a different value each time they are
+# used, so two of them with the same inputs are not duplicates
+RANDOM_NODES = frozenset(("sbs::function::rand",))
+
+VECTOR_COMPONENTS = (("x", "y", "z", "w"), ("r", "g", "b", "a"))
+
+
+@dataclass
+class FunctionGraphOptimizer(Optimizer):
+    """
+    Removes duplicate nodes inside function graphs.
+
+    Each node is reduced to a signature made from its definition, the
+    graph it instances, its parameter values and the nodes connected to
+    its inputs. Nodes with the same signature compute the same value, so
+    duplicates are found with a single dictionary lookup per node, rather
+    than comparing every pair. Identical constants are merged first, which
+    in turn gives arithmetic nodes using them identical inputs on the next
+    recursive run. Random nodes, and nodes reading the random seed, are
+    never merged.
+    """
+
+    def run(self):
+        function_nodes = self.get_nodes()
+        function_nodes.sort(key=lambda n: n.pos.x)
+        self._move_graph_output_node_first(function_nodes)
+
+        node_dict = self.find_duplicates(function_nodes)
+        self.delete_duplicate_nodes(node_dict)
+
+    def get_nodes(self) -> List[BWNode]:
+        nodes = [
+            node
+            for node in self.node_selection.nodes
+            if node.api_node.getDefinition().getId().startswith(FUNCTION_NODE_PREFIX)
+            and node.api_node.getDefinition().getId() not in ORDER_DEPENDENT_NODES
+            and not self._is_random(node)
+        ]
+
+        # Variables can change value during the evaluation of the graph,
+        # so get nodes are only the same if nothing ever sets a variable
+        if self._graph_sets_variables():
+            nodes = [n for n in nodes if not n.api_node.getDefinition().getId().startswith(GET_VARIABLE_NODE_PREFIX)]
+        return nodes
+
+    def find_duplicates(self, nodes: List[BWNode]) -> Dict[int, List[BWNode]]:
+        """
+        Returns a dictionary of unique node identifiers in the keys and a list
+        of duplicate nodes which match the unique node.
+        """
+        unique_nodes: Dict[int, List[BWNode]] = dict()
+        signatures: Dict[Hashable, int] = dict()
+        for node in nodes:
+            signature = self._get_signature(node)
+            if signature is None or signature not in signatures:
+                unique_nodes[node.identifier] = list()
+                if signature is not None:
+                    signatures[signature] = node.identifier
+                continue
+
+            unique_nodes[signatures[signature]].append(node)
+        return unique_nodes
+
+    @staticmethod
+    def _get_signature(node: BWNode) -> Optional[Tuple]:
+        """
+        Returns a hashable signature of everything that affects the value
+        of the node, or None if the node can not be compared.
+        """
+        definition_id = node.api_node.getDefinition().getId()
+        # Every function graph instance has the same definition id, so the
+        # label and the instanced graph tell them apart
+        signature = [definition_id, node.label]
+        if definition_id == FUNCTION_INSTANCE_NODE:
+            resource = node.api_node.getReferencedResource()
+            signature.append(None if resource is None else resource.getUrl())
+        for api_property in node.api_node.getProperties(SDPropertyCategory.Input):
+            if node.api_node.getPropertyGraph(api_property) is not None:
+                # Same as the other optimizers, a property with a function
+                # graph attached is never considered a duplicate
+                return None
+
+            if api_property.isConnectable():
+                connections = node.api_node.getPropertyConnections(api_property)
+                value = tuple(
+                    (
+                        connection.getInputPropertyNode().getIdentifier(),
+                        connection.getInputProperty().getId(),
+                    )
+                    for connection in connections
+                )
+            else:
+                value = node.api_node.getInputPropertyValueFromId(api_property.getId())
+                if value is not None:
+                    value = _get_value_key(value.get())
+                    if value is None:
+                        return None
+            signature.append((api_property.getId(), value))
+        return tuple(signature)
+
+    @staticmethod
+    def _is_random(node: BWNode) -> bool:
+        definition_id = node.api_node.getDefinition().getId()
+        if definition_id in RANDOM_NODES:
+            return True
+
+        if not definition_id.startswith(GET_VARIABLE_NODE_PREFIX):
+            return False
+        variable = node.api_node.getInputPropertyValueFromId("__constant__")
+        return variable is not None and variable.get() == RANDOM_SEED_VARIABLE
+
+    def _move_graph_output_node_first(self, nodes: List[BWNode]):
+        """
+        The output node of the graph can not be deleted, so it must be
+        the unique node when it has duplicates.
+        """
+        output_node = self.node_selection.api_graph.getOutputNode()
+        if output_node is None:
+            return
+
+        for i, node in enumerate(nodes):
+            if node.identifier == int(output_node.getIdentifier()):
+                nodes.insert(0, nodes.pop(i))
+                return
+
+    def _graph_sets_variables(self) -> bool:
+        return any(
+            api_node.getDefinition().getId() == SET_VARIABLE_NODE for api_node in self.node_selection.api_graph.getNodes()
+        )
+
+
+def _get_value_key(value: Any) -> Optional[Hashable]:
+    """
+    Returns a hashable key which is only equal for equal parameter values,
+    or None if the value is not understood. Vectors and colors are compared
+    by their components, and the type is part of the key, so 1 and 1.0 or
+    True are not the same value.
+    """
+    if isinstance(value, (bool, int, float, str)):
+        return (type(value).__name__, value)
+
+    if isinstance(value, (list, tuple)):
+        keys = tuple(_get_value_key(v) for v in value)
+        if any(k is None for k in keys):
+            return None
+        return (type(value).__name__, keys)
+
+    for components in VECTOR_COMPONENTS:
+        if hasattr(value, components[0]):
+            return _get_value_key([getattr(value, c) for c in components if hasattr(value, c)])
+    return None
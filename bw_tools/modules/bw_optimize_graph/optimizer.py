@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import TYPE_CHECKING, Dict, List, Optional
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
 
 import sd
 from sd.api.sdproperty import SDPropertyCategory, SDPropertyInheritanceMethod
@@ -12,6 +12,7 @@ from bw_tools.common.bw_api_tool import CompNodeID
 if TYPE_CHECKING:
     from bw_tools.common.bw_node import BWNode
     from bw_tools.common.bw_node_selection import BWNodeSelection
+    from sd.api.sdnode import SDNode
 
     from .bw_optimize_graph import BWOptimizeSettings
 
@@ -81,23 +82,58 @@ class Optimizer:
             )
 
     @staticmethod
-    def _set_output_size(node: BWNode, size: int):
+    def _get_absolute_output_size(node: BWNode) -> Optional[Tuple[int, int]]:
+        """
+        Returns the log2 width and height of a node with an absolute output
+        size, or None if the output size is inherited.
+        """
+        output_size_property = node.api_node.getPropertyFromId("$outputsize", SDPropertyCategory.Input)
+        if node.api_node.getPropertyInheritanceMethod(output_size_property) != SDPropertyInheritanceMethod.Absolute:
+            return None
+        value = node.api_node.getPropertyValue(output_size_property).get()
+        return value.x, value.y
+
+    @staticmethod
+    def _set_output_size(node: BWNode, size: int) -> bool:
+        """
+        Sets an absolute output size of size x size. Returns False, without
+        changing anything, if the node already had that output size.
+        """
+        if Optimizer._get_absolute_output_size(node) == (size, size):
+            return False
+
         output_size_property = node.api_node.getPropertyFromId("$outputsize", SDPropertyCategory.Input)
         node.api_node.setPropertyInheritanceMethod(output_size_property, SDPropertyInheritanceMethod.Absolute)
         node.api_node.setPropertyValue(
             output_size_property,
             sd.api.sdvalueint2.SDValueInt2.sNew(sd.api.sdbasetypes.int2(size, size)),
         )
+        return True
 
     @staticmethod
     def _set_connected_output_nodes_inheritance_method(node: BWNode, inheritance_method: SDPropertyInheritanceMethod):
+        """
+        Sets the output size inheritance of every node connected to the
+        outputs of the given node, which inherit their size from their input.
+
+        Output nodes are skipped. Connected nodes are gathered first, so
+        nodes connected more than once are only updated a single time.
+        Nodes further downstream do not need updating, as they will inherit
+        their size from the updated nodes.
+        """
+        connected_nodes: Dict[str, SDNode] = dict()
         for connection in node.output_connections:
             connected_node = connection.getInputPropertyNode()
-            output_size_property = connected_node.getPropertyFromId("$outputsize", SDPropertyCategory.Input)
+            connected_nodes.setdefault(connected_node.getIdentifier(), connected_node)
 
+        for connected_node in connected_nodes.values():
             # Ignore output nodes
             if connected_node.getDefinition().getId() == CompNodeID.OUTPUT.value:
-                return
+                continue
+
+            output_size_property = connected_node.getPropertyFromId("$outputsize", SDPropertyCategory.Input)
+            if output_size_property is None:
+                continue
 
             if (
                 connected_node.getPropertyInheritanceMethod(output_size_property)
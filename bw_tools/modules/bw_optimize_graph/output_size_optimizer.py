@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+from bw_tools.common.bw_api_tool import CompNodeID
+from sd.api.sdproperty import SDPropertyCategory, SDPropertyInheritanceMethod
+
+from . import optimizer
+
+if TYPE_CHECKING:
+    from bw_tools.common.bw_node import BWNode
+
+CONSTANT_OUTPUT_SIZE = 4  # 16x16, the optimal output size for Designer
+DEFAULT_PARENT_OUTPUT_SIZE = 11  # 2048x2048
+BYTES_PER_PIXEL = 8  # RGBA 16 bit, the default format
+
+# Atomic nodes which always output a constant image when all their inputs
+# are constant images. Their output size can be reduced along with their
+# inputs. Only per pixel color operations are listed. Nodes which sample
+# neighbouring pixels or move the image, such as blur or transformation,
+# can add borders or background to a constant image when tiling is off,
+# and blend can crop its result.
+CONSTANT_PRESERVING_NODES = frozenset(
+    (
+        "sbs::compositing::curve",
+        "sbs::compositing::gradient",
+        "sbs::compositing::grayscaleconversion",
+        "sbs::compositing::hsl",
+        "sbs::compositing::levels",
+        "sbs::compositing::shuffle",
+    )
+)
+
+
+def texture_bytes(output_size: int) -> int:
+    """Returns the estimated memory of a texture, given its log2 output size"""
+    return (2**output_size) ** 2 * BYTES_PER_PIXEL
+
+
+def _get_saved_bytes(previous_output_size: Optional[Tuple[int, int]], parent_output_size: int) -> int:
+    """
+    Returns the estimated memory saved by giving a node the constant output
+    size. An inherited output size is estimated as the size of the parent.
+    """
+    if previous_output_size is None:
+        size = parent_output_size
+    else:
+        size = max(previous_output_size)
+    return max(texture_bytes(size) - texture_bytes(CONSTANT_OUTPUT_SIZE), 0)
+
+
+@dataclass
+class OutputSizeOptimizer(optimizer.Optimizer):
+    """
+    Propagates the uniform color output size down chains of nodes which
+    only consume uniform colors.
+
+    A node is constant if it is a uniform color node, or if it preserves
+    constant images and all of its inputs are constant nodes inside the
+    selection. Constant nodes are forced to 16x16 and the nodes they feed
+    into are set relative to parent, in the same way as uniform color nodes.
+    """
+
+    optimized_count: int = 0
+    saved_bytes: int = 0
+    # The uniform color nodes resized by the uniform color optimizer, see
+    # UniformOptimizer.previous_output_sizes
+    resized_uniform_nodes: Dict[int, Optional[Tuple[int, int]]] = field(default_factory=dict)
+
+    def run(self):
+        self.optimized_count = 0
+        self.saved_bytes = 0
+
+        constant_nodes = self.find_constant_nodes()
+        parent_output_size = self._get_parent_output_size()
+
+        # Only nodes whose output size changed save memory, so running the
+        # optimizer again does not count the same nodes twice
+        for node in constant_nodes:
+            if node.api_node.getDefinition().getId() == CompNodeID.UNIFORM_COLOR.value:
+                # Already handled by the uniform color optimizer
+                if node.identifier in self.resized_uniform_nodes:
+                    self.saved_bytes += _get_saved_bytes(
+                        self.resized_uniform_nodes[node.identifier], parent_output_size
+                    )
+                continue
+
+            previous_output_size = self._get_absolute_output_size(node)
+            if not self._set_output_size(node, CONSTANT_OUTPUT_SIZE):
+                continue
+            self.saved_bytes += _get_saved_bytes(previous_output_size, parent_output_size)
+            self._set_connected_output_nodes_inheritance_method(node, SDPropertyInheritanceMethod.RelativeToParent)
+            self.optimized_count += 1
+
+    def find_constant_nodes(self) -> List[BWNode]:
+        constant: Dict[int, bool] = dict()
+        for node in self.node_selection.nodes:
+            stack = [node]
+            while stack:
+                current = stack[-1]
+                if current.identifier in constant:
+                    stack.pop()
+                    continue
+
+                pending = [n for n in current.input_nodes if n.identifier not in constant]
+                if pending:
+                    stack.extend(pending)
+                    continue
+
+                constant[current.identifier] = self._is_constant(current, constant)
+                stack.pop()
+
+        constant_nodes = [n for n in self.node_selection.nodes if constant[n.identifier]]
+        constant_nodes.sort(key=lambda n: n.pos.x)
+        return constant_nodes
+
+    def _is_constant(self, node: BWNode, constant: Dict[int, bool]) -> bool:
+        definition_id = node.api_node.getDefinition().getId()
+        if definition_id == CompNodeID.UNIFORM_COLOR.value:
+            return True
+
+        if definition_id not in CONSTANT_PRESERVING_NODES:
+            return False
+
+        if not node.has_input_nodes_connected:
+            return False
+
+        if not all(constant[n.identifier] for n in node.input_nodes):
+            return False
+
+        if self._has_input_outside_selection(node):
+            return False
+
+        return self._output_size_can_change(node)
+
+    def _has_input_outside_selection(self, node: BWNode) -> bool:
+        for api_property in node.input_connectable_properties:
+            for connection in node.api_node.getPropertyConnections(api_property):
+                identifier = int(connection.getInputPropertyNode().getIdentifier())
+                if not any(n.identifier == identifier for n in node.input_nodes):
+                    return True
+        return False
+
+    @staticmethod
+    def _output_size_can_change(node: BWNode) -> bool:
+        """
+        Only nodes with an inherited output size are changed. An absolute
+        size, or a function graph on the output size, was set by the user.
+        """
+        output_size_property = node.api_node.getPropertyFromId("$outputsize", SDPropertyCategory.Input)
+        if output_size_property is None:
+            return False
+
+        if node.api_node.getPropertyGraph(output_size_property) is not None:
+            return False
+
+        return node.api_node.getPropertyInheritanceMethod(output_size_property) in (
+            SDPropertyInheritanceMethod.RelativeToInput,
+            SDPropertyInheritanceMethod.RelativeToParent,
+        )
+
+    def _get_parent_output_size(self) -> int:
+        value = self.node_selection.api_graph.getPropertyValueFromId("$outputsize", SDPropertyCategory.Input)
+        if value is None:
+            return DEFAULT_PARENT_OUTPUT_SIZE
+        return max(value.get().x, value.get().y)
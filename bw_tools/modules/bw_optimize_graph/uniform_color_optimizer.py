@@ -1,7 +1,7 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import TYPE_CHECKING
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
 
 from bw_tools.common.bw_api_tool import CompNodeID
 from sd.api.sdproperty import SDPropertyInheritanceMethod
@@ -15,8 +15,12 @@ if TYPE_CHECKING:
 @dataclass
 class UniformOptimizer(optimizer.Optimizer):
     optimized_count = 0
+    # The absolute output size of each resized node before it was changed,
+    # keyed by identifier, or None if it was inherited
+    previous_output_sizes: Dict[int, Optional[Tuple[int, int]]] = field(default_factory=dict)
 
     def run(self):
+        self.previous_output_sizes = dict()
         uniform_color_nodes = self.get_nodes(CompNodeID.UNIFORM_COLOR)
         uniform_color_nodes.sort(key=lambda n: n.pos.x)
 
@@ -25,5 +29,7 @@ class UniformOptimizer(optimizer.Optimizer):
         self.optimized_count = len(uniform_color_nodes)
 
     def _optimize_output_size(self, node: BWNode):
-        self._set_output_size(node, 4)
+        previous_output_size = self._get_absolute_output_size(node)
+        if self._set_output_size(node, 4):
+            self.previous_output_sizes[node.identifier] = previous_output_size
         self._set_connected_output_nodes_inheritance_method(node, SDPropertyInheritanceMethod.RelativeToParent)
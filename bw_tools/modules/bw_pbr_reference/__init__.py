@@ -0,0 +1,8 @@
+from bw_tools.common.bw_manifest import BWMenuEntryManifest, BWModuleManifest
+
+MANIFEST = BWModuleManifest(
+    name="bw_pbr_reference",
+    menu_entries=[
+        BWMenuEntryManifest(label="Open PBR Chart", callback="open_pbr_chart"),
+    ],
+)
@@ -3,9 +3,9 @@ from __future__ import annotations
 from pathlib import Path
 from typing import TYPE_CHECKING, Dict
 
-from bw_tools.common import bw_ui_tools
+from bw_tools.common import bw_resources, bw_ui_tools
 from PySide6.QtCore import Qt
-from PySide6.QtGui import QCursor, QMouseEvent, QPixmap
+from PySide6.QtGui import QCursor, QMouseEvent
 from PySide6.QtWidgets import (
     QApplication,
     QColorDialog,
@@ -167,10 +167,8 @@ class BWPBRReference(QDialog):
         self.main_layout.addLayout(layout)
 
         layout.addStretch()
-        pixmap = QPixmap(str(self.close_button_image_path.resolve()))
-        pixmap = pixmap.scaled(15, 15, Qt.KeepAspectRatio, Qt.SmoothTransformation)
         self.close_button = QLabel()
-        self.close_button.setPixmap(pixmap)
+        self.close_button.setPixmap(bw_resources.get_pixmap(self.close_button_image_path, 15))
         self.close_button.mouseReleaseEvent = self._close_window
         layout.addWidget(self.close_button)
 
@@ -182,15 +180,8 @@ class BWPBRReference(QDialog):
 
         self.main_layout.addWidget(bw_ui_tools.label("Roughness"))
         pixmap_scale = (self.swatch_size * 10) + (9 * 5)
-        pixmap = QPixmap(str(self.nonmetal_roughness_image_path.resolve()))
-        pixmap = pixmap.scaled(
-            pixmap_scale,
-            pixmap_scale,
-            Qt.KeepAspectRatio,
-            Qt.SmoothTransformation,
-        )
         nonmetal_roughness = QLabel()
-        nonmetal_roughness.setPixmap(pixmap)
+        nonmetal_roughness.setPixmap(bw_resources.get_pixmap(self.nonmetal_roughness_image_path, pixmap_scale))
         self.main_layout.addWidget(nonmetal_roughness)
         gradient_widget = QLabel()
         gradient_style = """
@@ -199,15 +190,8 @@ class BWPBRReference(QDialog):
         gradient_widget.setStyleSheet(gradient_style)
         gradient_widget.setFixedHeight(self.swatch_size / 1.5)
         self.main_layout.addWidget(gradient_widget)
-        pixmap = QPixmap(str(self.metal_roughness_image_path.resolve()))
-        pixmap = pixmap.scaled(
-            pixmap_scale,
-            pixmap_scale,
-            Qt.KeepAspectRatio,
-            Qt.SmoothTransformation,
-        )
         metal_roughness = QLabel()
-        metal_roughness.setPixmap(pixmap)
+        metal_roughness.setPixmap(bw_resources.get_pixmap(self.metal_roughness_image_path, pixmap_scale))
         self.main_layout.addWidget(metal_roughness)
 
         self.main_layout.addWidget(bw_ui_tools.separator())
@@ -218,8 +202,3 @@ def open_pbr_chart(api: BWAPITool):
 
     pbr_reference_dialog = BWPBRReference(parent=None)
     pbr_reference_dialog.show()
-
-
-def on_initialize(api: BWAPITool):
-    action = api.menu.addAction("Open PBR Chart")
-    action.triggered.connect(lambda: open_pbr_chart(api))
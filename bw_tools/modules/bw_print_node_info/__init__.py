@@ -0,0 +1,34 @@
+from bw_tools.common.bw_manifest import (
+    BWActionManifest,
+    BWMenuEntryManifest,
+    BWModuleManifest,
+)
+
+MANIFEST = BWModuleManifest(
+    name="bw_print_node_info",
+    actions=[
+        BWActionManifest(
+            id="bw_print_info",
+            callback="print_node_info",
+            text="Info",
+            tooltip="Prints API information about the selected nodes.",
+        ),
+    ],
+    menu_entries=[
+        BWMenuEntryManifest(
+            label="Export Node Info...",
+            callback="on_clicked_export_node_info",
+            tooltip="Writes the selected nodes and their property values to a file, one json record per line",
+        ),
+        BWMenuEntryManifest(
+            label="Export Node Structure...",
+            callback="on_clicked_export_node_structure",
+            tooltip="Writes the selected nodes and their properties, without values, to a file",
+        ),
+        BWMenuEntryManifest(
+            label="Export Graph For Benchmarking...",
+            callback="on_clicked_export_graph",
+            tooltip="Writes the current graph to a file which the tools can be run on outside of Designer",
+        ),
+    ],
+)
@@ -1,47 +1,152 @@
-from functools import partial
+import json
+from pathlib import Path
+from typing import Dict, Iterable, List, TextIO, Union
 
-from PySide6.QtGui import QAction
+from PySide6 import QtWidgets
+from sd.api.sdnode import SDNode
+from sd.api.sdproperty import SDProperty, SDPropertyCategory
 
-import sd
 from bw_tools.common import bw_api_tool
+from bw_tools.common.bw_graph_interchange import to_json_value, write_graph
+
+PROPERTY_CATEGORIES = (
+    SDPropertyCategory.Annotation,
+    SDPropertyCategory.Input,
+    SDPropertyCategory.Output,
+)
 
 
 def _get_properties(node, category):
-    ret = f"{category.name}:\n"
+    lines = [f"{category.name}:"]
     for p in node.getProperties(category):
-        value = node.getPropertyValueFromId(p.getId(), category)
+        value = node.getPropertyValue(p)
         if value:
             value = value.get()
-        ret += f"\t{p.getId()} : {value}\n"
-    return ret
+        lines.append(f"\t{p.getId()} : {value}")
+    return lines
 
 
 def print_node_info(api: bw_api_tool.BWAPITool):
     for node in api.ui_mgr.getCurrentGraphSelection():
-        ret = (
-            f'{"=" * 20}\n'
-            "Position:\n"
-            f"\t{node.getPosition()}\n"
-            "Definition:\n"
-            f"\tIdentifier: {node.getIdentifier()}\n"
-            f"\tID: {node.getDefinition().getId()}\n"
-            f"\tLabel: {node.getDefinition().getLabel()}\n"
-        )
-        ret += _get_properties(node, sd.api.sdproperty.SDPropertyCategory.Annotation)
-        ret += _get_properties(node, sd.api.sdproperty.SDPropertyCategory.Input)
-        ret += _get_properties(node, sd.api.sdproperty.SDPropertyCategory.Output)
-        ret += f'{"=" * 20}\n'
-        print(ret)
-
-
-def on_graph_created(graph_view_id, api: bw_api_tool.BWAPITool):
-    toolbar = api.get_graph_view_toolbar(graph_view_id)
-
-    action = QAction("Info")
-    action.setToolTip("Prints API information about the selected nodes.")
-    action.triggered.connect(lambda: print_node_info(api))
-    toolbar.add_action("bw_print_info", action)
-
-
-def on_initialize(api: bw_api_tool.BWAPITool):
-    api.register_on_graph_view_created_callback(partial(on_graph_created, api=api))
+        lines = [
+            "=" * 20,
+            "Position:",
+            f"\t{node.getPosition()}",
+            "Definition:",
+            f"\tIdentifier: {node.getIdentifier()}",
+            f"\tID: {node.getDefinition().getId()}",
+            f"\tLabel: {node.getDefinition().getLabel()}",
+        ]
+        for category in PROPERTY_CATEGORIES:
+            lines.extend(_get_properties(node, category))
+        lines.append("=" * 20)
+        print("\n".join(lines))
+
+
+def _get_property_record(node: SDNode, api_property: SDProperty, include_values: bool) -> Dict:
+    record = {
+        "id": api_property.getId(),
+        "type": api_property.getType().getId(),
+        "connectable": api_property.isConnectable(),
+    }
+    if include_values:
+        value = node.getPropertyValue(api_property)
+        record["value"] = None if value is None else to_json_value(value.get())
+    return record
+
+
+def get_node_record(node: SDNode, include_values: bool = True) -> Dict:
+    """
+    Returns the information about a node written by export_node_info. If
+    include_values is False, property values are not read, which is much
+    faster since each value is a separate API call.
+    """
+    pos = node.getPosition()
+    definition = node.getDefinition()
+    return {
+        "identifier": node.getIdentifier(),
+        "definition_id": definition.getId(),
+        "label": definition.getLabel(),
+        "position": [pos.x, pos.y],
+        "properties": {
+            category.name.lower(): [
+                _get_property_record(node, p, include_values) for p in node.getProperties(category)
+            ]
+            for category in PROPERTY_CATEGORIES
+        },
+    }
+
+
+def export_node_info(nodes: Iterable[SDNode], output: TextIO, include_values: bool = True) -> int:
+    """
+    Writes one json record per node to output, one per line, as each node
+    is read. Returns the number of nodes written.
+    """
+    count = 0
+    for node in nodes:
+        output.write(json.dumps(get_node_record(node, include_values)))
+        output.write("\n")
+        count += 1
+    return count
+
+
+def export_node_info_to_file(
+    nodes: Iterable[SDNode],
+    file_path: Union[str, Path],
+    include_values: bool = True,
+) -> int:
+    with open(file_path, "w") as output:
+        return export_node_info(nodes, output, include_values)
+
+
+def _get_nodes_to_export(api: bw_api_tool.BWAPITool) -> List[SDNode]:
+    nodes = api.current_node_selection
+    if len(nodes) == 0 and api.current_graph is not None:
+        nodes = api.current_graph.getNodes()
+    return list(nodes)
+
+
+def _export(api: bw_api_tool.BWAPITool, include_values: bool):
+    nodes = _get_nodes_to_export(api)
+    if not nodes:
+        api.log.error("There are no nodes to export")
+        return
+
+    file_path, _ = QtWidgets.QFileDialog.getSaveFileName(
+        None, "Export Node Info", "", "Newline delimited json (*.ndjson)"
+    )
+    if not file_path:
+        return
+
+    try:
+        count = export_node_info_to_file(nodes, file_path, include_values)
+    except OSError as e:
+        api.log.error(f"Unable to write node info: {e}")
+        return
+    api.log.info(f"Exported {count} nodes to {file_path}")
+
+
+def on_clicked_export_node_info(api: bw_api_tool.BWAPITool):
+    _export(api, include_values=True)
+
+
+def on_clicked_export_node_structure(api: bw_api_tool.BWAPITool):
+    _export(api, include_values=False)
+
+
+def on_clicked_export_graph(api: bw_api_tool.BWAPITool):
+    """Writes the current graph in the format read by bw_graph_interchange"""
+    if api.current_graph is None:
+        api.log.error("Open a graph to export")
+        return
+
+    file_path, _ = QtWidgets.QFileDialog.getSaveFileName(None, "Export Graph", "", "Json (*.json)")
+    if not file_path:
+        return
+
+    try:
+        write_graph(api.current_graph, file_path, include_values=True)
+    except OSError as e:
+        api.log.error(f"Unable to write graph: {e}")
+        return
+    api.log.info(f"Exported graph to {file_path}")
@@ -0,0 +1,12 @@
+from bw_tools.common.bw_manifest import BWMenuEntryManifest, BWModuleManifest
+
+MANIFEST = BWModuleManifest(
+    name="bw_settings",
+    menu_entries=[
+        BWMenuEntryManifest(
+            label="Settings...",
+            callback="on_clicked_settings",
+            tooltip="BW Tools Settings",
+        ),
+    ],
+)
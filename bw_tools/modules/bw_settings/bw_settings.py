@@ -1,56 +1,81 @@
-import json
-import operator
 from dataclasses import dataclass
-from functools import reduce
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict
 
 from bw_tools.common.bw_api_tool import BWAPITool
-from bw_tools.modules.bw_settings.bw_settings_dialog import SettingsDialog
-from PySide6.QtGui import QAction
+
+from . import settings_store
+
+
+class BWSetting:
+    """
+    Declares a setting on a BWModuleSettings subclass, given the names of
+    the setting and any group boxes it is inside of. For example
+    BWSetting("Mainline Settings", "Offset Amount").
+    """
+
+    def __init__(self, *names: str):
+        self.path = ";content;".join(names) + ";value"
 
 
 @dataclass
 class BWModuleSettings:
-    file_path: Path
+    """
+    Base class for the settings of a module.
 
-    @staticmethod
-    def _get_from_dict(data: Dict, keys: List[str]):
-        return reduce(operator.getitem, keys, data)
+    Subclasses declare their settings as class attributes using BWSetting.
+    When constructed, each declared setting is set on the instance from the
+    validated values of the settings file, so reading a setting is a plain
+    attribute read.
+    """
 
-    def get(self, setting: str) -> Any:
+    file_path: Path
+
+    def __post_init__(self):
         try:
-            with open(self.file_path) as settings_file:
-                data = json.load(settings_file)
+            values = settings_store.values(self.file_path)
         except FileNotFoundError:
             raise FileNotFoundError(f"Unable to open {self.file_path}. The file was not found")
 
-        keys = setting.split(";")
+        for name, setting in self._declared_settings().items():
+            try:
+                self.__dict__[name] = values[setting.path]
+            except KeyError:
+                raise KeyError(
+                    f"Unable to get {setting.path} from settings file. " "It was not found inside the file."
+                )
 
+    @classmethod
+    def _declared_settings(cls) -> Dict[str, BWSetting]:
         try:
-            ret = self._get_from_dict(data, keys)
+            return cls.__dict__["_settings"]
         except KeyError:
-            raise KeyError(f"Unable to get {setting} from settings file. " "It was not found inside the file.")
+            pass
 
+        settings = dict()
+        for klass in reversed(cls.__mro__):
+            for name, value in vars(klass).items():
+                if isinstance(value, BWSetting):
+                    settings[name] = value
+        cls._settings = settings
+        return settings
+
+    def get(self, setting: str) -> Any:
+        try:
+            return settings_store.lookup(self.file_path, setting)
         except FileNotFoundError:
             raise FileNotFoundError(f"Unable to open {self.file_path}. The file was not found")
-        else:
-            return ret
+        except KeyError:
+            raise KeyError(f"Unable to get {setting} from settings file. " "It was not found inside the file.")
 
 
 class Settings(BWModuleSettings):
-    def __init__(self, file_path: Path):
-        super().__init__(file_path)
-        self.dev_mode: bool = self.get("Dev Mode;value")
-
-
-def on_initialize(api: BWAPITool):
-    settings_action: QAction = api.menu.addAction("Settings...")
-    settings_action.setMenuRole(QAction.NoRole)
-    settings_action.setToolTip("BW Tools Settings")
-    settings_action.triggered.connect(lambda: on_clicked_settings(api))
+    dev_mode: bool = BWSetting("Dev Mode")
 
 
 def on_clicked_settings(api: BWAPITool):
+    # Imported here so modules reading their settings do not load the dialog
+    from bw_tools.modules.bw_settings.bw_settings_dialog import SettingsDialog
+
     dialog = SettingsDialog(api)
     dialog.show()
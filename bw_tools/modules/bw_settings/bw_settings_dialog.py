@@ -20,7 +20,7 @@ from PySide6.QtWidgets import (
     QWidget,
 )
 
-from . import setting_writer, settings_loader
+from . import setting_writer, settings_loader, settings_store
 
 
 class SettingsDialog(QDialog):
@@ -34,6 +34,11 @@ class SettingsDialog(QDialog):
     The dialog uses a model which directly correllates to the settings file,
     where each QStandardItem.text() contains the str representation of every
     value and the actual value in QStandardItem.data().
+
+    Only the module names are added to the model when the dialog opens. A
+    module's settings file is read and its page is built the first time the
+    module is selected, so opening the dialog does not depend on the number
+    of modules loaded.
     """
 
     def __init__(self, api: BWAPITool):
@@ -53,7 +58,6 @@ class SettingsDialog(QDialog):
         self._module_setting_widgets: dict[str, Type[QWidget]] = {}
 
         self._add_modules_to_model()
-        self._create_module_setting_widgets()
         self._create_ui()
 
         # Select first item in list
@@ -82,31 +86,34 @@ class SettingsDialog(QDialog):
             raise FileNotFoundError("This module has no settings.")
 
         try:
-            with open(str(file_path.resolve())) as settings_file:
-                data = json.load(settings_file)
+            data = settings_store.read(file_path)
         except json.JSONDecodeError:
             raise FileNotFoundError("Unable to load settings. Settings file is invalid.")
         else:
             return data
 
+    def get_settings_file_path(self, module_name: str) -> Path:
+        return self.settings_file_dir / module_name / f"{module_name}_settings.json"
+
     def on_clicked_module(self):
         module = self.get_selected_module_item_from_model()
         if module is None:
             return
-        module_name = module.text()
-        for name, widget in self._module_setting_widgets.items():
-            if module_name == name:
-                widget.show()
-            else:
+        selected_widget = self._get_module_setting_widget(module)
+        for widget in self._module_setting_widgets.values():
+            if widget is not selected_widget:
                 widget.hide()
+        selected_widget.show()
 
     def on_clicked_apply(self):
+        # Modules which have never been selected cannot have been edited,
+        # so only the pages that were built need writing
         for row in range(self.module_model.rowCount()):
             module_item = self.module_model.item(row, 0)
+            if module_item.text() not in self._module_setting_widgets:
+                continue
 
-            settings_file_path: Path = (
-                self.settings_file_dir / module_item.text() / f"{module_item.text()}_settings.json"
-            )
+            settings_file_path = self.get_settings_file_path(module_item.text())
             if not settings_file_path.exists():
                 continue
 
@@ -123,14 +130,15 @@ class SettingsDialog(QDialog):
             module_item = QStandardItem(module)
             self.module_model.setItem(row, 0, module_item)
 
-            try:
-                settings = self.get_settings_for_module(self.settings_file_dir / module / f"{module}_settings.json")
-            except FileNotFoundError as e:
-                module_item.setData(e)
-            else:
-                self._add_module_settings_to_model(
-                    module_item, settings
-                )  # Must take in settings, as setting data will reorder
+    def _load_module_settings_into_model(self, module_item: QStandardItem):
+        try:
+            settings = self.get_settings_for_module(self.get_settings_file_path(module_item.text()))
+        except FileNotFoundError as e:
+            module_item.setData(e)
+        else:
+            self._add_module_settings_to_model(
+                module_item, settings
+            )  # Must take in settings, as setting data will reorder
 
     def _add_module_settings_to_model(self, parent_item: QStandardItem, settings: Dict):
         for setting_name, setting_params in settings.items():
@@ -189,15 +197,23 @@ class SettingsDialog(QDialog):
                 setting_item.appendRow(content_param_item)
                 self._add_module_settings_to_model(content_param_item, content)
 
-    def _create_module_setting_widgets(self):
-        for i in range(self.module_model.rowCount()):
-            module_item = self.module_model.item(i, 0)
-            module_name = module_item.text()
+    def _get_module_setting_widget(self, module_item: QStandardItem) -> QWidget:
+        """
+        Returns the settings page for the given module, reading the settings
+        file and building the page the first time it is requested.
+        """
+        module_name = module_item.text()
+        try:
+            return self._module_setting_widgets[module_name]
+        except KeyError:
+            pass
 
-            module_widget = settings_loader.get_module_widget(module_item, self.module_model)
-            self.module_settings_layout.addWidget(module_widget)
+        self._load_module_settings_into_model(module_item)
+        module_widget = settings_loader.get_module_widget(module_item, self.module_model)
+        self.module_settings_layout.addWidget(module_widget)
 
-            self._module_setting_widgets[module_name] = module_widget
+        self._module_setting_widgets[module_name] = module_widget
+        return module_widget
 
     def _create_ui(self):
         self._ui_frame_modules_list(0)
@@ -2,7 +2,7 @@ import json
 from pathlib import Path
 from typing import Any, Dict
 
-from bw_tools.modules.bw_settings import settings_loader
+from bw_tools.modules.bw_settings import settings_loader, settings_registry
 from PySide6.QtGui import QStandardItem
 
 
@@ -11,6 +11,7 @@ def write_module_settings(module_item: QStandardItem, file_path: Path):
 
     with open(file_path, "w") as settings_file:
         json.dump(data, settings_file, indent=4)
+    settings_registry.publish(file_path)
 
 
 def _build_dict(parent_item: QStandardItem, data: Dict[Any, Any]) -> Dict[Any, Any]:
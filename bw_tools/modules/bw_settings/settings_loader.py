@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-from enum import Enum
 from typing import TYPE_CHECKING, Any, List, Tuple, Type
 
 from bw_tools.modules.bw_settings.bw_settings_model import BWModuleModel
@@ -16,20 +15,12 @@ from bw_tools.modules.bw_settings.widgets import (
 )
 from PySide6.QtWidgets import QLabel, QLayout, QVBoxLayout, QWidget
 
+from .settings_schema import WidgetTypes
+
 if TYPE_CHECKING:
     from PySide6.QtGui import QStandardItem, QStandardItemModel
 
 
-class WidgetTypes(Enum):
-    GROUPBOX = 0
-    LINEEDIT = 1
-    SPINBOXINT = 2
-    SPINBOXFLOAT = 3
-    CHECKBOX = 4
-    COMBOBOX = 5
-    RGBA = 6
-
-
 WIDGET_MAP = {
     WidgetTypes.GROUPBOX.value: BWGroupBox,
     WidgetTypes.LINEEDIT.value: BWStringValueWidget,
@@ -0,0 +1,69 @@
+"""
+Shares settings objects between actions and notifies modules when their
+settings are saved.
+
+Modules get their settings with get_settings(), which only builds a new
+settings object after the file has changed. Modules subscribe to their
+settings file to update anything built from the settings, such as hotkeys,
+when the settings dialog saves it.
+"""
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple, Type, TypeVar, Union
+
+from . import settings_store
+
+BW_SETTINGS = TypeVar("BW_SETTINGS")
+
+_subscribers: Dict[str, List[Callable[[], None]]] = dict()
+_settings: Dict[Tuple[Type, str], Tuple[object, Dict]] = dict()
+
+
+def get_settings(settings_class: Type[BW_SETTINGS], file_path: Union[str, Path]) -> BW_SETTINGS:
+    """
+    Returns the settings object for the given file, constructing it only if
+    the file has changed since the last call.
+    """
+    key = (settings_class, settings_store.file_key(file_path))
+    values = settings_store.values(file_path)
+    try:
+        settings, settings_values = _settings[key]
+    except KeyError:
+        pass
+    else:
+        if settings_values is values:
+            return settings
+
+    settings = settings_class(Path(file_path))
+    _settings[key] = (settings, values)
+    return settings
+
+
+def subscribe(file_path: Union[str, Path], callback: Callable[[], None]):
+    """Calls the callback every time the settings file is saved"""
+    _subscribers.setdefault(settings_store.file_key(file_path), list()).append(callback)
+
+
+def unsubscribe(file_path: Union[str, Path], callback: Callable[[], None]):
+    try:
+        _subscribers[settings_store.file_key(file_path)].remove(callback)
+    except (KeyError, ValueError):
+        pass
+
+
+def publish(file_path: Union[str, Path]):
+    """
+    Notifies the subscribers of a settings file that it has been saved.
+    Cached settings are dropped first, so subscribers read the new values.
+    """
+    key = settings_store.file_key(file_path)
+    settings_store.invalidate(file_path)
+    for settings_key in [k for k in _settings if k[1] == key]:
+        del _settings[settings_key]
+
+    for callback in list(_subscribers.get(key, [])):
+        callback()
+
+
+def clear():
+    _subscribers.clear()
+    _settings.clear()
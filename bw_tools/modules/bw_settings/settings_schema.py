@@ -0,0 +1,133 @@
+"""
+Compiles the settings of a module into a flat, typed schema.
+
+A schema maps the full path of every setting, for example
+"Mainline Settings;content;Offset Amount;value", to a BWSettingSpec
+describing its type, default value and valid range. Settings files are
+validated against the schema once when they are loaded, so the settings
+objects only need to read the resolved values.
+"""
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Dict, List, Optional, Tuple
+
+MIN_SPINBOX_VALUE = 0
+MAX_SPINBOX_VALUE = 999  # Matches the maximum of the settings dialog spin boxes
+
+
+class WidgetTypes(Enum):
+    GROUPBOX = 0
+    LINEEDIT = 1
+    SPINBOXINT = 2
+    SPINBOXFLOAT = 3
+    CHECKBOX = 4
+    COMBOBOX = 5
+    RGBA = 6
+
+
+class BWSettingsValidationError(ValueError):
+    def __init__(self, path: str, reason: str):
+        super().__init__(f"{path.replace(';content;', ' > ').replace(';value', '')} {reason}")
+
+
+@dataclass(frozen=True)
+class BWSettingSpec:
+    path: str
+    widget: WidgetTypes
+    default: Any
+    choices: Optional[Tuple[Any, ...]] = None
+
+    def validate(self, value: Any) -> Any:
+        """
+        Returns the value converted to the type of the setting. Raises
+        BWSettingsValidationError if the value is not valid.
+        """
+        if self.widget in (WidgetTypes.LINEEDIT, WidgetTypes.COMBOBOX):
+            if not isinstance(value, str):
+                raise BWSettingsValidationError(self.path, "must be a string")
+            if self.choices is not None and value not in self.choices:
+                raise BWSettingsValidationError(self.path, f"must be one of {', '.join(self.choices)}")
+            return value
+
+        if self.widget is WidgetTypes.CHECKBOX:
+            if not isinstance(value, bool):
+                raise BWSettingsValidationError(self.path, "must be true or false")
+            return value
+
+        if self.widget in (WidgetTypes.SPINBOXINT, WidgetTypes.SPINBOXFLOAT):
+            allowed = int if self.widget is WidgetTypes.SPINBOXINT else (int, float)
+            if isinstance(value, bool) or not isinstance(value, allowed):
+                raise BWSettingsValidationError(self.path, "must be a number")
+            if not MIN_SPINBOX_VALUE <= value <= MAX_SPINBOX_VALUE:
+                raise BWSettingsValidationError(
+                    self.path, f"must be between {MIN_SPINBOX_VALUE} and {MAX_SPINBOX_VALUE}"
+                )
+            return value if self.widget is WidgetTypes.SPINBOXINT else float(value)
+
+        if self.widget is WidgetTypes.RGBA:
+            if (
+                not isinstance(value, (list, tuple))
+                or len(value) != 4
+                or any(isinstance(v, bool) or not isinstance(v, (int, float)) for v in value)
+            ):
+                raise BWSettingsValidationError(self.path, "must be a list of 4 numbers")
+            if any(not 0.0 <= v <= 1.0 for v in value):
+                raise BWSettingsValidationError(self.path, "must be between 0.0 and 1.0")
+            return [float(v) for v in value]
+
+        raise BWSettingsValidationError(self.path, "has no value")
+
+
+def compile_schema(settings: Dict, parent_path: str = "") -> Dict[str, BWSettingSpec]:
+    """
+    Returns the schema for the given settings, which is either the result
+    of get_default_settings() or the contents of a settings file.
+    """
+    schema: Dict[str, BWSettingSpec] = dict()
+    for setting_name, setting_params in settings.items():
+        path = f"{parent_path}{setting_name}"
+        try:
+            widget = WidgetTypes(setting_params["widget"])
+        except (KeyError, TypeError, ValueError):
+            continue
+
+        if widget is WidgetTypes.GROUPBOX:
+            schema.update(compile_schema(setting_params.get("content", {}), f"{path};content;"))
+            continue
+
+        choices = setting_params.get("list")
+        spec = BWSettingSpec(
+            f"{path};value",
+            widget,
+            setting_params.get("value"),
+            tuple(choices) if choices is not None else None,
+        )
+        schema[spec.path] = spec
+    return schema
+
+
+def resolve(schema: Dict[str, BWSettingSpec], data: Dict) -> Tuple[Dict[str, Any], List[str]]:
+    """
+    Returns the validated value of every setting in the schema, read from
+    the given settings file data, along with a list of errors found.
+
+    Settings which are missing or invalid use the default value instead.
+    """
+    values: Dict[str, Any] = dict()
+    errors: List[str] = list()
+    for path, spec in schema.items():
+        value = data
+        try:
+            for key in path.split(";"):
+                value = value[key]
+        except (KeyError, TypeError):
+            errors.append(str(BWSettingsValidationError(path, "is missing")))
+            values[path] = spec.default
+            continue
+
+        try:
+            values[path] = spec.validate(value)
+        except BWSettingsValidationError as e:
+            errors.append(str(e))
+            values[path] = spec.default
+    return values, errors
@@ -0,0 +1,127 @@
+"""
+In memory cache of the module settings files.
+
+Each <module_name>_settings.json is parsed once and every setting looked up
+from it is remembered, so building a settings object does not touch the
+disk again. The file is parsed again if its modification time changes, or
+if it is invalidated after being written by the settings dialog.
+
+Modules register the schema compiled from their default settings when the
+plugin loads, which validates the file. The settings objects then read
+the resolved values, see values().
+
+The returned data is shared between all callers and must not be modified.
+"""
+import json
+import operator
+import os
+from dataclasses import dataclass, field
+from functools import reduce
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+from .settings_schema import BWSettingSpec, compile_schema, resolve
+
+
+@dataclass
+class BWCachedSettings:
+    mtime: float
+    data: Dict
+    values: Dict[str, Any] = field(default_factory=dict)
+    resolved: Optional[Dict[str, Any]] = None
+    errors: List[str] = field(default_factory=list)
+
+
+_cache: Dict[str, BWCachedSettings] = dict()
+_schemas: Dict[str, Dict[str, BWSettingSpec]] = dict()
+
+
+def file_key(file_path: Union[str, Path]) -> str:
+    return os.path.normpath(str(file_path))
+
+
+def _load(file_path: Union[str, Path]) -> BWCachedSettings:
+    key = file_key(file_path)
+    mtime = os.stat(key).st_mtime
+    try:
+        cached = _cache[key]
+    except KeyError:
+        pass
+    else:
+        if cached.mtime == mtime:
+            return cached
+
+    with open(key) as settings_file:
+        data = json.load(settings_file)
+
+    cached = BWCachedSettings(mtime, data)
+    _cache[key] = cached
+    return cached
+
+
+def read(file_path: Union[str, Path]) -> Dict:
+    """
+    Returns the parsed settings file. Raises FileNotFoundError if the file
+    does not exist and json.JSONDecodeError if it is invalid.
+    """
+    return _load(file_path).data
+
+
+def lookup(file_path: Union[str, Path], setting: str) -> Any:
+    """
+    Returns a setting from the file, given its path as a series of keys
+    separated by ;. For example "Mainline Settings;content;Offset Amount;value"
+    """
+    cached = _load(file_path)
+    try:
+        return cached.values[setting]
+    except KeyError:
+        pass
+
+    value = reduce(operator.getitem, setting.split(";"), cached.data)
+    cached.values[setting] = value
+    return value
+
+
+def values(file_path: Union[str, Path]) -> Dict[str, Any]:
+    """
+    Returns the validated value of every setting in the file, keyed by the
+    full setting path. Settings are validated against the registered schema,
+    or a schema compiled from the file itself if none was registered.
+    """
+    cached = _load(file_path)
+    if cached.resolved is None:
+        try:
+            schema = _schemas[file_key(file_path)]
+        except KeyError:
+            schema = compile_schema(cached.data)
+        cached.resolved, cached.errors = resolve(schema, cached.data)
+    return cached.resolved
+
+
+def register_schema(file_path: Union[str, Path], default_settings: Dict) -> List[str]:
+    """
+    Compiles the schema for a settings file from the default settings of
+    the module and validates the file against it. Returns the errors found,
+    invalid or missing settings will use their default value.
+    """
+    key = file_key(file_path)
+    _schemas[key] = compile_schema(default_settings)
+
+    cached = _cache.get(key)
+    if cached is not None:
+        cached.resolved = None
+
+    values(file_path)
+    return list(_cache[key].errors)
+
+
+def invalidate(file_path: Optional[Union[str, Path]] = None):
+    """
+    Removes a settings file from the cache, or every file if no path is
+    given. The file will be parsed again the next time it is read.
+    """
+    if file_path is None:
+        _cache.clear()
+        return
+    _cache.pop(file_key(file_path), None)
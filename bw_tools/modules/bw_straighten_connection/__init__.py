@@ -0,0 +1,63 @@
+from bw_tools.common.bw_manifest import (
+    BWActionManifest,
+    BWMenuEntryManifest,
+    BWModuleManifest,
+)
+
+MANIFEST = BWModuleManifest(
+    name="bw_straighten_connection",
+    has_settings=True,
+    actions=[
+        BWActionManifest(
+            id="bw_straighten_target",
+            callback="on_clicked_break_at_target",
+            icon="resources/straighten_connection_target.png",
+            hotkey_setting="Break At Target Hotkey",
+            tooltip="""
+    Straightens connection from selected nodes to all outputs by inserting
+    dot nodes into the connection.
+
+    Connections align horiontally to the source node.
+
+    Shortcut: {hotkey}
+    """,
+        ),
+        BWActionManifest(
+            id="bw_straighten_source",
+            callback="on_clicked_break_at_source",
+            icon="resources/straighten_connection_source.png",
+            hotkey_setting="Break At Source Hotkey",
+            tooltip="""
+    Straightens connection from selected nodes to all outputs by inserting
+    dot nodes into the connection.
+
+    Connections align horizontally to the y center of all output nodes.
+
+    Shortcut: {hotkey}
+    """,
+        ),
+        BWActionManifest(
+            id="bw_straighten_remove",
+            callback="on_clicked_remove_dot_nodes_from_selection",
+            icon="resources/remove_dot_node_selected.png",
+            hotkey_setting="Remove Connected Dot Nodes Hotkey",
+            tooltip="""
+    Remove all dot nodes connected to the outputs of the selected nodes.
+
+    Shortcut: {hotkey}
+    """,
+        ),
+    ],
+    menu_entries=[
+        BWMenuEntryManifest(
+            label="Preview Straighten Connection (Break At Target)",
+            callback="on_clicked_preview_break_at_target",
+            tooltip="Logs the dot nodes Break At Target would create",
+        ),
+        BWMenuEntryManifest(
+            label="Preview Straighten Connection (Break At Source)",
+            callback="on_clicked_preview_break_at_source",
+            tooltip="Logs the dot nodes Break At Source would create",
+        ),
+    ],
+)
@@ -1,23 +1,34 @@
 from __future__ import annotations
 
+import json
 import os
 from dataclasses import dataclass, field
-from functools import partial
 from pathlib import Path
-from typing import TYPE_CHECKING, Dict, List, Type
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple, Type
 
-from bw_tools.common.bw_api_tool import CompNodeID, FunctionNodeId
+from bw_tools.common.bw_dot_chain import (
+    BWDotChainCollapse,
+    collapse_output_dot_nodes,
+    plan_collapse_output_dot_nodes,
+)
 from bw_tools.common.bw_node import BWFloat2
-from bw_tools.modules.bw_settings.bw_settings import BWModuleSettings
-from PySide6.QtGui import QIcon, QKeySequence, QAction
-from sd.api.sbs.sdsbsfunctiongraph import SDSBSFunctionGraph
-from sd.api.sdconnection import SDConnection
+from bw_tools.modules.bw_settings import settings_registry
+from bw_tools.modules.bw_settings.bw_settings import BWModuleSettings, BWSetting
 from sd.api.sdgraph import SDGraph
 from sd.api.sdhistoryutils import SDHistoryUtils
-from sd.api.sdproperty import SDProperty, SDPropertyCategory
+from sd.api.sdnode import SDNode
+from sd.api.sdproperty import SDProperty
 
 from .straighten_behavior import BWBreakAtSource, BWBreakAtTarget
-from .straighten_node import BWStraightenNode
+from .slot_geometry import STRIDE
+from .straighten_node import BWStraightenNode, BWStraightenNodeCache
+from .straighten_plan import (
+    DOT_INPUT_ID,
+    DOT_OUTPUT_ID,
+    BWPlannedDotNode,
+    BWPlannedNode,
+    BWStraightenPlan,
+)
 
 if TYPE_CHECKING:
     from bw_tools.common.bw_api_tool import BWAPITool
@@ -25,24 +36,45 @@ if TYPE_CHECKING:
     from .straighten_behavior import BWAbstractStraightenBehavior
 
 
-STRIDE = 21.33  # Magic number between each input slot
+SETTINGS_FILE = Path(__file__).parent / "bw_straighten_connection_settings.json"
 
 
 class BWStraightenSettings(BWModuleSettings):
-    def __init__(self, file_path: Path):
-        super().__init__(file_path)
-        self.target_hotkey: str = self.get("Break At Target Hotkey;value")
-        self.source_hotkey: str = self.get("Break At Source Hotkey;value")
-        self.remove_dot_nodes_hotkey: str = self.get("Remove Connected Dot Nodes Hotkey;value")
-        self.dot_node_distance: str = self.get("Dot Node Distance;value")
+    target_hotkey: str = BWSetting("Break At Target Hotkey")
+    source_hotkey: str = BWSetting("Break At Source Hotkey")
+    remove_dot_nodes_hotkey: str = BWSetting("Remove Connected Dot Nodes Hotkey")
+    dot_node_distance: int = BWSetting("Dot Node Distance")
+
+
+def get_settings() -> BWStraightenSettings:
+    return settings_registry.get_settings(BWStraightenSettings, SETTINGS_FILE)
 
 
 @dataclass
 class BWStraightenConnectionData:
-    connection: Dict[int, List[SDConnection]] = field(default_factory=dict)
-    base_dot_node: Dict[int, BWStraightenNode] = field(default_factory=dict)
-    properties_with_outputs_count: int = 0
+    """
+    Snapshot of the output connections of a source node, taken before
+    planning. Values are keyed by the index of the output property, and
+    lists are ordered by the position x of the output nodes.
+    """
+
     output_nodes: Dict[int, List[BWStraightenNode]] = field(default_factory=dict)
+    output_property_id: Dict[int, str] = field(default_factory=dict)
+    target_property_ids: Dict[int, List[str]] = field(default_factory=dict)
+    target_input_indices: Dict[int, List[int]] = field(default_factory=dict)
+    base_dot_node: Dict[int, Optional[BWPlannedDotNode]] = field(default_factory=dict)
+    properties_with_outputs_count: int = 0
+
+    # Indices of the inputs in each output node which are connected to
+    # the source node, keyed by the output node identifier. Updated as
+    # connections are planned, as if they had already been made.
+    indices_in_target: Dict[int, List[int]] = field(default_factory=dict)
+
+    def indices_in_target_node(self, target_node: BWStraightenNode) -> List[int]:
+        return self.indices_in_target[target_node.identifier]
+
+    def disconnect_from_source(self, target_node: BWStraightenNode, input_index: int):
+        self.indices_in_target[target_node.identifier].remove(input_index)
 
 
 def run_straighten_connection(
@@ -56,10 +88,73 @@ def run_straighten_connection(
     behavior and its settings.
     """
     node.delete_output_dot_nodes()
-    data = _create_connection_data_for_all_inputs(node)
-    _create_base_dot_nodes(node, data, behavior, settings)
+    plan = plan_straighten_connection(node, behavior, settings)
+    plan.commit()
+
+
+def run_straighten_connection_for_selection(
+    api_nodes: List[SDNode],
+    graph: Type[SDGraph],
+    behavior: BWAbstractStraightenBehavior,
+    settings: BWStraightenSettings,
+):
+    """
+    Straightens the connections of every node in the selection. Existing
+    dot nodes are removed for all nodes and the dot nodes for every node
+    are created, both from a single plan.
+    """
+    collapse, plan = plan_straighten_connection_for_selection(api_nodes, graph, behavior, settings)
+    collapse.apply(graph)
+    plan.commit()
+
+
+def plan_straighten_connection_for_selection(
+    api_nodes: List[SDNode],
+    graph: Type[SDGraph],
+    behavior: BWAbstractStraightenBehavior,
+    settings: BWStraightenSettings,
+) -> Tuple[BWDotChainCollapse, BWStraightenPlan]:
+    """
+    Returns the existing dot nodes to remove and the dot nodes to create
+    to straighten the connections of every node in the selection, without
+    modifying the graph. Every node is planned as if the existing dot
+    nodes had already been removed. Selected dot nodes which will be
+    removed are skipped.
+    """
+    collapse = plan_collapse_output_dot_nodes(api_nodes)
+
+    nodes = BWStraightenNodeCache(graph)
+    plan = BWStraightenPlan(graph)
+    for api_node in api_nodes:
+        if int(api_node.getIdentifier()) not in collapse.dot_nodes:
+            plan_straighten_connection(nodes.node(api_node), behavior, settings, nodes, plan, collapse)
+    return collapse, plan
+
+
+def plan_straighten_connection(
+    node: BWStraightenNode,
+    behavior: BWAbstractStraightenBehavior,
+    settings: BWStraightenSettings,
+    nodes: Optional[BWStraightenNodeCache] = None,
+    plan: Optional[BWStraightenPlan] = None,
+    collapse: Optional[BWDotChainCollapse] = None,
+) -> BWStraightenPlan:
+    """
+    Returns the dot nodes and connections needed to straighten the
+    connections of the node, without modifying the graph. If a plan is
+    given, they are added to it. If a dot chain collapse is given, the
+    connections of the node are read as if it had been applied.
+    """
+    if nodes is None:
+        nodes = BWStraightenNodeCache(node.graph)
+    if plan is None:
+        plan = BWStraightenPlan(node.graph)
+
+    data = _create_connection_data_for_all_inputs(node, nodes, collapse)
+    _create_base_dot_nodes(node, data, behavior, settings, plan)
     _align_base_dot_nodes(node, data, behavior, settings)
-    _insert_target_dot_nodes(node, data, behavior, settings)
+    _insert_target_dot_nodes(node, data, behavior, settings, plan)
+    return plan
 
 
 def _align_base_dot_nodes(
@@ -76,6 +171,8 @@ def _align_base_dot_nodes(
 
 def _create_connection_data_for_all_inputs(
     source_node: BWStraightenNode,
+    nodes: BWStraightenNodeCache,
+    collapse: Optional[BWDotChainCollapse] = None,
 ) -> BWStraightenConnectionData:
     """
     Create and return generic data about the output connections.
@@ -83,23 +180,56 @@ def _create_connection_data_for_all_inputs(
     """
     data = BWStraightenConnectionData()
     for i, api_property in enumerate(source_node.output_connectable_properties):
-        cons = source_node._get_connected_output_connections_for_property(api_property)
-        cons.sort(key=lambda c: c.getInputPropertyNode().getPosition().x)
-        data.output_nodes[i] = [BWStraightenNode(con.getInputPropertyNode(), source_node.graph) for con in cons]
-        data.connection[i] = cons
-        if cons:
+        outputs = _get_outputs(source_node, api_property, nodes, collapse)
+        outputs.sort(key=lambda output: output[0].pos.x)
+
+        data.output_nodes[i] = [target_node for target_node, _ in outputs]
+        data.output_property_id[i] = api_property.getId()
+        data.target_property_ids[i] = [property_id for _, property_id in outputs]
+        data.target_input_indices[i] = [
+            nodes.input_index(target_node, property_id) for target_node, property_id in outputs
+        ]
+        for target_node, input_index in zip(data.output_nodes[i], data.target_input_indices[i]):
+            data.indices_in_target.setdefault(target_node.identifier, []).append(input_index)
+        if outputs:
             data.properties_with_outputs_count += 1
+
+    for indices in data.indices_in_target.values():
+        indices.sort()
     return data
 
 
+def _get_outputs(
+    source_node: BWStraightenNode,
+    api_property: SDProperty,
+    nodes: BWStraightenNodeCache,
+    collapse: Optional[BWDotChainCollapse],
+) -> List[Tuple[BWStraightenNode, str]]:
+    """Returns the output nodes and the id of the input they are connected to"""
+    outputs = []
+    for con in source_node._get_connected_output_connections_for_property(api_property):
+        api_node = con.getInputPropertyNode()
+        if collapse is not None and int(api_node.getIdentifier()) in collapse.dot_nodes:
+            continue
+        outputs.append((nodes.node(api_node), con.getInputProperty().getId()))
+
+    if collapse is not None:
+        property_id = api_property.getId()
+        for con in collapse.connections_by_source().get(source_node.identifier, []):
+            if con.source_property_id == property_id:
+                outputs.append((nodes.node(con.target), con.target_property_id))
+    return outputs
+
+
 def _create_base_dot_nodes(
     source_node: BWStraightenNode,
     data: BWStraightenConnectionData,
     behavior: Type[BWAbstractStraightenBehavior],
     settings: BWStraightenSettings,
+    plan: BWStraightenPlan,
 ):
     """
-    Creates dot nodes near the initial source node for every output
+    Plans dot nodes near the initial source node for every output
     connection. This is done first so additional alignment logic can
     easily be calculated, such as aligning dot nodes to source node
     center.
@@ -117,47 +247,36 @@ def _create_base_dot_nodes(
         if not behavior.should_create_base_dot_node(source_node, data, i, settings):
             continue
 
-        dot_node = BWStraightenNode(
-            source_node.graph.newNode(_get_dot_node_id_for_graph(source_node.graph)),
-            source_node.graph,
+        dot_node = plan.new_dot_node(
+            BWFloat2(
+                source_node.pos.x + settings.dot_node_distance,
+                source_node.pos.y + (STRIDE * stack_index),
+            )
         )
         data.base_dot_node[i] = dot_node
-
-        pos = BWFloat2(
-            source_node.pos.x + settings.dot_node_distance,
-            source_node.pos.y + (STRIDE * stack_index),
-        )
-        dot_node.set_position(pos.x, pos.y)
-        _connect_node(source_node, dot_node, data.connection[i][0])
+        plan.connect(source_node, data.output_property_id[i], dot_node, DOT_INPUT_ID)
 
         stack_index += 1
 
 
-def _get_dot_node_id_for_graph(graph: Type[SDGraph]) -> str:
-    if isinstance(graph, SDSBSFunctionGraph):
-        return FunctionNodeId.DOT.value
-    else:
-        return CompNodeID.DOT.value
-
-
 def _insert_target_dot_nodes(
     source_node: BWStraightenNode,
     data: BWStraightenConnectionData,
     behavior: Type[BWAbstractStraightenBehavior],
     settings: BWStraightenSettings,
+    plan: BWStraightenPlan,
 ):
     """
-    Create and position dot nodes starting from the intial base dot node
+    Plan and position dot nodes starting from the intial base dot node
     running to each output. The alignment behavior determins how the
     dot nodes are positioned.
 
-    The dot nodes are created one output at a time and in order from closest
+    The dot nodes are planned one output at a time and in order from closest
     to farthest. Additionally, new connections will reuse existing dot nodes
     if required. This means alignment behavior logic can not make any
-    assumptions about output nodes infront it. For example, making API calls
-    to determin how many outputs are connected to a newly created dot node
-    will not work, since not all the outputs may not have been processed yet.
-    The other outputs would still be connected to the source node.
+    assumptions about output nodes infront it, since not all the outputs
+    may have been processed yet. The other outputs would still be connected
+    to the source node.
     """
     for i, _ in enumerate(source_node.output_connectable_properties):
         if not data.output_nodes[i]:
@@ -171,53 +290,32 @@ def _insert_target_dot_nodes(
         for y, output_node in enumerate(data.output_nodes[i]):
 
             if behavior.should_create_target_dot_node(source_node, dot_node, output_node, data, i, settings):
-                new_dot_node = BWStraightenNode(
-                    source_node.graph.newNode(_get_dot_node_id_for_graph(source_node.graph)),
-                    source_node.graph,
-                )
-                new_dot_node_pos: BWFloat2 = behavior.get_position_target_dot(
-                    dot_node,
-                    output_node,
-                    data,
-                    i,
-                    settings,
+                new_dot_node = plan.new_dot_node(
+                    behavior.get_position_target_dot(
+                        dot_node,
+                        output_node,
+                        data,
+                        i,
+                        settings,
+                    )
                 )
-                new_dot_node.set_position(new_dot_node_pos.x, new_dot_node_pos.y)
-                _connect_node(dot_node, new_dot_node, data.connection[i][y])
+                plan.connect(dot_node, _get_output_property_id(dot_node, data, i), new_dot_node, DOT_INPUT_ID)
 
                 dot_node = new_dot_node
 
-            if output_node.pos.x >= dot_node.pos.x + settings.dot_node_distance:
-                _connect_node(dot_node, output_node, data.connection[i][y])
-
-
-def _connect_node(
-    source_node: BWStraightenNode,
-    target_node: BWStraightenNode,
-    connection: SDConnection,
-):
-    """
-    Helper function to connect a node to another. Uses the given connection
-    to determin which property the new connection should be made too.
-    """
-    source_property = _get_source_property_from_connection(source_node, connection)
-    target_property = _get_target_property_from_connection(target_node, connection)
-    source_node.api_node.newPropertyConnection(source_property, target_node.api_node, target_property)
-
+            # The output node is already connected to the source node
+            if dot_node is source_node:
+                continue
 
-def _get_target_property_from_connection(target_node: BWStraightenNode, connection: SDConnection) -> SDProperty:
-    if target_node.is_dot:
-        return target_node.api_node.getPropertyFromId("input", SDPropertyCategory.Input)
-    return connection.getInputProperty()
+            if output_node.pos.x >= dot_node.pos.x + settings.dot_node_distance:
+                plan.connect(dot_node, DOT_OUTPUT_ID, output_node, data.target_property_ids[i][y])
+                data.disconnect_from_source(output_node, data.target_input_indices[i][y])
 
 
-def _get_source_property_from_connection(source_node: BWStraightenNode, connection: SDConnection) -> SDProperty:
-    if source_node.is_dot:
-        return source_node.api_node.getPropertyFromId(
-            "unique_filter_output",
-            SDPropertyCategory.Output,
-        )
-    return connection.getOutputProperty()
+def _get_output_property_id(node: BWPlannedNode, data: BWStraightenConnectionData, i: int) -> str:
+    if isinstance(node, BWPlannedDotNode):
+        return DOT_OUTPUT_ID
+    return data.output_property_id[i]
 
 
 def on_clicked_straighten_connection(api: BWAPITool, behavior: Type[BWAbstractStraightenBehavior]):
@@ -234,92 +332,60 @@ def on_clicked_straighten_connection(api: BWAPITool, behavior: Type[BWAbstractSt
     with SDHistoryUtils.UndoGroup("Straighten Connection Undo Group"):
         api.logger.info("Running straighten connection")
 
-        settings = BWStraightenSettings(Path(__file__).parent / "bw_straighten_connection_settings.json")
+        settings = get_settings()
+        run_straighten_connection_for_selection(api.current_node_selection, api.current_graph, behavior, settings)
 
-        for node in api.current_node_selection:
-            try:
-                node = BWStraightenNode(node, api.current_graph)
-            except AttributeError:
-                # Occurs if the dot node was previously removed
-                continue
-            run_straighten_connection(node, behavior, settings)
 
+def get_preview(collapse: BWDotChainCollapse, plan: BWStraightenPlan) -> Dict:
+    return {"removed_dot_nodes": sorted(collapse.dot_nodes), **plan.to_dict()}
 
-def on_clicked_remove_dot_nodes_from_selection(api: BWAPITool):
+
+def on_clicked_preview_straighten_connection(api: BWAPITool, behavior: Type[BWAbstractStraightenBehavior]):
+    """
+    Logs the dot nodes which would be removed and created for the
+    selection, without modifying the graph.
+    """
     if not api.current_graph_is_supported:
         api.log.error("Graph type is unsupported")
         return
 
-    pkg = api.current_package
-    file_path = Path(pkg.getFilePath())
-    if not os.access(file_path, os.W_OK):
-        return
-
-    with SDHistoryUtils.UndoGroup("Remove Dot Nodes Undo Group"):
-        api.logger.info("Running remove dot nodes from selection")
+    settings = get_settings()
+    collapse, plan = plan_straighten_connection_for_selection(
+        api.current_node_selection, api.current_graph, behavior, settings
+    )
+    api.logger.info(f"Straighten connection preview:\n{json.dumps(get_preview(collapse, plan), indent=4)}")
 
-        for node in api.current_node_selection:
-            try:
-                node = BWStraightenNode(node, api.current_graph)
-            except AttributeError:
-                continue
 
-            node.delete_output_dot_nodes()
+def on_clicked_break_at_target(api: BWAPITool):
+    on_clicked_straighten_connection(api, BWBreakAtTarget(api.current_graph))
 
 
-def on_graph_view_created(graph_view_id: int, api: BWAPITool):
-    toolbar = api.get_graph_view_toolbar(graph_view_id)
+def on_clicked_break_at_source(api: BWAPITool):
+    on_clicked_straighten_connection(api, BWBreakAtSource(api.current_graph))
 
-    settings = BWStraightenSettings(Path(__file__).parent / "bw_straighten_connection_settings.json")
 
-    icon = Path(__file__).parent / "resources" / "straighten_connection_target.png"
-    tooltip = f"""
-    Straightens connection from selected nodes to all outputs by inserting
-    dot nodes into the connection.
+def on_clicked_preview_break_at_target(api: BWAPITool):
+    on_clicked_preview_straighten_connection(api, BWBreakAtTarget(api.current_graph))
 
-    Connections align horiontally to the source node.
 
-    Shortcut: {settings.target_hotkey}
-    """
-    action = QAction()
-    action.setIcon(QIcon(str(icon.resolve())))
-    action.setToolTip(tooltip)
-    action.setShortcut(QKeySequence(settings.target_hotkey))
-    action.triggered.connect(lambda: on_clicked_straighten_connection(api, BWBreakAtTarget(api.current_graph)))
-    toolbar.add_action("bw_straighten_target", action)
+def on_clicked_preview_break_at_source(api: BWAPITool):
+    on_clicked_preview_straighten_connection(api, BWBreakAtSource(api.current_graph))
 
-    icon = Path(__file__).parent / "resources" / "straighten_connection_source.png"
-    tooltip = f"""
-    Straightens connection from selected nodes to all outputs by inserting
-    dot nodes into the connection.
 
-    Connections align horizontally to the y center of all output nodes.
+def on_clicked_remove_dot_nodes_from_selection(api: BWAPITool):
+    if not api.current_graph_is_supported:
+        api.log.error("Graph type is unsupported")
+        return
 
-    Shortcut: {settings.source_hotkey}
-    """
-    action = QAction()
-    action.setIcon(QIcon(str(icon.resolve())))
-    action.setToolTip(tooltip)
-    action.setShortcut(QKeySequence(settings.source_hotkey))
-    action.triggered.connect(lambda: on_clicked_straighten_connection(api, BWBreakAtSource(api.current_graph)))
-    toolbar.add_action("bw_straighten_source", action)
-
-    icon = Path(__file__).parent / "resources" / "remove_dot_node_selected.png"
-    tooltip = f"""
-    Remove all dot nodes connected to the outputs of the selected nodes.
-
-    Shortcut: {settings.remove_dot_nodes_hotkey}
-    """
-    action = QAction()
-    action.setIcon(QIcon(str(icon.resolve())))
-    action.setToolTip(tooltip)
-    action.setShortcut(QKeySequence(settings.remove_dot_nodes_hotkey))
-    action.triggered.connect(lambda: on_clicked_remove_dot_nodes_from_selection(api))
-    toolbar.add_action("bw_straighten_remove", action)
+    pkg = api.current_package
+    file_path = Path(pkg.getFilePath())
+    if not os.access(file_path, os.W_OK):
+        return
 
+    with SDHistoryUtils.UndoGroup("Remove Dot Nodes Undo Group"):
+        api.logger.info("Running remove dot nodes from selection")
 
-def on_initialize(api: BWAPITool):
-    api.register_on_graph_view_created_callback(partial(on_graph_view_created, api=api))
+        collapse_output_dot_nodes(api.current_node_selection, api.current_graph)
 
 
 def get_default_settings() -> Dict:
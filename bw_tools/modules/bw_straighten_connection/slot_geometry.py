@@ -0,0 +1,24 @@
+"""
+Vertical position of the connection slots on a node.
+
+Designer spaces the input and output slots of a node STRIDE apart and
+centers them about the node position, so the offset of a slot only depends
+on the number of slots and its index.
+"""
+from functools import lru_cache
+
+STRIDE = 21.33  # Magic number between each input slot
+
+
+@lru_cache(maxsize=None)
+def _center_offset(slot_count: int) -> float:
+    return STRIDE * max(slot_count - 1, 0) / 2
+
+
+def slot_offset(slot_count: int, index: int) -> float:
+    """
+    Returns the offset from the node position y to the slot at the given
+    index, for a node with slot_count slots. The index may be past the
+    last slot, in which case the offset continues at the same spacing.
+    """
+    return (STRIDE * index) - _center_offset(slot_count)
@@ -8,13 +8,12 @@ from typing import TYPE_CHECKING, List, Type
 from bw_tools.common.bw_node import BWFloat2
 from sd.api.sdgraph import SDGraph
 
+from .slot_geometry import slot_offset
 from .straighten_node import BWStraightenNode
 
 if TYPE_CHECKING:
     from .bw_straighten_connection import BWStraightenConnectionData, BWStraightenSettings
 
-STRIDE = 21.33  # Magic number between each input slot
-
 
 @dataclass
 class BWAbstractStraightenBehavior(ABC):
@@ -64,23 +63,16 @@ class BWAbstractStraightenBehavior(ABC):
         pass
 
     def _get_position_of_top_index_in_target(
-        self, source_node: BWStraightenNode, target_node: BWStraightenNode
+        self,
+        source_node: BWStraightenNode,
+        target_node: BWStraightenNode,
+        data: BWStraightenConnectionData,
     ) -> float:
-        offset = self._calculate_mid_point_for_input_connections_in_target_node(target_node)
-
-        top_index_in_target = source_node.indices_in_target_node(target_node)[0]
-
-        return target_node.pos.y + offset + (STRIDE * top_index_in_target)
-
-    def _calculate_mid_point_for_input_connections_in_target_node(self, target_node: BWStraightenNode) -> float:
-        lower_bound = target_node.pos.y
-        # Stack positions
-        for i in range(target_node.input_connectable_properties_count):
-            pos = target_node.pos.y + (STRIDE * i)
-            lower_bound = max(lower_bound, pos)
-
-        mid_point = (target_node.pos.y + lower_bound) / 2
-        return target_node.pos.y - mid_point
+        top_index_in_target = data.indices_in_target_node(target_node)[0]
+        return target_node.pos.y + slot_offset(
+            target_node.input_connectable_properties_count,
+            top_index_in_target,
+        )
 
 
 class BWBreakAtTarget(BWAbstractStraightenBehavior):
@@ -121,7 +113,7 @@ class BWBreakAtTarget(BWAbstractStraightenBehavior):
             return False
 
         pos_y_output_index = dot_node.get_position_of_output_index(i)
-        pos_y_input_index = self._get_position_of_top_index_in_target(source_node, target_node)
+        pos_y_input_index = self._get_position_of_top_index_in_target(source_node, target_node, data)
 
         if math.isclose(pos_y_output_index, pos_y_input_index):
             return False
@@ -142,17 +134,10 @@ class BWBreakAtTarget(BWAbstractStraightenBehavior):
                 source_node.pos.y,
             )
 
-        lower_bound = source_node.pos.y
-        stack_index = 0
-        pos = dict()
-        for j in range(source_node.output_connectable_properties_count):
-            pos[j] = source_node.pos.y + (STRIDE * stack_index)
-            lower_bound = max(lower_bound, pos[j])
-            stack_index += 1
-
-        mid_point = (source_node.pos.y + lower_bound) / 2
-        offset = source_node.pos.y - mid_point
-        return BWFloat2(target_node.pos.x - settings.dot_node_distance, pos[i] + offset)
+        return BWFloat2(
+            target_node.pos.x - settings.dot_node_distance,
+            source_node.get_position_of_output_index(i),
+        )
 
     def align_base_dot_node(
         self,
@@ -204,7 +189,7 @@ class BWBreakAtSource(BWAbstractStraightenBehavior):
             output_node = output_nodes_in_front[0]
 
             pos_y_output_index = source_node.get_position_of_output_index(i)
-            pos_y_input_index = self._get_position_of_top_index_in_target(source_node, output_node)
+            pos_y_input_index = self._get_position_of_top_index_in_target(source_node, output_node, data)
             if math.isclose(pos_y_output_index, pos_y_input_index):
                 return False
             else:
@@ -247,7 +232,7 @@ class BWBreakAtSource(BWAbstractStraightenBehavior):
                 pos_y_output_index = dot_node.get_position_of_output_index(i)
             else:
                 pos_y_output_index = dot_node.pos.y
-            pos_y_input_index = self._get_position_of_top_index_in_target(source_node, output_nodes_in_front[0])
+            pos_y_input_index = self._get_position_of_top_index_in_target(source_node, output_nodes_in_front[0], data)
             if math.isclose(pos_y_output_index, pos_y_input_index):
                 return False
             else:
@@ -279,7 +264,7 @@ class BWBreakAtSource(BWAbstractStraightenBehavior):
         ]
 
         if len(output_nodes_in_front) == 1:
-            pos_y = self._get_position_of_top_index_in_target(source_node, output_nodes_in_front[0])
+            pos_y = self._get_position_of_top_index_in_target(source_node, output_nodes_in_front[0], data)
 
             data.base_dot_node[i].set_position(
                 data.base_dot_node[i].pos.x,
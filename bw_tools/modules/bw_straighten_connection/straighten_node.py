@@ -1,67 +1,70 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import List, Type
+from typing import Dict, List, Optional, Set, Type
 
+from bw_tools.common.bw_dot_chain import collapse_output_dot_nodes
 from bw_tools.common.bw_node import BWNode
 from sd.api.sdconnection import SDConnection
 from sd.api.sdgraph import SDGraph
-from sd.api.sdproperty import SDProperty, SDPropertyCategory
+from sd.api.sdnode import SDNode
+from sd.api.sdproperty import SDProperty
 
-STRIDE = 21.33  # Magic number between each input slot
+from .slot_geometry import slot_offset
 
 
 @dataclass
 class BWStraightenNode(BWNode):
     graph: Type[SDGraph] = field(repr=False)
 
-    def delete_output_dot_nodes(self):
-        for prop in self.output_connectable_properties:
-            con: SDConnection
-            for con in self.api_node.getPropertyConnections(prop):
-                dot_node = BWStraightenNode(con.getInputPropertyNode(), self.graph)
-                if not dot_node.is_dot:
-                    continue
+    _is_dot: Optional[bool] = field(init=False, repr=False, default=None)
 
-                dot_node.delete_output_dot_nodes()
-                self._rebuild_deleted_dot_connection(dot_node, con.getOutputProperty())
-                self.graph.deleteNode(dot_node.api_node)
+    @property
+    def is_dot(self) -> bool:
+        # Read by the behaviors for every output, the definition never changes
+        if self._is_dot is None:
+            self._is_dot = BWNode.is_dot.fget(self)
+        return self._is_dot
 
-    def _rebuild_deleted_dot_connection(self, dot_node: BWStraightenNode, input_node_property: SDProperty):
-        output_node_connections = dot_node._get_connected_output_connections_for_property_id("unique_filter_output")
+    def delete_output_dot_nodes(self) -> Set[int]:
+        """Returns the identifiers of the deleted dot nodes"""
+        return collapse_output_dot_nodes([self.api_node], self.graph)
 
-        for output_node_con in output_node_connections:
-            # I find api naming convension backwards
-            # For me, input refers to the source node, output is the
-            # destination node.
-            output_node_property = output_node_con.getInputProperty()
-            output_node = output_node_con.getInputPropertyNode()
+    def _get_connected_output_connections_for_property(self, api_property: SDProperty) -> List[SDConnection]:
+        return [con for con in self.api_node.getPropertyConnections(api_property)]
 
-            self.api_node.newPropertyConnection(
-                input_node_property,
-                output_node,
-                output_node_property,
-            )
+    def get_position_of_output_index(self, i: int) -> float:
+        return self.pos.y + slot_offset(
+            self.output_connectable_properties_count, i
+        )
 
-    def _get_connected_output_connections_for_property_id(self, api_property_id: str) -> List[SDConnection]:
-        p = self.api_node.getPropertyFromId(api_property_id, SDPropertyCategory.Output)
-        return [con for con in self.api_node.getPropertyConnections(p)]
 
-    def _get_connected_output_connections_for_property(self, api_property: SDProperty) -> List[SDConnection]:
-        return [con for con in self.api_node.getPropertyConnections(api_property)]
+@dataclass
+class BWStraightenNodeCache:
+    """
+    Wraps each node of the graph in a BWStraightenNode only once per run,
+    so nodes connected to several sources, or with several connections
+    from one source, are not queried from the API again.
+    """
+
+    graph: Type[SDGraph] = field(repr=False)
+    _nodes: Dict[str, BWStraightenNode] = field(init=False, default_factory=dict, repr=False)
+    _input_indices: Dict[int, Dict[str, int]] = field(init=False, default_factory=dict, repr=False)
 
-    def indices_in_target_node(self, target_node: BWStraightenNode) -> List[int]:
-        return [
-            i
-            for i, p in enumerate(target_node.input_connectable_properties)
-            for connection in target_node.api_node.getPropertyConnections(p)
-            if connection.getInputPropertyNode().getIdentifier() == str(self.identifier)
-        ]
+    def node(self, api_node: SDNode) -> BWStraightenNode:
+        identifier = api_node.getIdentifier()
+        try:
+            return self._nodes[identifier]
+        except KeyError:
+            node = BWStraightenNode(api_node, self.graph)
+            self._nodes[identifier] = node
+            return node
 
-    def get_position_of_output_index(self, i: int) -> float:
-        lower_bound = self.pos.y
-        for j in range(self.output_connectable_properties_count):
-            lower_bound = max(self.pos.y + (STRIDE * j), lower_bound)
-        mid_point = (self.pos.y + lower_bound) / 2
-        offset = self.pos.y - mid_point
-        return self.pos.y + offset + (STRIDE * i)
+    def input_index(self, node: BWStraightenNode, property_id: str) -> int:
+        """Returns the index of the connectable input property with the given id"""
+        try:
+            indices = self._input_indices[node.identifier]
+        except KeyError:
+            indices = {p.getId(): i for i, p in enumerate(node.input_connectable_properties)}
+            self._input_indices[node.identifier] = indices
+        return indices[property_id]
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Type, Union
+
+from bw_tools.common.bw_api_tool import CompNodeID, FunctionNodeId
+from bw_tools.common.bw_node import BWFloat2
+from sd.api import sdbasetypes
+from sd.api.sbs.sdsbsfunctiongraph import SDSBSFunctionGraph
+from sd.api.sdgraph import SDGraph
+from sd.api.sdnode import SDNode
+
+from .slot_geometry import slot_offset
+from .straighten_node import BWStraightenNode
+
+DOT_INPUT_ID = "input"
+DOT_OUTPUT_ID = "unique_filter_output"
+
+
+@dataclass
+class BWPlannedDotNode:
+    """
+    Stands in for a dot node which will be created when the plan is
+    committed. Provides the parts of BWStraightenNode the straighten
+    behaviors use, so they can run on planned nodes.
+    """
+
+    pos: BWFloat2
+    api_node: Optional[SDNode] = field(init=False, default=None, repr=False)
+
+    is_dot = True
+    output_connectable_properties_count = 1
+
+    def set_position(self, x: float, y: float):
+        self.pos.x = x
+        self.pos.y = y
+
+    def get_position_of_output_index(self, i: int) -> float:
+        return self.pos.y + slot_offset(
+            self.output_connectable_properties_count, i
+        )
+
+
+BWPlannedNode = Union[BWStraightenNode, BWPlannedDotNode]
+
+
+@dataclass
+class BWPlannedConnection:
+    source: BWPlannedNode
+    source_property_id: str
+    target: BWPlannedNode
+    target_property_id: str
+
+
+@dataclass
+class BWStraightenPlan:
+    """
+    The dot nodes and connections to create, computed without modifying
+    the graph. Nothing is created until commit() is called, which creates
+    every dot node and then makes every connection.
+    """
+
+    graph: Type[SDGraph] = field(repr=False)
+    dot_nodes: List[BWPlannedDotNode] = field(default_factory=list)
+    connections: List[BWPlannedConnection] = field(default_factory=list)
+
+    def new_dot_node(self, pos: BWFloat2) -> BWPlannedDotNode:
+        dot_node = BWPlannedDotNode(BWFloat2(pos.x, pos.y))
+        self.dot_nodes.append(dot_node)
+        return dot_node
+
+    def connect(
+        self,
+        source: BWPlannedNode,
+        source_property_id: str,
+        target: BWPlannedNode,
+        target_property_id: str,
+    ):
+        self.connections.append(BWPlannedConnection(source, source_property_id, target, target_property_id))
+
+    def to_dict(self) -> Dict:
+        """
+        Describes the plan with plain values. Existing nodes are referred to
+        by identifier and planned dot nodes by their index in dot_nodes.
+        """
+        dot_node_indices = {id(dot_node): i for i, dot_node in enumerate(self.dot_nodes)}
+
+        def _node_key(node: BWPlannedNode) -> Dict:
+            if isinstance(node, BWPlannedDotNode):
+                return {"dot_node": dot_node_indices[id(node)]}
+            return {"node": node.identifier}
+
+        return {
+            "dot_nodes": [[dot_node.pos.x, dot_node.pos.y] for dot_node in self.dot_nodes],
+            "connections": [
+                {
+                    "source": _node_key(connection.source),
+                    "source_property": connection.source_property_id,
+                    "target": _node_key(connection.target),
+                    "target_property": connection.target_property_id,
+                }
+                for connection in self.connections
+            ],
+        }
+
+    def commit(self):
+        dot_node_id = get_dot_node_id_for_graph(self.graph)
+        for dot_node in self.dot_nodes:
+            dot_node.api_node = self.graph.newNode(dot_node_id)
+            dot_node.api_node.setPosition(sdbasetypes.float2(dot_node.pos.x, dot_node.pos.y))
+
+        for connection in self.connections:
+            connection.source.api_node.newPropertyConnectionFromId(
+                connection.source_property_id,
+                connection.target.api_node,
+                connection.target_property_id,
+            )
+
+
+def get_dot_node_id_for_graph(graph: Type[SDGraph]) -> str:
+    if isinstance(graph, SDSBSFunctionGraph):
+        return FunctionNodeId.DOT.value
+    else:
+        return CompNodeID.DOT.value
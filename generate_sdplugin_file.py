@@ -4,6 +4,8 @@ from zipfile import ZipFile
 import json
 import os
 
+from bw_tools.common import bw_manifest_cache
+
 
 def main():
     plugin_name = "bw_tools"
@@ -51,6 +53,28 @@ def main():
             Path(f"/{plugin_name_version}/{plugin_name_version}/LICENSE"),
         )
 
+        # Discovered without a fingerprint, so the packaged manifest
+        # is always trusted
+        modules_dir = Path.cwd() / plugin_name / "modules"
+        modules_manifest = bw_manifest_cache.discover(modules_dir)
+        modules_manifest.manifests = [
+            m for m in modules_manifest.manifests if m.name not in ignore_folders
+        ]
+        modules_manifest.eager_modules = [
+            name
+            for name in modules_manifest.eager_modules
+            if name not in ignore_folders
+        ]
+        manifest_path = bw_manifest_cache.get_manifest_path(modules_dir)
+        manifest_zip_path = (
+            Path(plugin_name_version)
+            / plugin_name_version
+            / manifest_path.relative_to(Path.cwd())
+        )
+        bw_manifest_cache.write(manifest_path, modules_manifest)
+        zip_obj.write(manifest_path, manifest_zip_path)
+        manifest_path.unlink()
+
         readme = Path.cwd() / "README.md"
         zip_obj.write(
             readme,
@@ -0,0 +1,8 @@
+import sys
+from pathlib import Path
+
+try:
+    import sd  # noqa: F401
+except ImportError:
+    # Running outside of Designer, see sd_stub/sd/__init__.py
+    sys.path.append(str(Path(__file__).parent / "sd_stub"))
@@ -3,10 +3,20 @@ import importlib
 from bw_tools.common import (
     bw_api_tool,
     bw_chain_dimension,
+    bw_dot_chain,
+    bw_graph_interchange,
+    bw_manifest,
+    bw_manifest_cache,
     bw_node,
     bw_node_selection,
+    bw_resources,
+)
+from bw_tools.modules.bw_framer import (
+    bw_framer,
+    frame_bounds,
+    frame_groups,
+    frame_index,
 )
-from bw_tools.modules.bw_framer import bw_framer
 from bw_tools.modules.bw_layout_graph import (
     aligner_mainline,
     aligner_vertical,
@@ -19,7 +29,10 @@ from bw_tools.modules.bw_optimize_graph import (
     atomic_optimizer,
     bw_optimize_graph,
     comp_graph_optimizer,
+    dead_node_optimizer,
+    function_graph_optimizer,
     optimizer,
+    output_size_optimizer,
     property_matcher,
     uniform_color_optimizer,
 )
@@ -31,20 +44,29 @@ from bw_tools.modules.bw_settings import (
     bw_settings_model,
     setting_writer,
     settings_loader,
+    settings_registry,
+    settings_schema,
+    settings_store,
     widgets,
 )
 from bw_tools.modules.bw_straighten_connection import (
     bw_straighten_connection,
+    slot_geometry,
     straighten_behavior,
     straighten_node,
+    straighten_plan,
 )
 from tests import (
+    stand_in_graph,
+    test_api_tool,
     test_chain_dimension,
     test_framer,
+    test_graph_interchange,
     test_layout_graph,
     test_node,
     test_node_selection,
     test_optimize_graph,
+    test_print_node_info,
     test_straighten_connection,
 )
 
@@ -53,17 +75,28 @@ modules = [
     optimizer,
     uniform_color_optimizer,
     comp_graph_optimizer,
+    dead_node_optimizer,
+    function_graph_optimizer,
     atomic_optimizer,
+    output_size_optimizer,
     property_matcher,
     bw_settings,
     bw_settings_dialog,
     bw_settings_model,
     widgets,
     settings_loader,
+    settings_schema,
+    settings_store,
+    settings_registry,
     setting_writer,
     bw_api_tool,
+    bw_manifest,
+    bw_manifest_cache,
     bw_node,
+    bw_dot_chain,
+    bw_graph_interchange,
     bw_node_selection,
+    bw_resources,
     bw_chain_dimension,
     bw_layout_graph,
     node_sorting,
@@ -72,11 +105,17 @@ modules = [
     aligner_mainline,
     layout_node,
     bw_straighten_connection,
+    slot_geometry,
     straighten_node,
+    straighten_plan,
     straighten_behavior,
     bw_pbr_reference,
+    frame_bounds,
+    frame_groups,
+    frame_index,
     bw_framer,
     bw_print_node_info,
+    stand_in_graph,
     test_straighten_connection,
     test_layout_graph,
     test_node_selection,
@@ -84,6 +123,9 @@ modules = [
     test_chain_dimension,
     test_optimize_graph,
     test_framer,
+    test_graph_interchange,
+    test_api_tool,
+    test_print_node_info,
 ]
 
 
@@ -1,11 +1,14 @@
 import unittest
 
 from tests import (
+    test_api_tool,
     test_chain_dimension,
     test_framer,
+    test_graph_interchange,
     test_layout_graph,
     test_node,
     test_node_selection,
+    test_print_node_info,
     test_straighten_connection,
     test_optimize_graph,
 )
@@ -26,6 +29,12 @@ def run():
     unittest.main(module=test_optimize_graph, exit=False)
     print("Running test_framer")
     unittest.main(module=test_framer, exit=False)
+    print("Running test_graph_interchange")
+    unittest.main(module=test_graph_interchange, exit=False)
+    print("Running test_api_tool")
+    unittest.main(module=test_api_tool, exit=False)
+    print("Running test_print_node_info")
+    unittest.main(module=test_print_node_info, exit=False)
 
 
 run()
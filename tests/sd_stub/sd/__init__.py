@@ -0,0 +1,13 @@
+"""
+Minimal stand-in for the sd package shipped with Designer.
+
+It only holds the enums, value types and classes which the tools import
+or check with isinstance, so that the tests which do not need Designer can
+run in plain Python. tests/__init__.py adds it to the path when the real
+package can not be imported.
+"""
+from . import api
+
+
+def getContext():
+    raise RuntimeError("The sd stub can not be used to run Designer")
@@ -0,0 +1 @@
+from . import sdbasetypes, sdproperty, sdvalueint2
@@ -0,0 +1,2 @@
+class QtForPythonUIMgrWrapper:
+    pass
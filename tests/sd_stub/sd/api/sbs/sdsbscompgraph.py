@@ -0,0 +1,5 @@
+from ..sdgraph import SDGraph
+
+
+class SDSBSCompGraph(SDGraph):
+    pass
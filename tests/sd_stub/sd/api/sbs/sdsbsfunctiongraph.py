@@ -0,0 +1,5 @@
+from ..sdgraph import SDGraph
+
+
+class SDSBSFunctionGraph(SDGraph):
+    pass
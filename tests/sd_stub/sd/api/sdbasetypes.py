@@ -0,0 +1,21 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class float2:
+    x: float = 0.0
+    y: float = 0.0
+
+
+@dataclass
+class int2:
+    x: int = 0
+    y: int = 0
+
+
+@dataclass
+class ColorRGBA:
+    r: float = 0.0
+    g: float = 0.0
+    b: float = 0.0
+    a: float = 0.0
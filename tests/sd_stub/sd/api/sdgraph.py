@@ -0,0 +1,2 @@
+class SDGraph:
+    pass
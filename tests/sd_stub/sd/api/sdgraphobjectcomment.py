@@ -0,0 +1,5 @@
+from .sdgraphobject import SDGraphObject
+
+
+class SDGraphObjectComment(SDGraphObject):
+    pass
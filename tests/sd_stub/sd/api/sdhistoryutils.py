@@ -0,0 +1,8 @@
+from contextlib import contextmanager
+
+
+class SDHistoryUtils:
+    @staticmethod
+    @contextmanager
+    def UndoGroup(name):
+        yield
@@ -0,0 +1,2 @@
+class SDNode:
+    pass
@@ -0,0 +1,17 @@
+from enum import Enum
+
+
+class SDProperty:
+    pass
+
+
+class SDPropertyCategory(Enum):
+    Annotation = 0
+    Input = 1
+    Output = 2
+
+
+class SDPropertyInheritanceMethod(Enum):
+    RelativeToInput = 0
+    RelativeToParent = 1
+    Absolute = 2
@@ -0,0 +1,13 @@
+from .sdvalue import SDValue
+
+
+class SDValueInt2(SDValue):
+    def __init__(self, value):
+        self._value = value
+
+    @classmethod
+    def sNew(cls, value):
+        return cls(value)
+
+    def get(self):
+        return self._value
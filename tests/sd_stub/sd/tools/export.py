@@ -0,0 +1,2 @@
+def exportSDGraphOutputs(graph, output_dir):
+    raise RuntimeError("The sd stub can not render graphs")
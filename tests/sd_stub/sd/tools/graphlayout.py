@@ -0,0 +1,2 @@
+def snapSDNodes(nodes):
+    pass
@@ -0,0 +1,92 @@
+"""
+Builds graphs of stand-in nodes for tests which do not need Designer. The
+graphs are loaded with bw_graph_interchange, the same way as a graph
+exported from Designer.
+"""
+
+from typing import Any, Dict, Iterable, Optional, Sequence, Tuple
+
+from sd.api.sdproperty import SDPropertyCategory
+
+from bw_tools.common import bw_graph_interchange
+from bw_tools.common.bw_graph_interchange import (
+    BWStandInGraph,
+    BWStandInNode,
+)
+
+OUTPUT_ID = "unique_filter_output"
+
+
+def node_data(
+    identifier: Any,
+    definition_id: str,
+    inputs: Sequence[str] = (),
+    outputs: Sequence[str] = (OUTPUT_ID,),
+    position: Tuple[float, float] = (0.0, 0.0),
+    label: Optional[str] = None,
+    output_size_inheritance: Optional[str] = None,
+    output_size: Tuple[int, int] = (0, 0),
+) -> Dict:
+    """
+    Returns the data of a node. If output_size_inheritance is the name of
+    an inheritance method, the node has an $outputsize property using it,
+    with the value output_size.
+    """
+    values = dict()
+    inheritance = dict()
+    if output_size_inheritance is not None:
+        values[bw_graph_interchange.OUTPUT_SIZE] = list(output_size)
+        inheritance[bw_graph_interchange.OUTPUT_SIZE] = output_size_inheritance
+    return {
+        "identifier": str(identifier),
+        "definition_id": definition_id,
+        "label": definition_id if label is None else label,
+        "position": list(position),
+        "inputs": list(inputs),
+        "outputs": list(outputs),
+        "values": values,
+        "inheritance": inheritance,
+    }
+
+
+def graph_data(
+    nodes: Iterable[Dict],
+    connections: Iterable[Tuple[Any, str, Any, str]] = (),
+    values: Optional[Dict] = None,
+) -> Dict:
+    """
+    Returns the data of a graph. Connections are given as source
+    identifier, source property id, target identifier and target property
+    id.
+    """
+    return {
+        "format_version": bw_graph_interchange.GRAPH_FORMAT_VERSION,
+        "values": dict(values or {}),
+        "nodes": list(nodes),
+        "connections": [
+            [str(source), source_property, str(target), target_property]
+            for source, source_property, target, target_property in connections
+        ],
+    }
+
+
+def new_graph(
+    nodes: Iterable[Dict],
+    connections: Iterable[Tuple[Any, str, Any, str]] = (),
+    values: Optional[Dict] = None,
+) -> BWStandInGraph:
+    return bw_graph_interchange.from_dict(
+        graph_data(nodes, connections, values)
+    )
+
+
+def input_node(
+    api_node: BWStandInNode, property_id: str
+) -> Optional[BWStandInNode]:
+    """Returns the node connected to the given input, if there is one"""
+    api_property = api_node.getPropertyFromId(
+        property_id, SDPropertyCategory.Input
+    )
+    for connection in api_node.getPropertyConnections(api_property):
+        return connection.getInputPropertyNode()
+    return None
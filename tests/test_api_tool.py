@@ -0,0 +1,102 @@
+import copy
+import json
+import unittest
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+from PySide6.QtGui import QKeySequence
+
+from bw_tools.common.bw_api_tool import BWAPITool
+from bw_tools.common.bw_manifest import BWActionManifest, BWModuleManifest
+from bw_tools.modules.bw_settings import settings_registry, settings_store
+
+DEFAULT_SETTINGS = {
+    "Hotkey": {"widget": 1, "value": "Alt+D"},
+    "Batch Hotkey": {"widget": 1, "value": "Alt+Shift+D"},
+}
+
+MANIFEST = BWModuleManifest(
+    name="bw_test_module",
+    has_settings=True,
+    actions=[
+        BWActionManifest(
+            id="bw_test_batch",
+            callback="on_clicked_batch",
+            hotkey_setting="Batch Hotkey",
+            tooltip="Shortcut: {hotkey}",
+        ),
+    ],
+    default_settings=DEFAULT_SETTINGS,
+)
+
+
+class TestAPIToolManifest(unittest.TestCase):
+    settings_file_path = (
+        Path(__file__).parent
+        / "resources"
+        / "tmp"
+        / "__bw_test_module_settings.json"
+    )
+
+    def setUp(self):
+        if not self.settings_file_path.parent.is_dir():
+            self.settings_file_path.parent.mkdir()
+
+        with patch("sd.getContext"):
+            self.api = BWAPITool()
+        self.api.logger = Mock()
+        self.api.menu = Mock()
+        self.api.get_settings_file_path = Mock(
+            return_value=self.settings_file_path
+        )
+
+    def tearDown(self):
+        settings_registry.clear()
+        settings_store.invalidate(self.settings_file_path)
+        if self.settings_file_path.is_file():
+            self.settings_file_path.unlink()
+
+    def _write_settings(self, settings):
+        with open(self.settings_file_path, "w") as settings_file:
+            json.dump(settings, settings_file)
+        settings_store.invalidate(self.settings_file_path)
+
+    def test_validates_settings_when_registered(self):
+        print("...test_validates_settings_when_registered")
+        self._write_settings({"Hotkey": {"widget": 1, "value": 5}})
+
+        self.api.register_manifest(MANIFEST)
+
+        # One warning for the invalid hotkey, one for the missing one
+        self.assertEqual(self.api.logger.warning.call_count, 2)
+        values = settings_store.values(self.settings_file_path)
+        self.assertEqual(values["Hotkey;value"], "Alt+D")
+
+    def test_missing_hotkey_uses_default(self):
+        print("...test_missing_hotkey_uses_default")
+        self._write_settings({"Hotkey": {"widget": 1, "value": "Alt+J"}})
+        self.api.register_manifest(MANIFEST)
+
+        hotkey = self.api._get_hotkey(MANIFEST, MANIFEST.actions[0])
+
+        self.assertEqual(hotkey, "Alt+Shift+D")
+
+    def test_saving_settings_updates_hotkeys(self):
+        print("...test_saving_settings_updates_hotkeys")
+        self._write_settings(DEFAULT_SETTINGS)
+        self.api.register_manifest(MANIFEST)
+        action = Mock()
+        self.api._graph_view_actions["bw_test_batch"] = action
+
+        settings = copy.deepcopy(DEFAULT_SETTINGS)
+        settings["Batch Hotkey"]["value"] = "Alt+J"
+        with open(self.settings_file_path, "w") as settings_file:
+            json.dump(settings, settings_file)
+        settings_registry.publish(self.settings_file_path)
+
+        action.setShortcut.assert_called_once_with(QKeySequence("Alt+J"))
+        action.setToolTip.assert_called_once_with("Shortcut: Alt+J")
+
+
+if __name__ == "__main__":
+    unittest.main()
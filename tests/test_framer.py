@@ -2,12 +2,18 @@ import math
 import shutil
 import unittest
 from pathlib import Path
-from unittest.mock import Mock
+from unittest.mock import Mock, patch
 
 import sd
 from bw_tools.common.bw_api_tool import BWAPITool
-from bw_tools.modules.bw_framer import bw_framer
+from bw_tools.modules.bw_framer import (
+    bw_framer,
+    frame_bounds,
+    frame_groups,
+    frame_index,
+)
 from sd.api.sdgraphobjectframe import SDGraphObjectFrame
+from tests import stand_in_graph
 
 
 class TestFramer(unittest.TestCase):
@@ -157,5 +163,134 @@ class TestFramer(unittest.TestCase):
         self.assertEqual(frame.getDescription(), expected)
 
 
+class TestFrameBounds(unittest.TestCase):
+    def test_bounds_fit_tall_nodes(self):
+        print("...test_bounds_fit_tall_nodes")
+        tall_inputs = [f"input{i}" for i in range(5)]
+        graph = stand_in_graph.new_graph(
+            [
+                stand_in_graph.node_data(1, "tall", tall_inputs),
+                stand_in_graph.node_data(
+                    2, "short", ["input"], position=(200.0, 0.0)
+                ),
+                stand_in_graph.node_data(
+                    3, "tall", tall_inputs, position=(400.0, 100.0)
+                ),
+                # Pixel processors have the inputs they are given
+                stand_in_graph.node_data(
+                    4, "sbs::compositing::pixelprocessor", ["input0"]
+                ),
+                stand_in_graph.node_data(
+                    5,
+                    "sbs::compositing::pixelprocessor",
+                    [f"input{i}" for i in range(10)],
+                ),
+            ]
+        )
+        (
+            tall_node,
+            node,
+            other_tall_node,
+            pixel_processor,
+            tall_pixel_processor,
+        ) = graph.getNodes()
+
+        heights = frame_bounds.BWNodeHeightCache()
+        with patch.object(
+            other_tall_node,
+            "getProperties",
+            wraps=other_tall_node.getProperties,
+        ) as get_properties:
+            bounds = frame_bounds.get_node_bounds(
+                [tall_node, node, other_tall_node], heights
+            )
+
+        self.assertAlmostEqual(bounds.left, -48)
+        self.assertAlmostEqual(bounds.right, 448)
+        self.assertAlmostEqual(bounds.top, -69.4)
+        self.assertAlmostEqual(bounds.bottom, 169.4)
+        # The height of the second tall node is read from the cache
+        get_properties.assert_not_called()
+
+        bounds = frame_bounds.get_node_bounds(
+            [pixel_processor, tall_pixel_processor], heights
+        )
+
+        self.assertAlmostEqual(bounds.height, 245.8)
+
+
+class TestFrameGroups(unittest.TestCase):
+    def test_groups_connected_components(self):
+        print("...test_groups_connected_components")
+        graph = stand_in_graph.new_graph(
+            [
+                stand_in_graph.node_data(i, "node", ["input"])
+                for i in range(1, 5)
+            ],
+            [
+                (1, stand_in_graph.OUTPUT_ID, 2, "input"),
+                (4, stand_in_graph.OUTPUT_ID, 3, "input"),
+            ],
+        )
+        a, b, c, _ = graph.getNodes()
+
+        groups = frame_groups.get_connected_components([a, b, c])
+
+        self.assertEqual(
+            sorted(len(group) for group in groups),
+            [1, 2],
+        )
+
+    def test_merges_overlapping_groups(self):
+        print("...test_merges_overlapping_groups")
+        groups = bw_framer.merge_overlapping_groups(
+            [
+                bw_framer.BWFrameGroup(
+                    frame_bounds.BWBounds(0, 0, 100, 100), ["a"]
+                ),
+                bw_framer.BWFrameGroup(
+                    frame_bounds.BWBounds(200, 0, 300, 100), ["b"]
+                ),
+                # Overlaps the first, and the merged frame then overlaps
+                # the second
+                bw_framer.BWFrameGroup(
+                    frame_bounds.BWBounds(50, 50, 250, 80), ["c"]
+                ),
+                bw_framer.BWFrameGroup(
+                    frame_bounds.BWBounds(0, 500, 100, 600), ["d"]
+                ),
+            ]
+        )
+
+        self.assertEqual(len(groups), 2)
+        self.assertEqual(
+            groups[0].bounds, frame_bounds.BWBounds(0, 0, 300, 100)
+        )
+        self.assertEqual(sorted(groups[0].api_nodes), ["a", "b", "c"])
+
+
+class TestFrameIndex(unittest.TestCase):
+    def test_frame_index_matches_by_overlap(self):
+        print("...test_frame_index_matches_by_overlap")
+        index = frame_index.BWFrameIndex(
+            ["small", "far", "wide"],
+            [
+                frame_bounds.BWBounds(500, 0, 520, 20),
+                frame_bounds.BWBounds(2000, 0, 2100, 100),
+                frame_bounds.BWBounds(0, 0, 1000, 100),
+            ],
+        )
+
+        # The wide frame starts far to the left of the bounds
+        bounds = frame_bounds.BWBounds(510, 10, 900, 50)
+        self.assertEqual(index.take_best_match(bounds), "wide")
+        self.assertEqual(index.take_best_match(bounds), "small")
+        self.assertIsNone(index.take_best_match(bounds))
+        self.assertEqual(
+            index.unused_overlapping([frame_bounds.BWBounds(0, 0, 3000, 10)]),
+            ["far"],
+        )
+
+
 if __name__ == "__main__":
     unittest.main()
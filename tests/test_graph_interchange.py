@@ -0,0 +1,201 @@
+import unittest
+from unittest.mock import Mock
+
+from sd.api.sdproperty import SDPropertyInheritanceMethod
+
+from bw_tools.common import bw_graph_interchange, bw_node_selection
+from bw_tools.modules.bw_layout_graph import bw_layout_graph
+from bw_tools.modules.bw_optimize_graph import bw_optimize_graph
+from bw_tools.modules.bw_optimize_graph.output_size_optimizer import (
+    texture_bytes,
+)
+from tests import stand_in_graph
+
+GRAPH = {
+    "format_version": bw_graph_interchange.GRAPH_FORMAT_VERSION,
+    "values": {"$outputsize": [11, 11]},
+    "nodes": [
+        {
+            "identifier": "1",
+            "definition_id": "sbs::compositing::uniform",
+            "label": "Uniform Color",
+            "position": [0.0, 0.0],
+            "inputs": [],
+            "outputs": ["unique_filter_output"],
+            "values": {"$outputsize": [0, 0]},
+            "inheritance": {"$outputsize": "RelativeToParent"},
+        },
+        {
+            "identifier": "2",
+            "definition_id": "sbs::compositing::passthrough",
+            "label": "Dot",
+            "position": [100.0, 0.0],
+            "inputs": ["input"],
+            "outputs": ["unique_filter_output"],
+            "values": {},
+            "inheritance": {},
+        },
+        {
+            "identifier": "3",
+            "definition_id": "sbs::compositing::blend",
+            "label": "Blend",
+            "position": [200.0, 0.0],
+            "inputs": ["source", "destination"],
+            "outputs": ["unique_filter_output"],
+            "values": {"$outputsize": [0, 0]},
+            "inheritance": {"$outputsize": "RelativeToInput"},
+        },
+    ],
+    "connections": [
+        ["1", "unique_filter_output", "2", "input"],
+        ["1", "unique_filter_output", "3", "destination"],
+        ["2", "unique_filter_output", "3", "source"],
+    ],
+}
+
+
+# Two duplicate uniform colors, one through levels, blended together
+OPTIMIZE_GRAPH = stand_in_graph.graph_data(
+    [
+        stand_in_graph.node_data(
+            1,
+            "sbs::compositing::uniform",
+            output_size_inheritance="RelativeToInput",
+        ),
+        stand_in_graph.node_data(
+            2,
+            "sbs::compositing::uniform",
+            output_size_inheritance="RelativeToInput",
+        ),
+        stand_in_graph.node_data(
+            3,
+            "sbs::compositing::levels",
+            ["input1"],
+            output_size_inheritance="RelativeToInput",
+        ),
+        stand_in_graph.node_data(
+            4,
+            "sbs::compositing::blend",
+            ["source", "destination"],
+            output_size_inheritance="RelativeToInput",
+        ),
+        stand_in_graph.node_data(
+            5,
+            "sbs::compositing::output",
+            ["inputNodeOutput"],
+            [],
+            output_size_inheritance="RelativeToInput",
+        ),
+    ],
+    [
+        (1, stand_in_graph.OUTPUT_ID, 3, "input1"),
+        (2, stand_in_graph.OUTPUT_ID, 4, "source"),
+        (3, stand_in_graph.OUTPUT_ID, 4, "destination"),
+        (4, stand_in_graph.OUTPUT_ID, 5, "inputNodeOutput"),
+    ],
+    {"$outputsize": [11, 11]},
+)
+
+
+class TestGraphInterchange(unittest.TestCase):
+    def test_export_matches_loaded_graph(self):
+        print("...test_export_matches_loaded_graph")
+        graph = bw_graph_interchange.from_dict(GRAPH)
+
+        self.assertEqual(bw_graph_interchange.export_graph(graph), GRAPH)
+
+    def test_rejects_other_format_versions(self):
+        print("...test_rejects_other_format_versions")
+        self.assertRaises(
+            ValueError,
+            bw_graph_interchange.from_dict,
+            {**GRAPH, "format_version": 0},
+        )
+
+    def test_can_run_node_selection_on_loaded_graph(self):
+        print("...test_can_run_node_selection_on_loaded_graph")
+        graph = bw_graph_interchange.from_dict(GRAPH)
+
+        removal = bw_node_selection.remove_dot_nodes(graph.getNodes(), graph)
+        node_selection = bw_node_selection.BWNodeSelection(
+            removal.api_nodes, graph
+        )
+
+        self.assertEqual(removal.deleted_node_count, 1)
+        self.assertEqual(
+            [n.identifier for n in node_selection.node(3).input_nodes], [1]
+        )
+
+        blend = graph.getNodeFromId("3")
+        source = blend.getPropertyFromId("source", bw_graph_interchange.INPUT)
+        connections = blend.getPropertyConnections(source)
+        self.assertEqual(len(connections), 1)
+        self.assertEqual(
+            connections[0].getInputPropertyNode().getIdentifier(), "1"
+        )
+
+    def test_can_optimize_loaded_graph(self):
+        print("...test_can_optimize_loaded_graph")
+        graph = bw_graph_interchange.from_dict(OPTIMIZE_GRAPH)
+
+        settings = Mock()
+        settings.uniform_force_output_size = True
+        settings.uniform_propagate_output_size = True
+        settings.recursive = True
+        settings.remove_dead_nodes = False
+
+        node_selection = bw_node_selection.BWNodeSelection(
+            graph.getNodes(), graph
+        )
+        result = bw_optimize_graph.optimize(node_selection, settings)
+
+        self.assertEqual(result.atomic_count, 1)
+        self.assertEqual(result.uniform_color_count, 1)
+        self.assertEqual(result.constant_count, 1)
+        self.assertEqual(
+            result.saved_bytes, 2 * (texture_bytes(11) - texture_bytes(4))
+        )
+        self.assertEqual(sorted(graph.nodes), ["1", "3", "4", "5"])
+
+        levels = graph.getNodeFromId("3")
+        value = levels.getInputPropertyValueFromId("$outputsize")
+        self.assertEqual(
+            levels.getInputPropertyInheritanceMethodFromId("$outputsize"),
+            SDPropertyInheritanceMethod.Absolute,
+        )
+        self.assertEqual((value.get().x, value.get().y), (4, 4))
+
+        blend = graph.getNodeFromId("4")
+        self.assertEqual(
+            blend.getInputPropertyInheritanceMethodFromId("$outputsize"),
+            SDPropertyInheritanceMethod.RelativeToParent,
+        )
+
+        exported = bw_graph_interchange.export_graph(graph)
+        self.assertEqual(exported["nodes"][1]["values"]["$outputsize"], [4, 4])
+
+    def test_can_layout_loaded_graph(self):
+        print("...test_can_layout_loaded_graph")
+        graph = bw_graph_interchange.from_dict(OPTIMIZE_GRAPH)
+
+        settings = Mock()
+        settings.mainline_enabled = False
+        settings.node_spacing = 32.0
+        settings.alignment_behavior = "Center"
+        settings.run_straighten_connection = False
+        settings.snap_to_grid = False
+
+        node_selection = bw_layout_graph.BWLayoutNodeSelection(
+            graph.getNodes(), graph
+        )
+        bw_layout_graph.run_layout(node_selection, Mock(), settings)
+
+        x = {i: n.getPosition().x for i, n in graph.nodes.items()}
+        self.assertLess(x["1"], x["3"])
+        self.assertLess(x["3"], x["4"])
+        self.assertLess(x["2"], x["4"])
+        self.assertLess(x["4"], x["5"])
+
+
+if __name__ == "__main__":
+    unittest.main()
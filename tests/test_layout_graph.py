@@ -4,7 +4,7 @@ import shutil
 import unittest
 from pathlib import Path
 from typing import Dict
-from unittest.mock import Mock
+from unittest.mock import Mock, patch
 
 import sd
 from bw_tools.common import bw_node_selection
@@ -14,6 +14,10 @@ from bw_tools.modules.bw_layout_graph.layout_node import (
     BWLayoutNode,
     BWLayoutNodeSelection,
 )
+from bw_tools.modules.bw_straighten_connection.straighten_behavior import (
+    BWBreakAtSource,
+    BWBreakAtTarget,
+)
 
 
 class TestLayoutGraphMainlineEnabledMainlineAlign(unittest.TestCase):
@@ -542,5 +546,32 @@ class TestLayoutGraphMainlineEnabledMainlineAlign(unittest.TestCase):
             )
 
 
+class TestLayoutGraphStraightenConnection(unittest.TestCase):
+    def test_uses_straighten_connection_alignment_setting(self):
+        print("...test_uses_straighten_connection_alignment_setting")
+        node_selection = Mock()
+        node_selection.root_nodes = []
+        node_selection.nodes = []
+
+        for alignment, behavior_class in (
+            ("Break At Source", BWBreakAtSource),
+            ("Break At Target", BWBreakAtTarget),
+        ):
+            settings = Mock()
+            settings.mainline_enabled = False
+            settings.snap_to_grid = False
+            settings.run_straighten_connection = True
+            settings.straighten_connection_behavior = alignment
+
+            with patch.object(
+                bw_layout_graph.bw_straighten_connection,
+                "on_clicked_straighten_connection",
+            ) as straighten:
+                bw_layout_graph.run_layout(node_selection, Mock(), settings)
+
+            behavior = straighten.call_args[0][1]
+            self.assertIsInstance(behavior, behavior_class)
+
+
 if __name__ == "__main__":
     unittest.main()
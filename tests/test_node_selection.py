@@ -4,6 +4,8 @@ from pathlib import Path
 
 import sd
 from bw_tools.common import bw_node_selection
+from bw_tools.common.bw_api_tool import CompNodeID, FunctionNodeId
+from tests import stand_in_graph
 
 
 class TestNodeSelection(unittest.TestCase):
@@ -111,5 +113,46 @@ class TestNodeSelection(unittest.TestCase):
         shutil.copy(self.package_file_path, tmp_file)
 
 
+class TestRemoveDotNodes(unittest.TestCase):
+    def test_removes_chained_and_disconnected_dot_nodes(self):
+        print("...test_removes_chained_and_disconnected_dot_nodes")
+        graph = stand_in_graph.new_graph(
+            [
+                stand_in_graph.node_data(
+                    1, "sbs::compositing::blend", ["source", "destination"]
+                ),
+                stand_in_graph.node_data(2, CompNodeID.DOT.value, ["input"]),
+                stand_in_graph.node_data(
+                    3, FunctionNodeId.DOT.value, ["input"]
+                ),
+                stand_in_graph.node_data(4, CompNodeID.DOT.value, ["input"]),
+                stand_in_graph.node_data(
+                    5, "sbs::compositing::levels", ["input1"]
+                ),
+                stand_in_graph.node_data(
+                    6, "sbs::compositing::levels", ["input1"]
+                ),
+            ],
+            [
+                (1, stand_in_graph.OUTPUT_ID, 2, "input"),
+                (2, stand_in_graph.OUTPUT_ID, 3, "input"),
+                (3, stand_in_graph.OUTPUT_ID, 5, "input1"),
+                (4, stand_in_graph.OUTPUT_ID, 6, "input1"),
+            ],
+        )
+        api_nodes = graph.getNodes()
+        source, _, _, _, target, other_target = api_nodes
+
+        removal = bw_node_selection.remove_dot_nodes(api_nodes, graph)
+
+        self.assertEqual(removal.api_nodes, [source, target, other_target])
+        self.assertEqual(removal.deleted_node_count, 3)
+        self.assertEqual(removal.deleted_connection_count, 4)
+        self.assertEqual(removal.new_connection_count, 1)
+        self.assertEqual(graph.getNodes(), [source, target, other_target])
+        self.assertIs(stand_in_graph.input_node(target, "input1"), source)
+        self.assertIsNone(stand_in_graph.input_node(other_target, "input1"))
+
+
 if __name__ == "__main__":
     unittest.main()
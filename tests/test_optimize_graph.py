@@ -1,13 +1,31 @@
 from bw_tools.common.bw_api_tool import BWAPITool
 from bw_tools.common.bw_node_selection import BWNodeSelection
 import unittest
-from unittest.mock import Mock
+from unittest.mock import Mock, patch
 from pathlib import Path
 import shutil
 
 import sd
+from sd.api.sbs.sdsbscompgraph import SDSBSCompGraph
+from sd.api.sbs.sdsbsfunctiongraph import SDSBSFunctionGraph
+from sd.api.sdgraphobjectcomment import SDGraphObjectComment
 
+from bw_tools.common.bw_api_tool import CompNodeID
+from bw_tools.common.bw_node import BWNode
 from bw_tools.modules.bw_optimize_graph import bw_optimize_graph
+from bw_tools.modules.bw_optimize_graph.dead_node_optimizer import (
+    DEAD_NODE_COMMENT,
+    DeadNodeOptimizer,
+)
+from bw_tools.modules.bw_optimize_graph.function_graph_optimizer import (
+    FUNCTION_INSTANCE_NODE,
+    FunctionGraphOptimizer,
+)
+from bw_tools.modules.bw_optimize_graph.optimizer import Optimizer
+from bw_tools.modules.bw_optimize_graph.output_size_optimizer import (
+    texture_bytes,
+)
+from tests import stand_in_graph
 
 
 class TestOptimizeGraph(unittest.TestCase):
@@ -53,9 +71,11 @@ class TestOptimizeGraph(unittest.TestCase):
 
         settings = Mock()
         settings.uniform_force_output_size = False
+        settings.uniform_propagate_output_size = False
         settings.recursive = True
         settings.popup_on_complete = False
         settings.run_layout_tools = False
+        settings.remove_dead_nodes = False
 
         graph = self.package.findResourceFromUrl(graph_name)
         node_selection = BWNodeSelection(graph.getNodes(), graph)
@@ -69,9 +89,11 @@ class TestOptimizeGraph(unittest.TestCase):
 
         settings = Mock()
         settings.uniform_force_output_size = False
+        settings.uniform_propagate_output_size = False
         settings.recursive = True
         settings.popup_on_complete = False
         settings.run_layout_tools = False
+        settings.remove_dead_nodes = False
 
         graph = self.package.findResourceFromUrl(graph_name)
         node_selection = BWNodeSelection(graph.getNodes(), graph)
@@ -85,9 +107,11 @@ class TestOptimizeGraph(unittest.TestCase):
 
         settings = Mock()
         settings.uniform_force_output_size = False
+        settings.uniform_propagate_output_size = False
         settings.recursive = True
         settings.popup_on_complete = False
         settings.run_layout_tools = False
+        settings.remove_dead_nodes = False
 
         graph = self.package.findResourceFromUrl(graph_name)
         node_selection = BWNodeSelection(graph.getNodes(), graph)
@@ -105,9 +129,11 @@ class TestOptimizeGraph(unittest.TestCase):
 
         settings = Mock()
         settings.uniform_force_output_size = True
+        settings.uniform_propagate_output_size = False
         settings.recursive = True
         settings.popup_on_complete = False
         settings.run_layout_tools = False
+        settings.remove_dead_nodes = False
 
         graph = self.package.findResourceFromUrl(graph_name)
         uniform_node = graph.getNodeFromId("1422819514")
@@ -159,9 +185,11 @@ class TestOptimizeGraph(unittest.TestCase):
 
         settings = Mock()
         settings.uniform_force_output_size = True
+        settings.uniform_propagate_output_size = False
         settings.recursive = True
         settings.popup_on_complete = False
         settings.run_layout_tools = False
+        settings.remove_dead_nodes = False
 
         graph = self.package.findResourceFromUrl(graph_name)
         uniform_node = graph.getNodeFromId("1422819514")
@@ -209,9 +237,11 @@ class TestOptimizeGraph(unittest.TestCase):
 
         settings = Mock()
         settings.uniform_force_output_size = False
+        settings.uniform_propagate_output_size = False
         settings.recursive = True
         settings.popup_on_complete = False
         settings.run_layout_tools = False
+        settings.remove_dead_nodes = False
 
         graph = self.package.findResourceFromUrl(graph_name)
         node_selection = BWNodeSelection(graph.getNodes(), graph)
@@ -225,9 +255,11 @@ class TestOptimizeGraph(unittest.TestCase):
 
         settings = Mock()
         settings.uniform_force_output_size = False
+        settings.uniform_propagate_output_size = False
         settings.recursive = True
         settings.popup_on_complete = False
         settings.run_layout_tools = False
+        settings.remove_dead_nodes = False
 
         graph = self.package.findResourceFromUrl(graph_name)
         node_selection = BWNodeSelection(graph.getNodes(), graph)
@@ -241,9 +273,11 @@ class TestOptimizeGraph(unittest.TestCase):
 
         settings = Mock()
         settings.uniform_force_output_size = False
+        settings.uniform_propagate_output_size = False
         settings.recursive = False
         settings.popup_on_complete = False
         settings.run_layout_tools = False
+        settings.remove_dead_nodes = False
 
         graph = self.package.findResourceFromUrl(graph_name)
         node_selection = BWNodeSelection(graph.getNodes(), graph)
@@ -257,9 +291,11 @@ class TestOptimizeGraph(unittest.TestCase):
 
         settings = Mock()
         settings.uniform_force_output_size = False
+        settings.uniform_propagate_output_size = False
         settings.recursive = False
         settings.popup_on_complete = False
         settings.run_layout_tools = False
+        settings.remove_dead_nodes = False
 
         graph = self.package.findResourceFromUrl(graph_name)
         node_selection = BWNodeSelection(graph.getNodes(), graph)
@@ -273,9 +309,11 @@ class TestOptimizeGraph(unittest.TestCase):
 
         settings = Mock()
         settings.uniform_force_output_size = True
+        settings.uniform_propagate_output_size = False
         settings.recursive = True
         settings.popup_on_complete = False
         settings.run_layout_tools = False
+        settings.remove_dead_nodes = False
 
         graph = self.package.findResourceFromUrl(graph_name)
         node_selection = BWNodeSelection(graph.getNodes(), graph)
@@ -289,9 +327,11 @@ class TestOptimizeGraph(unittest.TestCase):
 
         settings = Mock()
         settings.uniform_force_output_size = True
+        settings.uniform_propagate_output_size = False
         settings.recursive = True
         settings.popup_on_complete = False
         settings.run_layout_tools = False
+        settings.remove_dead_nodes = False
 
         graph = self.package.findResourceFromUrl(graph_name)
         node_selection = BWNodeSelection(graph.getNodes(), graph)
@@ -305,9 +345,11 @@ class TestOptimizeGraph(unittest.TestCase):
 
         settings = Mock()
         settings.uniform_force_output_size = True
+        settings.uniform_propagate_output_size = False
         settings.recursive = True
         settings.popup_on_complete = False
         settings.run_layout_tools = False
+        settings.remove_dead_nodes = False
 
         graph = self.package.findResourceFromUrl(graph_name)
         node_selection = BWNodeSelection(graph.getNodes(), graph)
@@ -315,6 +357,418 @@ class TestOptimizeGraph(unittest.TestCase):
         # The graph should not error
         self.assertTrue(True)
 
+    def _new_dead_node_graph(self, graph_name: str):
+        """
+        Builds uniform -> output and an unconnected uniform -> blend branch.
+        Returns the graph and the nodes of the dead branch.
+        """
+        graph = SDSBSCompGraph.sNew(self.package)
+        graph.setIdentifier(graph_name)
+
+        live = graph.newNode(CompNodeID.UNIFORM_COLOR.value)
+        output = graph.newNode(CompNodeID.OUTPUT.value)
+        live.newPropertyConnectionFromId(
+            "unique_filter_output", output, "inputNodeOutput"
+        )
+
+        dead = graph.newNode(CompNodeID.UNIFORM_COLOR.value)
+        dead_blend = graph.newNode("sbs::compositing::blend")
+        dead.newPropertyConnectionFromId(
+            "unique_filter_output", dead_blend, "source"
+        )
+        return graph, [dead, dead_blend]
+
+    def test_deletes_dead_nodes(self):
+        graph_name = "test_deletes_dead_nodes"
+        print(f"...{graph_name}")
+
+        settings = Mock()
+        settings.uniform_force_output_size = False
+        settings.uniform_propagate_output_size = False
+        settings.recursive = False
+        settings.popup_on_complete = False
+        settings.run_layout_tools = False
+        settings.remove_dead_nodes = True
+        settings.dead_node_action = "Delete"
+
+        graph, _ = self._new_dead_node_graph(graph_name)
+        node_selection = BWNodeSelection(graph.getNodes(), graph)
+        bw_optimize_graph.run(node_selection, self.api, settings)
+
+        self.assertEqual(len(graph.getNodes()), 2)
+
+    def test_comments_dead_nodes(self):
+        graph_name = "test_comments_dead_nodes"
+        print(f"...{graph_name}")
+
+        settings = Mock()
+        settings.uniform_force_output_size = False
+        settings.uniform_propagate_output_size = False
+        settings.recursive = False
+        settings.popup_on_complete = False
+        settings.run_layout_tools = False
+        settings.remove_dead_nodes = True
+        settings.dead_node_action = "Comment"
+
+        graph, dead_nodes = self._new_dead_node_graph(graph_name)
+        # Optimizing again does not add another comment
+        for _ in range(2):
+            node_selection = BWNodeSelection(graph.getNodes(), graph)
+            bw_optimize_graph.run(node_selection, self.api, settings)
+
+            self.assertEqual(len(graph.getNodes()), 4)
+            comments = [
+                graph_object
+                for graph_object in graph.getGraphObjects()
+                if isinstance(graph_object, SDGraphObjectComment)
+            ]
+            self.assertEqual(
+                sorted(c.getParent().getIdentifier() for c in comments),
+                sorted(n.getIdentifier() for n in dead_nodes),
+            )
+            for comment in comments:
+                self.assertEqual(comment.getDescription(), DEAD_NODE_COMMENT)
+
+    def test_propagates_output_size_to_constant_nodes(self):
+        graph_name = "test_propagates_output_size_to_constant_nodes"
+        print(f"...{graph_name}")
+        inheritance_method = sd.api.sdproperty.SDPropertyInheritanceMethod
+
+        settings = Mock()
+        settings.uniform_force_output_size = True
+        settings.uniform_propagate_output_size = True
+        settings.recursive = False
+        settings.popup_on_complete = False
+        settings.run_layout_tools = False
+        settings.remove_dead_nodes = False
+
+        # uniform -> levels -> transformation -> output. Levels keeps the
+        # uniform color constant, transformation does not
+        graph = SDSBSCompGraph.sNew(self.package)
+        graph.setIdentifier(graph_name)
+        graph.setPropertyValue(
+            graph.getPropertyFromId(
+                "$outputsize", sd.api.sdproperty.SDPropertyCategory.Input
+            ),
+            sd.api.sdvalueint2.SDValueInt2.sNew(
+                sd.api.sdbasetypes.int2(11, 11)
+            ),
+        )
+        uniform = graph.newNode(CompNodeID.UNIFORM_COLOR.value)
+        levels = graph.newNode("sbs::compositing::levels")
+        transformation = graph.newNode("sbs::compositing::transformation")
+        output = graph.newNode(CompNodeID.OUTPUT.value)
+        uniform.newPropertyConnectionFromId(
+            "unique_filter_output", levels, "input1"
+        )
+        levels.newPropertyConnectionFromId(
+            "unique_filter_output", transformation, "input1"
+        )
+        transformation.newPropertyConnectionFromId(
+            "unique_filter_output", output, "inputNodeOutput"
+        )
+
+        node_selection = BWNodeSelection(graph.getNodes(), graph)
+        result = bw_optimize_graph.optimize(node_selection, settings)
+
+        self.assertEqual(result.constant_count, 1)
+        self.assertEqual(
+            result.saved_bytes, 2 * (texture_bytes(11) - texture_bytes(4))
+        )
+
+        inheritance = levels.getInputPropertyInheritanceMethodFromId(
+            "$outputsize"
+        )
+        value = levels.getInputPropertyValueFromId("$outputsize")
+        self.assertEqual(inheritance, inheritance_method.Absolute)
+        self.assertEqual(value.get().x, 4)
+        self.assertEqual(value.get().y, 4)
+
+        inheritance = transformation.getInputPropertyInheritanceMethodFromId(
+            "$outputsize"
+        )
+        self.assertEqual(inheritance, inheritance_method.RelativeToParent)
+
+    def test_deletes_duplicate_function_nodes(self):
+        graph_name = "test_deletes_duplicate_function_nodes"
+        print(f"...{graph_name}")
+
+        settings = Mock()
+        settings.uniform_force_output_size = False
+        settings.uniform_propagate_output_size = False
+        settings.recursive = True
+        settings.popup_on_complete = False
+        settings.run_layout_tools = False
+        settings.remove_dead_nodes = False
+
+        # Two identical constants added together
+        graph = SDSBSFunctionGraph.sNew(self.package)
+        graph.setIdentifier(graph_name)
+        a = graph.newNode("sbs::function::const_float1")
+        b = graph.newNode("sbs::function::const_float1")
+        add = graph.newNode("sbs::function::add")
+        a.newPropertyConnectionFromId("unique_filter_output", add, "a")
+        b.newPropertyConnectionFromId("unique_filter_output", add, "b")
+        graph.setOutputNode(add, True)
+
+        node_selection = BWNodeSelection(graph.getNodes(), graph)
+        bw_optimize_graph.run(node_selection, self.api, settings)
+
+        self.assertEqual(len(graph.getNodes()), 2)
+
+    def test_does_not_delete_random_function_nodes(self):
+        graph_name = "test_does_not_delete_random_function_nodes"
+        print(f"...{graph_name}")
+
+        settings = Mock()
+        settings.uniform_force_output_size = False
+        settings.uniform_propagate_output_size = False
+        settings.recursive = True
+        settings.popup_on_complete = False
+        settings.run_layout_tools = False
+        settings.remove_dead_nodes = False
+
+        # Two random nodes with the same parameters added together
+        graph = SDSBSFunctionGraph.sNew(self.package)
+        graph.setIdentifier(graph_name)
+        a = graph.newNode("sbs::function::rand")
+        b = graph.newNode("sbs::function::rand")
+        add = graph.newNode("sbs::function::add")
+        a.newPropertyConnectionFromId("unique_filter_output", add, "a")
+        b.newPropertyConnectionFromId("unique_filter_output", add, "b")
+        graph.setOutputNode(add, True)
+
+        node_selection = BWNodeSelection(graph.getNodes(), graph)
+        bw_optimize_graph.run(node_selection, self.api, settings)
+
+        self.assertEqual(len(graph.getNodes()), 3)
+
+
+
+
+class TestOutputSizeSavedMemory(unittest.TestCase):
+    def test_only_counts_changed_output_sizes(self):
+        print("...test_only_counts_changed_output_sizes")
+        settings = Mock()
+        settings.uniform_force_output_size = True
+        settings.uniform_propagate_output_size = True
+        settings.recursive = False
+        settings.remove_dead_nodes = False
+
+        # The first uniform color inherits its size, the second is already
+        # 16x16 and the third 256x256
+        graph = stand_in_graph.new_graph(
+            [
+                stand_in_graph.node_data(
+                    1,
+                    CompNodeID.UNIFORM_COLOR.value,
+                    output_size_inheritance="RelativeToParent",
+                ),
+                stand_in_graph.node_data(
+                    2,
+                    CompNodeID.UNIFORM_COLOR.value,
+                    output_size_inheritance="Absolute",
+                    output_size=(4, 4),
+                ),
+                stand_in_graph.node_data(
+                    3,
+                    CompNodeID.UNIFORM_COLOR.value,
+                    output_size_inheritance="Absolute",
+                    output_size=(8, 8),
+                ),
+                stand_in_graph.node_data(
+                    4,
+                    "sbs::compositing::levels",
+                    ["input1"],
+                    output_size_inheritance="RelativeToInput",
+                ),
+                stand_in_graph.node_data(
+                    5,
+                    "sbs::compositing::blend",
+                    ["source", "destination", "opacity"],
+                    output_size_inheritance="RelativeToInput",
+                ),
+                stand_in_graph.node_data(
+                    6, CompNodeID.OUTPUT.value, ["inputNodeOutput"], []
+                ),
+            ],
+            [
+                (1, stand_in_graph.OUTPUT_ID, 4, "input1"),
+                (4, stand_in_graph.OUTPUT_ID, 5, "source"),
+                (2, stand_in_graph.OUTPUT_ID, 5, "destination"),
+                (3, stand_in_graph.OUTPUT_ID, 5, "opacity"),
+                (5, stand_in_graph.OUTPUT_ID, 6, "inputNodeOutput"),
+            ],
+            {"$outputsize": [11, 11]},
+        )
+
+        result = bw_optimize_graph.optimize(
+            BWNodeSelection(graph.getNodes(), graph), settings
+        )
+
+        self.assertEqual(result.constant_count, 1)
+        self.assertEqual(
+            result.saved_bytes,
+            2 * (texture_bytes(11) - texture_bytes(4))
+            + texture_bytes(8)
+            - texture_bytes(4),
+        )
+
+        # Nothing changes when optimizing again
+        result = bw_optimize_graph.optimize(
+            BWNodeSelection(graph.getNodes(), graph), settings
+        )
+
+        self.assertEqual(result.constant_count, 0)
+        self.assertEqual(result.saved_bytes, 0)
+
+
+
+class TestFunctionGraphDuplicates(unittest.TestCase):
+    def test_does_not_merge_instances_of_different_functions(self):
+        print("...test_does_not_merge_instances_of_different_functions")
+        # Both noise nodes have the same label, but instance different graphs
+        instances = [
+            ("Perlin Noise", "pkg:///perlin_noise"),
+            ("Cell Noise", "pkg:///cell_noise"),
+            ("Perlin Noise", "pkg:///perlin_noise"),
+            ("Noise", "pkg:///noise"),
+            ("Noise", "pkg:///other/noise"),
+        ]
+        graph = stand_in_graph.new_graph(
+            [
+                stand_in_graph.node_data(
+                    identifier, FUNCTION_INSTANCE_NODE, label=label
+                )
+                for identifier, (label, _) in enumerate(instances, start=1)
+            ]
+        )
+        for api_node, (_, url) in zip(graph.getNodes(), instances):
+            resource = Mock()
+            resource.getUrl.return_value = url
+            api_node.getReferencedResource = Mock(return_value=resource)
+
+        optimizer = FunctionGraphOptimizer(
+            BWNodeSelection(graph.getNodes(), graph), Mock()
+        )
+        duplicates = optimizer.find_duplicates(optimizer.get_nodes())
+
+        self.assertEqual(
+            {
+                identifier: [n.identifier for n in nodes]
+                for identifier, nodes in duplicates.items()
+            },
+            {1: [3], 2: [], 4: [], 5: []},
+        )
+
+
+class TestDeadNodeComments(unittest.TestCase):
+    def test_does_not_comment_dead_nodes_twice(self):
+        print("...test_does_not_comment_dead_nodes_twice")
+        graph = stand_in_graph.new_graph(
+            [
+                stand_in_graph.node_data(1, CompNodeID.UNIFORM_COLOR.value),
+                stand_in_graph.node_data(
+                    2, CompNodeID.OUTPUT.value, ["inputNodeOutput"], []
+                ),
+                stand_in_graph.node_data(3, CompNodeID.UNIFORM_COLOR.value),
+                stand_in_graph.node_data(4, CompNodeID.UNIFORM_COLOR.value),
+            ],
+            [(1, stand_in_graph.OUTPUT_ID, 2, "inputNodeOutput")],
+        )
+        # Node 3 was commented by an earlier run, node 4 by the user
+        graph.getGraphObjects = Mock(
+            return_value=[
+                _mock_comment(graph.getNodeFromId("3"), DEAD_NODE_COMMENT),
+                _mock_comment(graph.getNodeFromId("4"), "Keep this"),
+            ]
+        )
+        settings = Mock()
+        settings.dead_node_action = "Comment"
+
+        optimizer = DeadNodeOptimizer(
+            BWNodeSelection(graph.getNodes(), graph), settings
+        )
+        with patch.object(BWNode, "add_comment") as add_comment:
+            optimizer.run()
+
+        self.assertEqual(optimizer.dead_count, 2)
+        add_comment.assert_called_once_with(DEAD_NODE_COMMENT)
+
+
+class TestOutputSizeInheritance(unittest.TestCase):
+    def test_sets_inheritance_of_all_connected_nodes(self):
+        print("...test_sets_inheritance_of_all_connected_nodes")
+        inheritance_method = sd.api.sdproperty.SDPropertyInheritanceMethod
+
+        # The output node is connected first, followed by a node connected
+        # twice and another node
+        graph = stand_in_graph.new_graph(
+            [
+                stand_in_graph.node_data(
+                    1,
+                    "sbs::compositing::uniform",
+                    output_size_inheritance="RelativeToParent",
+                ),
+                stand_in_graph.node_data(
+                    2,
+                    CompNodeID.OUTPUT.value,
+                    ["inputNodeOutput"],
+                    [],
+                    output_size_inheritance="RelativeToInput",
+                ),
+                stand_in_graph.node_data(
+                    3,
+                    "sbs::compositing::blend",
+                    ["source", "destination"],
+                    output_size_inheritance="RelativeToInput",
+                ),
+                stand_in_graph.node_data(
+                    4,
+                    "sbs::compositing::levels",
+                    ["input1"],
+                    output_size_inheritance="RelativeToInput",
+                ),
+            ],
+            [
+                (1, stand_in_graph.OUTPUT_ID, 2, "inputNodeOutput"),
+                (1, stand_in_graph.OUTPUT_ID, 3, "source"),
+                (1, stand_in_graph.OUTPUT_ID, 3, "destination"),
+                (1, stand_in_graph.OUTPUT_ID, 4, "input1"),
+            ],
+        )
+        uniform, output, blend, levels = graph.getNodes()
+
+        with patch.object(
+            blend,
+            "setPropertyInheritanceMethod",
+            wraps=blend.setPropertyInheritanceMethod,
+        ) as set_blend_inheritance_method:
+            Optimizer._set_connected_output_nodes_inheritance_method(
+                BWNode(uniform), inheritance_method.RelativeToParent
+            )
+
+        set_blend_inheritance_method.assert_called_once()
+        for api_node, expected in (
+            (output, inheritance_method.RelativeToInput),
+            (blend, inheritance_method.RelativeToParent),
+            (levels, inheritance_method.RelativeToParent),
+        ):
+            self.assertEqual(
+                api_node.getInputPropertyInheritanceMethodFromId(
+                    "$outputsize"
+                ),
+                expected,
+            )
+
+
+
+def _mock_comment(api_node, description):
+    comment = Mock(spec=SDGraphObjectComment)
+    comment.getParent = Mock(return_value=api_node)
+    comment.getDescription = Mock(return_value=description)
+    return comment
+
 
 if __name__ == "__main__":
     unittest.main()
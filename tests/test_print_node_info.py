@@ -0,0 +1,135 @@
+import io
+import json
+import unittest
+from unittest.mock import Mock
+
+from sd.api.sdbasetypes import float2, int2
+from sd.api.sdproperty import SDPropertyCategory
+
+from bw_tools.modules.bw_print_node_info import bw_print_node_info
+
+
+class TestPrintNodeInfo(unittest.TestCase):
+    def test_can_get_node_record(self):
+        print("...test_can_get_node_record")
+        record = bw_print_node_info.get_node_record(_mock_api_node("1"))
+
+        self.assertEqual(
+            record,
+            {
+                "identifier": "1",
+                "definition_id": "sbs::compositing::levels",
+                "label": "Levels",
+                "position": [100.0, 50.0],
+                "properties": {
+                    "annotation": [
+                        {
+                            "id": "description",
+                            "type": "string",
+                            "connectable": False,
+                            "value": None,
+                        }
+                    ],
+                    "input": [
+                        {
+                            "id": "input1",
+                            "type": "ColorRGBA",
+                            "connectable": True,
+                            "value": None,
+                        },
+                        {
+                            "id": "$outputsize",
+                            "type": "int2",
+                            "connectable": False,
+                            "value": [4, 4],
+                        },
+                    ],
+                    "output": [
+                        {
+                            "id": "unique_filter_output",
+                            "type": "ColorRGBA",
+                            "connectable": True,
+                            "value": None,
+                        }
+                    ],
+                },
+            },
+        )
+
+    def test_exports_one_record_per_line(self):
+        print("...test_exports_one_record_per_line")
+        nodes = [_mock_api_node("1"), _mock_api_node("2")]
+        output = io.StringIO()
+
+        count = bw_print_node_info.export_node_info(nodes, output)
+
+        self.assertEqual(count, 2)
+        lines = output.getvalue().splitlines()
+        self.assertEqual(len(lines), 2)
+        for node, line in zip(nodes, lines):
+            self.assertEqual(
+                json.loads(line), bw_print_node_info.get_node_record(node)
+            )
+
+    def test_export_structure_does_not_read_values(self):
+        print("...test_export_structure_does_not_read_values")
+        nodes = [_mock_api_node("1"), _mock_api_node("2")]
+        output = io.StringIO()
+
+        bw_print_node_info.export_node_info(
+            nodes, output, include_values=False
+        )
+
+        for node in nodes:
+            node.getPropertyValue.assert_not_called()
+        records = [json.loads(line) for line in output.getvalue().splitlines()]
+        self.assertEqual([r["identifier"] for r in records], ["1", "2"])
+        for record in records:
+            for properties in record["properties"].values():
+                self.assertTrue(properties)
+                for api_property in properties:
+                    self.assertNotIn("value", api_property)
+
+
+def _mock_property(property_id, type_id, connectable):
+    api_property = Mock()
+    api_property.getId.return_value = property_id
+    api_property.getType.return_value.getId.return_value = type_id
+    api_property.isConnectable.return_value = connectable
+    return api_property
+
+
+def _mock_api_node(identifier):
+    api_node = Mock()
+    api_node.getIdentifier.return_value = identifier
+    api_node.getDefinition.return_value.getId.return_value = (
+        "sbs::compositing::levels"
+    )
+    api_node.getDefinition.return_value.getLabel.return_value = "Levels"
+    api_node.getPosition.return_value = float2(100.0, 50.0)
+
+    properties = {
+        SDPropertyCategory.Annotation: [
+            _mock_property("description", "string", False)
+        ],
+        SDPropertyCategory.Input: [
+            _mock_property("input1", "ColorRGBA", True),
+            _mock_property("$outputsize", "int2", False),
+        ],
+        SDPropertyCategory.Output: [
+            _mock_property("unique_filter_output", "ColorRGBA", True)
+        ],
+    }
+    api_node.getProperties.side_effect = lambda category: properties[category]
+
+    # Only the output size has a value
+    output_size = Mock()
+    output_size.get.return_value = int2(4, 4)
+    api_node.getPropertyValue.side_effect = lambda api_property: (
+        output_size if api_property.getId() == "$outputsize" else None
+    )
+    return api_node
+
+
+if __name__ == "__main__":
+    unittest.main()
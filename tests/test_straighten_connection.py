@@ -10,7 +10,9 @@ from pathlib import Path
 from unittest.mock import Mock
 
 import sd
-from bw_tools.common.bw_api_tool import BWAPITool, FunctionNodeId
+from bw_tools.common import bw_dot_chain
+from bw_tools.common.bw_api_tool import BWAPITool, CompNodeID, FunctionNodeId
+from bw_tools.common.bw_node import BWFloat2
 from bw_tools.modules.bw_straighten_connection import bw_straighten_connection
 from bw_tools.modules.bw_straighten_connection.straighten_behavior import (
     BWBreakAtSource,
@@ -19,8 +21,14 @@ from bw_tools.modules.bw_straighten_connection.straighten_behavior import (
 from bw_tools.modules.bw_straighten_connection.straighten_node import (
     BWStraightenNode,
 )
+from bw_tools.modules.bw_straighten_connection.straighten_plan import (
+    DOT_INPUT_ID,
+    DOT_OUTPUT_ID,
+    BWStraightenPlan,
+)
 from PIL import Image, ImageChops
 from sd.tools.export import exportSDGraphOutputs
+from tests import stand_in_graph
 
 
 class TestStraightenConnection(unittest.TestCase):
@@ -368,6 +376,98 @@ class TestStraightenConnection(unittest.TestCase):
             )
 
 
+class TestStraightenPlan(unittest.TestCase):
+    def test_plan_does_not_modify_graph_until_committed(self):
+        print("...test_plan_does_not_modify_graph_until_committed")
+        graph = Mock()
+        source = Mock()
+        target = Mock()
+
+        plan = BWStraightenPlan(graph)
+        dot_node = plan.new_dot_node(BWFloat2(10, 20))
+        plan.connect(source, "unique_filter_output", dot_node, DOT_INPUT_ID)
+        plan.connect(dot_node, DOT_OUTPUT_ID, target, "input1")
+
+        graph.newNode.assert_not_called()
+        source.api_node.newPropertyConnectionFromId.assert_not_called()
+
+        plan.commit()
+
+        graph.newNode.assert_called_once_with(CompNodeID.DOT.value)
+        source.api_node.newPropertyConnectionFromId.assert_called_once_with(
+            "unique_filter_output", dot_node.api_node, DOT_INPUT_ID
+        )
+        dot_node.api_node.newPropertyConnectionFromId.assert_called_once_with(
+            DOT_OUTPUT_ID, target.api_node, "input1"
+        )
+
+    def test_plan_can_be_previewed_as_data(self):
+        print("...test_plan_can_be_previewed_as_data")
+        source = Mock()
+        source.identifier = 1
+        plan = BWStraightenPlan(Mock())
+        dot_node = plan.new_dot_node(BWFloat2(10, 20))
+        plan.connect(source, "output", dot_node, DOT_INPUT_ID)
+
+        self.assertEqual(
+            plan.to_dict(),
+            {
+                "dot_nodes": [[10, 20]],
+                "connections": [
+                    {
+                        "source": {"node": 1},
+                        "source_property": "output",
+                        "target": {"dot_node": 0},
+                        "target_property": DOT_INPUT_ID,
+                    }
+                ],
+            },
+        )
+
+
+class TestDotChainCollapse(unittest.TestCase):
+    def test_collapses_dot_chains_in_one_pass(self):
+        print("...test_collapses_dot_chains_in_one_pass")
+        graph = stand_in_graph.new_graph(
+            [
+                stand_in_graph.node_data(
+                    1, "sbs::compositing::blend", ["source", "destination"]
+                ),
+                stand_in_graph.node_data(
+                    2, CompNodeID.DOT.value, [DOT_INPUT_ID], [DOT_OUTPUT_ID]
+                ),
+                stand_in_graph.node_data(
+                    3, CompNodeID.DOT.value, [DOT_INPUT_ID], [DOT_OUTPUT_ID]
+                ),
+                stand_in_graph.node_data(
+                    4, "sbs::compositing::levels", ["input1"]
+                ),
+                stand_in_graph.node_data(
+                    5, "sbs::compositing::levels", ["input1"]
+                ),
+            ],
+            [
+                (1, stand_in_graph.OUTPUT_ID, 2, DOT_INPUT_ID),
+                (2, DOT_OUTPUT_ID, 3, DOT_INPUT_ID),
+                (3, DOT_OUTPUT_ID, 4, "input1"),
+                (2, DOT_OUTPUT_ID, 5, "input1"),
+            ],
+        )
+        source, dot_a, _, target_a, target_b = graph.getNodes()
+
+        # The selected dot node is visited before the source upstream of it
+        collapse = bw_dot_chain.plan_collapse_output_dot_nodes([source, dot_a])
+
+        self.assertEqual(len(graph.getNodes()), 5)
+        self.assertEqual(collapse.deleted_identifiers, {2, 3})
+
+        collapse.apply(graph)
+
+        self.assertEqual(graph.getNodes(), [source, target_a, target_b])
+        self.assertIs(stand_in_graph.input_node(target_a, "input1"), source)
+        self.assertIs(stand_in_graph.input_node(target_b, "input1"), source)
+
+
 def _wait_for_files_to_render(
     correct_result_dir, source_result_dir, target_result_dir
 ):
@@ -418,15 +518,9 @@ def _run_render_textures(
 
 
 def _run_straighten(graph, behavior, settings):
-    for node in graph.getNodes():
-        try:
-            node = BWStraightenNode(node, graph)
-        except AttributeError:
-            # Occurs if the dot node was previously removed
-            continue
-        bw_straighten_connection.run_straighten_connection(
-            node, behavior, settings
-        )
+    bw_straighten_connection.run_straighten_connection_for_selection(
+        graph.getNodes(), graph, behavior, settings
+    )
 
 
 def _calculate_rms(im1: Image, im2: Image) -> float: